@@ -3,6 +3,12 @@ import Webcam from 'react-webcam';
 import axios from 'axios';
 import './SignToTextPage.css';
 
+// Each page load is its own signer session on the StoT backend
+const SESSION_ID = (window.crypto && window.crypto.randomUUID)
+  ? window.crypto.randomUUID()
+  : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+const sessionConfig = { headers: { 'X-Session-ID': SESSION_ID } };
+
 function SignToTextPage() {
   const webcamRef = useRef(null);
   const [currentSymbol, setCurrentSymbol] = useState('C');
@@ -12,6 +18,20 @@ function SignToTextPage() {
   const [skeletalImage, setSkeletalImage] = useState('');
   const [isProcessing, setIsProcessing] = useState(false);
   const [isStreaming, setIsStreaming] = useState(false);
+  const [captureConfig, setCaptureConfig] = useState({ width: 640, jpeg_quality: 0.8 });
+  // The capture interval keeps the captureAndPredict of the render that started it,
+  // so it reads the current config through this ref
+  const captureConfigRef = useRef(captureConfig);
+  captureConfigRef.current = captureConfig;
+  // The backend suggests a slower capture interval while no hands are in view
+  const [captureInterval, setCaptureInterval] = useState(500);
+
+  // Ask the backend how large and how compressed the uploaded frames should be
+  useEffect(() => {
+    axios.get('http://localhost:5000/capture_config')
+      .then((response) => setCaptureConfig(response.data))
+      .catch((error) => console.error('Error loading capture config:', error));
+  }, []);
 
   useEffect(() => {
     let interval;
@@ -19,13 +39,13 @@ function SignToTextPage() {
     if (isStreaming) {
       interval = setInterval(() => {
         captureAndPredict();
-      }, 500);
+      }, captureInterval);
     }
     
     return () => {
       if (interval) clearInterval(interval);
     };
-  }, [isStreaming]);
+  }, [isStreaming, captureInterval]);
 
   const captureAndPredict = async () => {
     if (!webcamRef.current || isProcessing) return;
@@ -33,18 +53,27 @@ function SignToTextPage() {
     setIsProcessing(true);
     
     try {
-      const imageSrc = webcamRef.current.getScreenshot();
+      // Downscale the screenshot to the advertised width, keeping the camera's aspect ratio
+      const video = webcamRef.current.video;
+      const captureConfig = captureConfigRef.current;
+      const width = Math.min(captureConfig.width, video.videoWidth || captureConfig.width);
+      const height = video.videoWidth
+        ? Math.round(width * video.videoHeight / video.videoWidth)
+        : Math.round(width * 9 / 16);
+      const imageSrc = webcamRef.current.getScreenshot({ width, height });
       if (!imageSrc) return;
 
       const response = await axios.post('http://localhost:5000/predict', {
-        image: imageSrc
-      });
+        image: imageSrc,
+        preview: true
+      }, sessionConfig);
 
       if (response.data.success) {
         setCurrentSymbol(response.data.current_symbol || 'C');
         setSuggestions(response.data.suggestions || ['', '', '', '']);
         setWordSuggestions(response.data.word_suggestions || ['', '', '', '']);
         setSentence(response.data.sentence || '');
+        setCaptureInterval(Math.max(500, response.data.capture_interval_ms || 500));
         
         if (response.data.skeletal_image) {
           setSkeletalImage(response.data.skeletal_image);
@@ -62,7 +91,7 @@ function SignToTextPage() {
       try {
         const response = await axios.post('http://localhost:5000/add_suggestion', {
           suggestion: suggestion
-        });
+        }, sessionConfig);
         
         if (response.data.success) {
           setSentence(response.data.sentence);
@@ -80,7 +109,7 @@ function SignToTextPage() {
       try {
         const response = await axios.post('http://localhost:5000/add_word_suggestion', {
           word: word
-        });
+        }, sessionConfig);
         
         if (response.data.success) {
           setSentence(response.data.sentence);
@@ -101,7 +130,7 @@ function SignToTextPage() {
 
   const handleClear = async () => {
     try {
-      const response = await axios.post('http://localhost:5000/clear_sentence');
+      const response = await axios.post('http://localhost:5000/clear_sentence', null, sessionConfig);
       
       if (response.data.success) {
         setSentence(response.data.sentence);
@@ -121,7 +150,7 @@ function SignToTextPage() {
 
   const handleBackspace = async () => {
     try {
-      const response = await axios.post('http://localhost:5000/delete_last_char');
+      const response = await axios.post('http://localhost:5000/delete_last_char', null, sessionConfig);
       
       if (response.data.success) {
         setSentence(response.data.sentence);
@@ -159,6 +188,7 @@ function SignToTextPage() {
                 ref={webcamRef}
                 audio={false}
                 screenshotFormat="image/jpeg"
+                screenshotQuality={captureConfig.jpeg_quality}
                 videoConstraints={{
                   width: 1280,
                   height: 720,
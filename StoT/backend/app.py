@@ -1,17 +1,43 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 import cv2
 import numpy as np
-import math
 import json
 import base64
 import os
 import time
+import threading
 import traceback
-import pyttsx3
+import queue
+import re
+import atexit
+import contextlib
+import tempfile
 from keras.models import load_model
+from werkzeug.exceptions import RequestEntityTooLarge
 from cvzone.HandTrackingModule import HandDetector
 from string import ascii_uppercase
+from ensemble import build_ensemble
+from batching import MicroBatcher
+from session_state import DEFAULT_SESSION_ID, RecognitionState, SessionStore
+from hand_features import HandFeatures, shape_letter
+from prediction_cache import PredictionCache
+from cascade import CascadeEnsemble
+from fusion import Fusion, default_policy, load_policy
+from trace_store import TraceStore
+from startup import MODEL_FILES, Readiness, load_models, warm_up
+import shared_weights
+from inference_backend import convert_models, top1_agreement
+from hand_tracking import HandTracker, find_hands
+from ingest import decode_frame, mirror_hands, scale_hands
+from latest_frame import LatestFrameWorker
+from metrics import Metrics
+from motion_gate import MotionGate, encoded_thumbnail
+from preprocess import ModelInputs
+from speech import SpeechWorker
+from transcribe import Transcript, batched, video_frames
+from word_completion import CompletionIndex, WordCompleter
+from skeleton import CANVAS_SIZE, render_skeleton, transform_landmarks
 
 # Safe spell checker import
 try:
@@ -26,244 +52,211 @@ except Exception as e:
             return [word]
     spell = SimpleSpellChecker()
 
+# Frequency-ranked completion index over the spell checker's word list
+completer = WordCompleter(CompletionIndex.from_spellchecker(spell),
+                          memo_size=int(os.environ.get('SIGNBRIDGE_COMPLETION_MEMO', '1024')))
+print(f"✓ Word completion index built ({len(completer.index)} words)")
+
+# Optional WebSocket support for the /stream endpoint
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+    print("flask-sock not installed, /stream WebSocket endpoint disabled")
+
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app) if Sock else None
 
 # Initialize components (exact from webtrial2.py)
 hd = HandDetector(maxHands=2, detectionCon=0.5, minTrackCon=0.5)
+detector_lock = threading.Lock()
 offset = 29
 
 # Get the directory where the script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
-models_dir = os.path.join(script_dir, 'models')
+models_dir = os.environ.get('SIGNBRIDGE_MODELS_DIR', os.path.join(script_dir, 'models'))
 
 print(f"Script directory: {script_dir}")
 print(f"Models directory: {models_dir}")
 
-# Load models (exact from webtrial2.py)
-try:
-    # Load old model for specific letters
-    old_model_path = os.path.join(models_dir, 'isl_model_v2.h5')
-    old_indices_path = os.path.join(models_dir, 'class_indices.json')
-    
-    if os.path.exists(old_model_path):
-        old_model = load_model(old_model_path)
-        with open(old_indices_path, 'r') as f:
-            old_class_indices = json.load(f)
-        print("✓ Loaded old model successfully")
-    else:
-        print(f"❌ Old model not found at: {old_model_path}")
-        old_model = None
-        old_class_indices = {}
-    
-    # Load best skeletal model
-    best_model_path = os.path.join(models_dir, 'best_skeletal_model.h5')
-    best_indices_path = os.path.join(models_dir, 'skeletal_class_indices.json')
-    
-    if os.path.exists(best_model_path):
-        best_model = load_model(best_model_path)
-        with open(best_indices_path, 'r') as f:
-            best_class_indices = json.load(f)
-        print("✓ Loaded best skeletal model successfully")
-    else:
-        print(f"❌ Best model not found at: {best_model_path}")
-        best_model = None
-        best_class_indices = {}
-    
-    # Load big skeletal model
-    big_model_path = os.path.join(models_dir, 'big_skeletal_model.h5')
-    big_indices_path = os.path.join(models_dir, 'skeletal_class_indices2.json')
-    
-    if os.path.exists(big_model_path):
-        big_model = load_model(big_model_path)
-        with open(big_indices_path, 'r') as f:
-            big_class_indices = json.load(f)
-        print("✓ Loaded big skeletal model successfully")
-    else:
-        print(f"❌ Big model not found at: {big_model_path}")
-        big_model = None
-        big_class_indices = {}
-    
-    # Check if at least one model loaded
-    if not any([old_model, best_model, big_model]):
-        print("❌ No models could be loaded!")
-    else:
-        print("✓ At least one model loaded successfully")
-        
-except Exception as e:
-    print(f"Error loading models: {str(e)}")
-    traceback.print_exc()
+# Per-stage latency histograms and frame counters served on /metrics (off: no-op timers)
+metrics = Metrics(enabled=os.environ.get('SIGNBRIDGE_METRICS', '0') == '1')
+
+def count_dropped(reason):
+    metrics.inc('dropped_frames', 'Frames that did not reach the models', 'reason', reason)
+
+# Inference engine for the three models: 'fused' (one compiled graph call) or 'sequential'
+ENSEMBLE_MODE = os.environ.get('SIGNBRIDGE_ENSEMBLE', 'fused')
+# Render model inputs directly at 256/224 instead of resizing the 400x400 canvas. Off by default:
+# the models were trained on resized 400x400 canvases and native strokes differ from them
+NATIVE_RENDER = os.environ.get('SIGNBRIDGE_NATIVE_RENDER', '0') == '1'
+MODEL_INPUT_SIZES = (256, 224)
+# Preallocated input buffers (a small pool shared by all request threads), one per model input resolution
+model_inputs = ModelInputs(MODEL_INPUT_SIZES, NATIVE_RENDER)
+# Skeletal preview in /predict responses is opt-in: 'off', 'image' or 'landmarks'
+PREVIEW_MODES = ('off', 'image', 'landmarks')
+DEFAULT_PREVIEW = {
+    'mode': os.environ.get('SIGNBRIDGE_PREVIEW', 'off'),
+    'size': int(os.environ.get('SIGNBRIDGE_PREVIEW_SIZE', '400')),
+    'quality': int(os.environ.get('SIGNBRIDGE_PREVIEW_QUALITY', '80')),
+}
+# Prediction cache for held poses: max entries (0 disables) and quantization tolerance
+# as a fraction of the 400x400 skeleton canvas (0 only reuses identical skeletons)
+PREDICTION_CACHE_SIZE = int(os.environ.get('SIGNBRIDGE_PREDICTION_CACHE', '256'))
+PREDICTION_CACHE_TOLERANCE = float(os.environ.get('SIGNBRIDGE_CACHE_TOLERANCE', '0'))
+prediction_cache = (PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TOLERANCE)
+                    if PREDICTION_CACHE_SIZE > 0 else None)
+# Frame ingest: uploads at least twice this wide are decoded at 1/2 or 1/4 scale (0 disables),
+# and hands are detected on the unflipped frame and mirrored as coordinates
+DECODE_MIN_WIDTH = int(os.environ.get('SIGNBRIDGE_DECODE_WIDTH', '640'))
+MIRROR_LANDMARKS = os.environ.get('SIGNBRIDGE_MIRROR_LANDMARKS', '1') == '1'
+# Capture size and JPEG quality (0-1) advertised to clients by /capture_config
+CAPTURE_WIDTH = int(os.environ.get('SIGNBRIDGE_CAPTURE_WIDTH', '640'))
+CAPTURE_QUALITY = float(os.environ.get('SIGNBRIDGE_CAPTURE_QUALITY', '0.8'))
+# ROI hand tracking: search a padded crop around the last hands, with a full-frame
+# re-detection every SIGNBRIDGE_REDETECT_INTERVAL frames or when a hand is lost
+TRACKING_ENABLED = os.environ.get('SIGNBRIDGE_TRACKING', '0') == '1'
+REDETECT_INTERVAL = int(os.environ.get('SIGNBRIDGE_REDETECT_INTERVAL', '10'))
+TRACK_PADDING = float(os.environ.get('SIGNBRIDGE_TRACK_PADDING', '0.5'))
+# Cascade mode: model order (cheapest first) and the confidence needed to stop early.
+# Stopping early can change the vote on frames where a skipped model would have
+# overridden it (see cascade.py), so it also needs SIGNBRIDGE_CASCADE_APPROXIMATE=1
+CASCADE_ENABLED = os.environ.get('SIGNBRIDGE_CASCADE', '0') == '1'
+CASCADE_APPROXIMATE = os.environ.get('SIGNBRIDGE_CASCADE_APPROXIMATE', '0') == '1'
+CASCADE_ORDER = tuple(os.environ.get('SIGNBRIDGE_CASCADE_ORDER', 'best,big,old').split(','))
+CASCADE_THRESHOLD = float(os.environ.get('SIGNBRIDGE_CASCADE_THRESHOLD', '0.95'))
+# Cross-request micro-batching: collection window in ms (0 disables) and max frames per batch
+BATCH_WINDOW_MS = float(os.environ.get('SIGNBRIDGE_BATCH_WINDOW_MS', '0'))
+BATCH_MAX_FRAMES = int(os.environ.get('SIGNBRIDGE_BATCH_MAX', '16'))
+# Latest-frame-wins inference: /predict and /predict/frame leave their frame in the session's
+# single-slot mailbox for background workers and answer at once with the latest finished result
+ASYNC_INFERENCE = os.environ.get('SIGNBRIDGE_ASYNC_INFERENCE', '0') == '1'
+ASYNC_WORKERS = int(os.environ.get('SIGNBRIDGE_ASYNC_WORKERS', '2'))
+# Motion gate: frames whose 1/8-scale grayscale thumbnail barely differs from the last detected
+# frame reuse its hands instead of being decoded and searched again; after GATE_IDLE_AFTER seconds
+# without hands, responses suggest a slower capture interval to the client
+MOTION_GATE = os.environ.get('SIGNBRIDGE_MOTION_GATE', '0') == '1'
+GATE_PIXEL_THRESHOLD = int(os.environ.get('SIGNBRIDGE_GATE_PIXEL_THRESHOLD', '8'))
+GATE_CHANGED_FRACTION = float(os.environ.get('SIGNBRIDGE_GATE_CHANGED_FRACTION', '0.005'))
+GATE_REFRESH = float(os.environ.get('SIGNBRIDGE_GATE_REFRESH', '1.0'))
+GATE_IDLE_AFTER = float(os.environ.get('SIGNBRIDGE_GATE_IDLE_AFTER', '3.0'))
+GATE_IDLE_INTERVAL_MS = int(os.environ.get('SIGNBRIDGE_GATE_IDLE_INTERVAL_MS', '1000'))
+# Landmark traces: each frame's hands, timestamp and the models' probabilities are appended to a
+# memory-mappable store in this directory, one segment per session ('' disables, see trace_store.py)
+TRACE_DIR = os.environ.get('SIGNBRIDGE_TRACE_DIR', '')
+TRACE_FLUSH_FRAMES = int(os.environ.get('SIGNBRIDGE_TRACE_FLUSH_FRAMES', '256'))
+trace_store = TraceStore(TRACE_DIR, TRACE_FLUSH_FRAMES) if TRACE_DIR else None
+if trace_store is not None:
+    atexit.register(trace_store.close)
+    print(f"✓ Recording landmark traces to {TRACE_DIR}")
+# Video transcription (/transcribe): frames kept per second of video, frames per forward pass
+# and the largest accepted upload
+TRANSCRIBE_FPS = float(os.environ.get('SIGNBRIDGE_TRANSCRIBE_FPS', '10'))
+TRANSCRIBE_BATCH = int(os.environ.get('SIGNBRIDGE_TRANSCRIBE_BATCH', '32'))
+TRANSCRIBE_MAX_BYTES = int(os.environ.get('SIGNBRIDGE_TRANSCRIBE_MAX_MB', '200')) * 1024 * 1024
+# No request body may be larger than a video upload (also enforced while parsing chunked uploads)
+app.config['MAX_CONTENT_LENGTH'] = TRANSCRIBE_MAX_BYTES
+# Startup: concurrent loading, optional cache of Keras-format model copies
+# ('' disables) and warm-up forward passes before the worker reports ready
+MODEL_CACHE_DIR = os.environ.get('SIGNBRIDGE_MODEL_CACHE_DIR', '')
+MODEL_LOAD_WORKERS = int(os.environ.get('SIGNBRIDGE_LOAD_WORKERS', '3'))
+WARMUP_PASSES = int(os.environ.get('SIGNBRIDGE_WARMUP_PASSES', '1'))
+# Start up in a background thread, so /health answers while /ready reports progress
+BACKGROUND_STARTUP = os.environ.get('SIGNBRIDGE_BACKGROUND_STARTUP', '1') == '1'
+readiness = Readiness()
+
+# Inference backend: 'keras' runs the .h5 models, 'tflite' / 'onnx' run exports of them
+# (optionally 'float16' / 'int8' quantized) cached in SIGNBRIDGE_BACKEND_DIR
+INFERENCE_BACKEND = os.environ.get('SIGNBRIDGE_BACKEND', 'keras')
+BACKEND_QUANTIZE = os.environ.get('SIGNBRIDGE_QUANTIZE', 'none')
+BACKEND_DIR = os.environ.get('SIGNBRIDGE_BACKEND_DIR', os.path.join(models_dir, 'runtime'))
+# Canvases for the startup top-1 parity check of the backend against Keras (0 skips it)
+BACKEND_PARITY_SAMPLES = int(os.environ.get('SIGNBRIDGE_BACKEND_PARITY', '0'))
+backend_report = {'backend': 'keras', 'quantize': 'none'}
+# CPU threads per TFLite interpreter / ONNX Runtime session (0: the runtime's default);
+# serve.py sets it per worker so that workers do not oversubscribe the cores
+RUNTIME_THREADS = int(os.environ.get('SIGNBRIDGE_INTRA_OP_THREADS', '0'))
+
+# Set by start_up(); the models are published last, once the engines are warmed up
+old_model = best_model = big_model = None
+old_class_indices, best_class_indices, big_class_indices = {}, {}, {}
+ensemble = None
+cascade = None
+fusion = None
 
 # Define which model works better for which letters (exact from webtrial2.py)
 old_model_letters = ['A', 'T', 'B', 'X']
 best_model_letters = ['B', 'C', 'G', 'I', 'J', 'L', 'M', 'S', 'V', 'X','Z','Q','R']
 big_model_letters = ['D', 'F', 'G', 'H', 'J', 'K', 'L', 'M', 'N', 'O', 'P','U', 'V', 'W','Y','R']
 
-# Initialize text-to-speech engine
-try:
-    speak_engine = pyttsx3.init()
-    speak_engine.setProperty("rate", 100)
-    voices = speak_engine.getProperty("voices")
-    if voices:
-        speak_engine.setProperty("voice", voices[0].id)
-    print("✓ TTS engine initialized")
-except Exception as e:
-    print(f"TTS initialization error: {e}")
-    speak_engine = None
-
-# Global variables for tracking state (EXACT from webtrial2.py)
-current_symbol = "C"
-prev_char = " "
-str_text = " "
-count = -1
-ten_prev_char = [" "] * 10
-last_next_time = 0
-next_gesture_counter = 0
-last_valid_symbol = ""
-
-# Word suggestion variables (exact from webtrial2.py)
-word1 = " "
-word2 = " "
-word3 = " "
-word4 = " "
-word1_sug = " "
-word2_sug = " "
-word3_sug = " "
-word4_sug = " "
-
-# Additional timing variables for gesture detection
-last_prediction_time = 0
-gesture_start_time = 0
-consistent_gesture_count = 0
-last_gesture_type = ""
-
-last_appended_symbol = ""  # Track the last symbol that was appended to prevent duplicates
-
-# Add these global variables at the top with other globals (around line 108)
-# Additional variables for prediction indices
-current_top3_idx = [0, 1, 2]  # Default fallback indices
-last_used_model = "big"  # Track which model was used
-
-def distance(x, y):
-    """Calculate distance between two points (exact from webtrial2.py)"""
-    return math.sqrt(((x[0] - y[0]) ** 2) + ((x[1] - y[1]) ** 2))
-
-def is_finger_straight(finger_points):
-    """Check if a finger is straight by analyzing angles between joints (exact from webtrial2.py)"""
-    try:
-        angle1 = calculate_angle(finger_points[0], finger_points[1], finger_points[2])
-        angle2 = calculate_angle(finger_points[1], finger_points[2], finger_points[3])
-        return angle1 > 160 and angle2 > 160
-    except:
-        return False
+# Letters with dedicated voting rules (EXACT from webtrial2.py)
+special_letters = ['F','Q','R','D','K', 'T', 'P','W','I']
+sgop_letters = ['G', 'O', 'P', 'S']
 
-def calculate_angle(p1, p2, p3):
-    """Calculate angle between three points (exact from webtrial2.py)"""
-    try:
-        v1 = np.array([p1[0] - p2[0], p1[1] - p2[1]])
-        v2 = np.array([p3[0] - p2[0], p3[1] - p2[1]])
-        angle = np.degrees(np.arccos(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))))
-        return angle
-    except:
-        return 0
-
-def calculate_curl(finger_points):
-    """Calculate how much a finger is curled (exact from webtrial2.py)"""
-    try:
-        start = np.array(finger_points[0])
-        mid = np.array(finger_points[2])
-        end = np.array(finger_points[3])
-        return calculate_angle(start, mid, end)
-    except:
-        return 0
+# Ensemble fusion policy: the voting rules above, or a JSON list of rules from this file
+FUSION_POLICY_FILE = os.environ.get('SIGNBRIDGE_FUSION_POLICY', '')
+fusion_policy = (load_policy(FUSION_POLICY_FILE) if FUSION_POLICY_FILE else
+                 default_policy(special_letters, sgop_letters,
+                                {'old': old_model_letters, 'best': best_model_letters, 'big': big_model_letters}))
+
+# Text-to-speech worker: owns the engine on its own thread, fed by a bounded queue,
+# and caches WAV renderings on disk keyed by text, voice and rate
+def create_speech_worker():
+    return SpeechWorker(
+        rate=100,
+        voice=0,
+        queue_size=int(os.environ.get('SIGNBRIDGE_TTS_QUEUE', '8')),
+        cache_dir=os.environ.get('SIGNBRIDGE_TTS_CACHE_DIR', os.path.join(script_dir, 'speech_cache')),
+        cache_entries=int(os.environ.get('SIGNBRIDGE_TTS_CACHE_SIZE', '256')),
+    )
+
+speech = create_speech_worker()
+
+# Per-signer recognition state, selected by the X-Session-ID header, the
+# signbridge_session cookie or a ?session= query parameter (requests without
+# any of them share the default session)
+SESSION_HEADER = 'X-Session-ID'
+SESSION_COOKIE = 'signbridge_session'
+sessions = SessionStore(
+    shards=int(os.environ.get('SIGNBRIDGE_SESSION_SHARDS', '16')),
+    idle_timeout=float(os.environ.get('SIGNBRIDGE_SESSION_IDLE_TIMEOUT', '1800')),
+    preview_options=DEFAULT_PREVIEW,
+)
+
+def get_session_id():
+    """Return the session id for the current request"""
+    session_id = (request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+                  or request.args.get('session'))  # Browsers cannot set WebSocket headers
+    return session_id.strip() if session_id and session_id.strip() else DEFAULT_SESSION_ID
 
 def analyze_hand_shape(landmarks):
-    """Analyze hand shape to distinguish between similar letters (exact from webtrial2.py)"""
+    """Analyze hand shape to distinguish between similar letters (exact rules from webtrial2.py)"""
     try:
-        if len(landmarks) == 42:  # Two hands detected
-            hand1 = landmarks[:21]
-            hand2 = landmarks[21:]
-            
-            is_d = check_two_handed_d(hand1, hand2)
-            if is_d:
-                print("Detected two-handed 'D' gesture")
-                return 'D'
-            return None
-        
-        palm_width = distance(landmarks[5], landmarks[17])
-        
-        features = {
-            'thumb_angle': calculate_angle(landmarks[0], landmarks[2], landmarks[4]),
-            'index_straight': is_finger_straight(landmarks[5:9]),
-            'middle_straight': is_finger_straight(landmarks[9:13]),
-            'ring_curl': calculate_curl(landmarks[13:17]),
-            'pinky_curl': calculate_curl(landmarks[17:21]),
-            'index_middle_distance': distance(landmarks[8], landmarks[12]),
-            'index_tip_y': landmarks[8][1],
-            'middle_tip_y': landmarks[12][1],
-            'index_middle_angle': calculate_angle(landmarks[5], landmarks[9], landmarks[12]),
-            'index_middle_parallel': abs(calculate_angle(landmarks[6], landmarks[8], [landmarks[8][0], landmarks[8][1]-10]) - 
-                                      calculate_angle(landmarks[10], landmarks[12], [landmarks[12][0], landmarks[12][1]-10])),
-            'ring_pinky_separation': distance(landmarks[16], landmarks[20]) / palm_width,
-            'middle_ring_separation': distance(landmarks[12], landmarks[16]) / palm_width,
-        }
-        
-        is_d = (
-            features['index_straight'] and
-            features['middle_straight'] and
-            features['ring_curl'] > 30 and
-            features['pinky_curl'] > 30 and
-            abs(features['index_tip_y'] - features['middle_tip_y']) < palm_width * 0.2 and
-            features['index_middle_distance'] < palm_width * 0.3 and
-            features['index_middle_angle'] < 25 and
-            features['index_middle_parallel'] < 20 and
-            features['middle_ring_separation'] > 0.3 and
-            features['ring_pinky_separation'] < 0.4
-        )
-        
-        if is_d:
-            print("Detected single-handed 'D' gesture")
-            return 'D'
-        elif features['index_straight'] and not features['middle_straight']:
-            return 'B'
-        elif all(features[f'{finger}_curl'] > 45 for finger in ['ring', 'pinky']):
-            return 'O'
-        elif features['thumb_angle'] > 45:
-            return 'Z'
-        else:
-            return 'C'
-            
+        letter = shape_letter(landmarks)
+        if letter == 'D':
+            print("Detected two-handed 'D' gesture" if len(landmarks) == 42 else "Detected single-handed 'D' gesture")
+        return letter
+
     except Exception as e:
         print(f"Error in hand shape analysis: {str(e)}")
         return None
 
 def check_two_handed_d(hand1, hand2):
-    """Check for two-handed D gesture (exact from webtrial2.py)"""
+    """Check for two-handed D gesture: one hand index-up, the other a C shape"""
     try:
-        return (is_index_up_hand(hand1) and is_c_shape_hand(hand2)) or \
-               (is_index_up_hand(hand2) and is_c_shape_hand(hand1))
+        features = HandFeatures([hand1, hand2])
+        index_up = features.is_index_up()
+        c_shape = features.is_c_shape()
+        return bool((index_up[0] and c_shape[1]) or (index_up[1] and c_shape[0]))
     except Exception as e:
         print(f"Error in two-handed D detection: {str(e)}")
         return False
 
 def is_index_up_hand(landmarks):
-    """Check if hand is showing index finger up (exact from webtrial2.py)"""
+    """Check if hand is showing index finger up (exact rules from webtrial2.py)"""
     try:
-        index_straight = is_finger_straight(landmarks[5:9])
-        middle_curl = calculate_curl(landmarks[9:13])
-        ring_curl = calculate_curl(landmarks[13:17])
-        pinky_curl = calculate_curl(landmarks[17:21])
-        
-        index_vertical = abs(landmarks[8][0] - landmarks[5][0]) < 30
-        
-        is_valid = (
-            index_straight and
-            middle_curl > 30 and
-            ring_curl > 30 and
-            pinky_curl > 30 and
-            index_vertical
-        )
-        
+        is_valid = bool(HandFeatures(landmarks).is_index_up())
         if is_valid:
             print("Detected index up hand")
         return is_valid
@@ -272,24 +265,9 @@ def is_index_up_hand(landmarks):
         return False
 
 def is_c_shape_hand(landmarks):
-    """Check if hand is making a C shape (exact from webtrial2.py)"""
+    """Check if hand is making a C shape (exact rules from webtrial2.py)"""
     try:
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-        middle_tip = landmarks[12]
-        ring_tip = landmarks[16]
-        pinky_tip = landmarks[20]
-        
-        all_fingers_curved = all(
-            30 < calculate_curl(landmarks[i:i+4]) < 120
-            for i in [5, 9, 13, 17]
-        )
-        
-        tips_y_sorted = sorted([thumb_tip[1], index_tip[1], middle_tip[1], ring_tip[1], pinky_tip[1]])
-        tips_form_curve = abs(tips_y_sorted[-1] - tips_y_sorted[0]) < 100
-        
-        is_valid = all_fingers_curved and tips_form_curve
-        
+        is_valid = bool(HandFeatures(landmarks).is_c_shape())
         if is_valid:
             print("Detected C shape hand")
         return is_valid
@@ -297,11 +275,51 @@ def is_c_shape_hand(landmarks):
         print(f"Error checking C shape hand: {str(e)}")
         return False
 
-def predict(test_image, hands):
-    """EXACT prediction function from webtrial2.py"""
-    global current_symbol, prev_char, str_text, count, ten_prev_char, last_valid_symbol
-    global word1, word2, word3, word4, word1_sug, word2_sug, word3_sug, word4_sug
-    global current_top3_idx, last_used_model  # Add these globals
+def run_ensemble(inputs):
+    """Run the three models on the prepared inputs and return their probability vectors"""
+    # Proceed with normal letter recognition (EXACT from webtrial2.py);
+    # the old and big models share the normalised 256x256 input
+    old_batch, best_batch, big_batch = ensemble((inputs[256], inputs[224], inputs[256]))
+    old_predictions = old_batch[0]
+    best_predictions = best_batch[0]
+    big_predictions = big_batch[0]
+    return old_predictions, best_predictions, big_predictions
+
+def build_fusion():
+    """Fusion of the three models' outputs with their class labels, under the configured policy"""
+    return Fusion({'old': old_class_indices.keys(), 'best': best_class_indices.keys(),
+                   'big': big_class_indices.keys()}, fusion_policy)
+
+def vote(old_predictions, best_predictions, big_predictions):
+    """Voting over the three models' probabilities (the webtrial2.py rules by default, see fusion.py).
+
+    Returns ``(symbol, top3_idx, model_used)``, or None when no model is
+    confident enough to change the current symbol.
+    """
+    try:
+        result = fusion.evaluate(np.stack((old_predictions, best_predictions, big_predictions)))
+
+        # Print confidence scores for debugging
+        for name, letter, confidence in zip(result.names, result.letters[0], result.confidences[0]):
+            print(f"{name.capitalize()} model prediction: {letter} with confidence: {confidence:.2f}")
+        decision = result.decision()
+        if decision is not None:
+            print(f"Using {decision[2]} model for letter: {decision[0]} ({result.rules[0]} rule)")
+        return decision
+
+    except Exception as e:
+        print(f"Error in voting: {str(e)}")
+        traceback.print_exc()
+        return None
+
+def predict(state, points, hands, prediction=None):
+    """EXACT prediction function from webtrial2.py for the skeleton at ``points``.
+
+    ``prediction`` is an already computed ``(probabilities, decision)`` pair
+    (see predict_batch) to use instead of running the models. Returns the
+    models' probability vectors (None for a model the cascade skipped), or
+    None when no prediction was made.
+    """
     
     try:
         # First check if hands are detected
@@ -311,599 +329,978 @@ def predict(test_image, hands):
         # Check if all models are loaded
         if not all([old_model, best_model, big_model]):
             print("Some models not loaded, skipping prediction")
+            count_dropped('no_models')
             return
 
-        # Proceed with normal letter recognition (EXACT from webtrial2.py)
-        old_input = cv2.resize(test_image, (256, 256))
-        old_input = old_input.astype(np.float32) / 255.0
-        
-        best_input = cv2.resize(test_image, (224, 224))
-        best_input = best_input.astype(np.float32) / 255.0
-        
-        big_input = cv2.resize(test_image, (256, 256))
-        big_input = big_input.astype(np.float32) / 255.0
-        
-        # Get predictions from all models
-        old_predictions = old_model.predict(old_input.reshape(1, 256, 256, 3), verbose=0)[0]
-        best_predictions = best_model.predict(best_input.reshape(1, 224, 224, 3), verbose=0)[0]
-        big_predictions = big_model.predict(big_input.reshape(1, 256, 256, 3), verbose=0)[0]
-        
-        # Get top predictions from all models
-        old_top3_idx = np.argsort(old_predictions)[-3:][::-1]
-        best_top3_idx = np.argsort(best_predictions)[-3:][::-1]
-        big_top3_idx = np.argsort(big_predictions)[-3:][::-1]
-        
-        old_predicted_letter = list(old_class_indices.keys())[old_top3_idx[0]]
-        best_predicted_letter = list(best_class_indices.keys())[best_top3_idx[0]]
-        big_predicted_letter = list(big_class_indices.keys())[big_top3_idx[0]]
-        
-        # Print confidence scores for debugging
-        print(f"Old model prediction: {old_predicted_letter} with confidence: {old_predictions[old_top3_idx[0]]:.2f}")
-        print(f"Best model prediction: {best_predicted_letter} with confidence: {best_predictions[best_top3_idx[0]]:.2f}")
-        print(f"Big model prediction: {big_predicted_letter} with confidence: {big_predictions[big_top3_idx[0]]:.2f}")
-        
-        # Check for special letters (EXACT logic from webtrial2.py)
-        special_letters = ['F','Q','R','D','K', 'T', 'P','W','I']
-        predicted_letters = [old_predicted_letter, best_predicted_letter, big_predicted_letter]
-        
-        # Initialize defaults
-        top3_idx = big_top3_idx
-        model_used = "big"
-        
-        # First check for S with G or O or P combinations
-        if 'S' in predicted_letters and all(letter in ['G', 'O', 'P', 'S'] for letter in predicted_letters):
-            s_predictions = []
-            if old_predicted_letter == 'S':
-                s_predictions.append((old_predictions[old_top3_idx[0]], old_predictions, old_top3_idx, 'old'))
-            if best_predicted_letter == 'S':
-                s_predictions.append((best_predictions[best_top3_idx[0]], best_predictions, best_top3_idx, 'best'))
-            if big_predicted_letter == 'S':
-                s_predictions.append((big_predictions[big_top3_idx[0]], big_predictions, big_top3_idx, 'big'))
-            
-            if s_predictions:
-                conf, preds, idx, model_name = max(s_predictions, key=lambda x: x[0])
-                print(f"Detected S with G/O/P combination, using {model_name} model's prediction with confidence: {conf:.2f}")
-                current_symbol = 'S'
-                predictions = preds
-                top3_idx = idx
-                model_used = model_name
+        # Held poses give identical (or, with a tolerance, near-identical) skeletons;
+        # reuse the probabilities and voting outcome cached for them
+        key = prediction_cache.key(points) if prediction_cache is not None and prediction is None else None
+        cached = prediction_cache.get(key) if key is not None else None
+        if prediction is not None:
+            probabilities, decision = prediction
+            metrics.inc('predictions', 'Letter predictions', 'source', 'batch')
+        elif cached is not None:
+            probabilities, decision = cached
+            metrics.inc('predictions', 'Letter predictions', 'source', 'cache')
         else:
-            # Check for other special letters
-            for special_letter in special_letters:
-                if special_letter in predicted_letters:
-                    special_predictions = []
-                    if old_predicted_letter == special_letter:
-                        special_predictions.append((old_predictions[old_top3_idx[0]], old_predictions, old_top3_idx, 'old'))
-                    if best_predicted_letter == special_letter:
-                        special_predictions.append((best_predictions[best_top3_idx[0]], best_predictions, best_top3_idx, 'best'))
-                    if big_predicted_letter == special_letter:
-                        special_predictions.append((big_predictions[big_top3_idx[0]], big_predictions, big_top3_idx, 'big'))
-                    
-                    if special_predictions:
-                        conf, preds, idx, model_name = max(special_predictions, key=lambda x: x[0])
-                        if conf > 0.8:
-                            print(f"Detected {special_letter} with confidence: {conf:.2f} from {model_name} model")
-                            current_symbol = special_letter
-                            predictions = preds
-                            top3_idx = idx
-                            model_used = model_name
-                            break
-                        else:
-                            return
-            else:
-                # EXACT majority voting logic from webtrial2.py
-                all_predictions = [
-                    (old_predictions[old_top3_idx[0]], old_predicted_letter, old_predictions, old_top3_idx, 'old'),
-                    (best_predictions[best_top3_idx[0]], best_predicted_letter, best_predictions, best_top3_idx, 'best'),
-                    (big_predictions[big_top3_idx[0]], big_predicted_letter, big_predictions, big_top3_idx, 'big')
-                ]
-                
-                perfect_predictions = [pred for pred in all_predictions if pred[0] == 1.0]
-                if perfect_predictions:
-                    other_predictions = [pred for pred in all_predictions if pred[0] != 1.0]
-                    if len(other_predictions) >= 2:
-                        other_letters = [pred[1] for pred in other_predictions]
-                        if len(set(other_letters)) == 1:
-                            print(f"Two models agree on {other_letters[0]}, but one model has perfect confidence for {perfect_predictions[0][1]}")
-                            conf, letter, preds, idx, model_name = perfect_predictions[0]
-                            print(f"Using {model_name} model with perfect confidence for letter: {letter}")
-                            current_symbol = letter
-                            predictions = preds
-                            top3_idx = idx
-                            model_used = model_name
-                        else:
-                            conf, letter, preds, idx, model_name = perfect_predictions[0]
-                            print(f"Using {model_name} model with perfect confidence for letter: {letter}")
-                            current_symbol = letter
-                            predictions = preds
-                            top3_idx = idx
-                            model_used = model_name
-                    else:
-                        conf, letter, preds, idx, model_name = perfect_predictions[0]
-                        print(f"Using {model_name} model with perfect confidence for letter: {letter}")
-                        current_symbol = letter
-                        predictions = preds
-                        top3_idx = idx
-                        model_used = model_name
+            with metrics.time('render'):
+                inputs = model_inputs.prepare_one(points)
+            with inputs:  # Hands the pooled input buffers back once the models have run
+                if cascade is not None:
+                    with metrics.time('inference'):
+                        probabilities, decision = cascade(inputs)
                 else:
-                    letter_counts = {}
-                    for conf, letter, preds, idx, model_name in all_predictions:
-                        if letter not in letter_counts:
-                            letter_counts[letter] = []
-                        letter_counts[letter].append((conf, preds, idx, model_name))
-                    
-                    majority_letters = {letter: votes for letter, votes in letter_counts.items() if len(votes) >= 2}
-                    
-                    if majority_letters:
-                        best_letter = max(majority_letters.items(), 
-                                        key=lambda x: sum(vote[0] for vote in x[1]) / len(x[1]))
-                        letter, votes = best_letter
-                        conf, preds, idx, model_name = max(votes, key=lambda x: x[0])
-                        if conf > 0.8:
-                            print(f"Majority vote: {len(votes)} models agree on {letter} (using {model_name} model's prediction)")
-                            current_symbol = letter
-                            predictions = preds
-                            top3_idx = idx
-                            model_used = model_name
-                        else:
-                            return
-                    else:
-                        all_predictions = []
-                        if old_predicted_letter in old_model_letters:
-                            all_predictions.append((old_predictions[old_top3_idx[0]], old_predicted_letter, old_predictions, old_top3_idx, 'old'))
-                        if best_predicted_letter in best_model_letters:
-                            all_predictions.append((best_predictions[best_top3_idx[0]], best_predicted_letter, best_predictions, best_top3_idx, 'best'))
-                        if big_predicted_letter in big_model_letters:
-                            all_predictions.append((big_predictions[big_top3_idx[0]], big_predicted_letter, big_predictions, big_top3_idx, 'big'))
-                        
-                        if not all_predictions:
-                            return
-                        
-                        all_predictions.sort(key=lambda x: x[0], reverse=True)
-                        conf, letter, preds, idx, model_name = all_predictions[0]
-                        if conf > 0.8:
-                            print(f"Using {model_name} model (highest confidence) for letter: {letter}")
-                            current_symbol = letter
-                            predictions = preds
-                            top3_idx = idx
-                            model_used = model_name
-                        else:
-                            return
+                    with metrics.time('inference'):
+                        probabilities = run_ensemble(inputs)
+            if cascade is None:
+                with metrics.time('vote'):
+                    decision = vote(*probabilities)
+            metrics.inc('predictions', 'Letter predictions', 'source', 'models')
+            if key is not None:
+                prediction_cache.put(key, (probabilities, decision))
+
+        if decision is None:
+            return probabilities
+        state.current_symbol, top3_idx, model_used = decision
 
         # Update global variables for use in suggestions
-        current_top3_idx = top3_idx
-        last_used_model = model_used
+        state.current_top3_idx = top3_idx
+        state.last_used_model = model_used
         
         # Update previous character and history (EXACT from webtrial2.py)
-        prev_char = current_symbol
-        count += 1
-        ten_prev_char[count % 10] = current_symbol
-        if current_symbol not in [" ", "SPACE", "NEXT", ""]:
-            last_valid_symbol = current_symbol
+        state.prev_char = state.current_symbol
+        state.count += 1
+        state.ten_prev_char[state.count % 10] = state.current_symbol
+        if state.current_symbol not in [" ", "SPACE", "NEXT", ""]:
+            state.last_valid_symbol = state.current_symbol
         
         # Update suggestions with the correct indices
-        update_suggestions(top3_idx)
+        with metrics.time('suggestions'):
+            update_suggestions(state, top3_idx)
+        return probabilities
 
     except Exception as e:
         print(f"Error in prediction: {str(e)}")
         traceback.print_exc()
         return
 
-def update_suggestions(top3_idx):
+def predict_batch(skeletons):
+    """``(probabilities, decision)`` for every skeleton, from one forward pass per model"""
+    with model_inputs.prepare(skeletons) as inputs, metrics.time('inference'):
+        old_batch, best_batch, big_batch = ensemble((inputs[256], inputs[224], inputs[256]))
+    with metrics.time('vote'):
+        result = fusion.evaluate(np.stack((old_batch, best_batch, big_batch), axis=1))
+    return [((old_batch[i], best_batch[i], big_batch[i]), result.decision(i)) for i in range(len(skeletons))]
+
+def build_engines(models, ensemble_mode):
+    """The ensemble engine (micro-batched if configured) and the cascade, or None, over ``models``"""
+    # Per-model latency for the engines that call the models directly (the fused graph is timed whole)
+    engine_models = models
+    if ensemble_mode != 'fused':
+        engine_models = tuple(metrics.instrument_model(name, model)
+                              for name, model in zip(MODEL_FILES, engine_models))
+    engine = build_ensemble(ensemble_mode, engine_models)
+    if BATCH_WINDOW_MS > 0:
+        engine = MicroBatcher(engine, window_ms=BATCH_WINDOW_MS, max_batch=BATCH_MAX_FRAMES)
+        print(f"✓ Micro-batching enabled ({BATCH_WINDOW_MS:g} ms window, up to {BATCH_MAX_FRAMES} frames)")
+
+    # Confidence-gated cascade: run the models one at a time instead of always all three
+    cascade_engine = None
+    if CASCADE_ENABLED and not CASCADE_APPROXIMATE:
+        print("Cascade mode needs SIGNBRIDGE_CASCADE_APPROXIMATE=1 (it may change decisions); "
+              "running the full ensemble")
+    elif CASCADE_ENABLED:
+        cascade_engine = CascadeEnsemble(
+            models={name: metrics.instrument_model(name, model)
+                    for name, model in zip(MODEL_FILES, models)},
+            input_sizes={'old': 256, 'best': 224, 'big': 256},
+            class_labels={
+                'old': old_class_indices.keys(),
+                'best': best_class_indices.keys(),
+                'big': big_class_indices.keys(),
+            },
+            owned_letters={'old': old_model_letters, 'best': best_model_letters, 'big': big_model_letters},
+            vote=vote,
+            order=CASCADE_ORDER,
+            threshold=CASCADE_THRESHOLD,
+            guarded_letters=special_letters + sgop_letters,
+            approximate=True,
+        )
+        print(f"✓ Cascade mode enabled (order: {', '.join(CASCADE_ORDER)}, threshold: {CASCADE_THRESHOLD})")
+    return engine, cascade_engine
+
+def start_up():
+    """Load the models concurrently, build the inference engines and warm them up"""
+    global old_model, best_model, big_model, old_class_indices, best_class_indices, big_class_indices
+    global ensemble, cascade, fusion
+
+    try:
+        readiness.set('loading')
+        start = time.perf_counter()
+        # Under serve.py, models whose weights the master preloaded are built on that shared copy
+        loaded = load_models(
+            {name: (os.path.join(models_dir, model_file), os.path.join(models_dir, indices_file))
+             for name, (model_file, indices_file) in MODEL_FILES.items()},
+            shared_weights.loader(load_model),
+            cache_dir=None if shared_weights.preloaded else (MODEL_CACHE_DIR or None),
+            max_workers=MODEL_LOAD_WORKERS,
+        )
+        readiness.record('load', time.perf_counter() - start)
+        (old, old_indices), (best, best_indices), (big, big_indices) = (loaded[name] for name in MODEL_FILES)
+        old_class_indices, best_class_indices, big_class_indices = old_indices, best_indices, big_indices
+
+        # Check if at least one model loaded
+        if not any([old, best, big]):
+            print("❌ No models could be loaded!")
+            readiness.set('failed', 'no models could be loaded')
+            return
+        print("✓ At least one model loaded successfully")
+
+        if not all([old, best, big]):
+            old_model, best_model, big_model = old, best, big
+            missing = [name for name, (model, _) in loaded.items() if model is None]
+            readiness.set('failed', f"missing models: {', '.join(missing)}")
+            return
+
+        # Label tables and the compiled voting policy, built once for all frames
+        fusion = build_fusion()
+
+        ensemble_mode = ENSEMBLE_MODE
+        if INFERENCE_BACKEND != 'keras':
+            readiness.set('loading', f'converting models to {INFERENCE_BACKEND}')
+            start = time.perf_counter()
+            try:
+                keras_models = {'old': old, 'best': best, 'big': big}
+                runtime_models = convert_models(
+                    INFERENCE_BACKEND,
+                    keras_models,
+                    {name: os.path.join(models_dir, model_file) for name, (model_file, _) in MODEL_FILES.items()},
+                    BACKEND_DIR,
+                    BACKEND_QUANTIZE,
+                    threads=RUNTIME_THREADS or None,
+                )
+                backend_report.update(backend=INFERENCE_BACKEND, quantize=BACKEND_QUANTIZE)
+                if BACKEND_PARITY_SAMPLES > 0:
+                    agreement = top1_agreement(keras_models, runtime_models, BACKEND_PARITY_SAMPLES)
+                    backend_report['top1_agreement'] = agreement
+                    print("✓ Top-1 agreement with Keras: " +
+                          ", ".join(f"{name} {value:.1%}" for name, value in agreement.items()))
+                old, best, big = (runtime_models[name] for name in MODEL_FILES)
+                ensemble_mode = 'sequential'  # The fused graph is built from Keras models
+            except Exception as e:
+                print(f"{INFERENCE_BACKEND} backend unavailable ({e}), using the Keras models")
+                traceback.print_exc()
+                backend_report['error'] = str(e)
+            readiness.record('convert', time.perf_counter() - start)
+
+        engine, cascade_engine = build_engines((old, best, big), ensemble_mode)
+
+        if WARMUP_PASSES > 0:
+            readiness.set('warming')
+            start = time.perf_counter()
+            warm_up((old, best, big), engine, WARMUP_PASSES)
+            with detector_lock:
+                hd.findHands(np.zeros((480, 640, 3), dtype=np.uint8), draw=False, flipType=True)
+            readiness.record('warm_up', time.perf_counter() - start)
+            print(f"✓ Models warmed up in {readiness.timings['warm_up']:.1f}s")
+
+        ensemble, cascade = engine, cascade_engine
+        old_model, best_model, big_model = old, best, big
+        readiness.set('ready')
+
+    except Exception as e:
+        print(f"Error loading models: {str(e)}")
+        traceback.print_exc()
+        readiness.set('failed', str(e))
+
+if BACKGROUND_STARTUP:
+    threading.Thread(target=start_up, name='signbridge-startup', daemon=True).start()
+else:
+    start_up()
+
+def update_suggestions(state, top3_idx):
     """EXACT update_suggestions function from webtrial2.py"""
-    global current_symbol, str_text
-    global word1, word2, word3, word4, word1_sug, word2_sug, word3_sug, word4_sug
     
     try:
         # Get letter predictions for suggestions - using the correct class indices based on model used
-        if last_used_model == "old":
-            suggestions = [list(old_class_indices.keys())[i] for i in top3_idx]
-        elif last_used_model == "best":
-            suggestions = [list(best_class_indices.keys())[i] for i in top3_idx]
-        else:  # big model (default)
-            suggestions = [list(big_class_indices.keys())[i] for i in top3_idx]
+        suggestions = fusion.label_list(state.last_used_model, top3_idx)
         
-        print(f"Top 3 predictions from {last_used_model} model: {suggestions}")
+        print(f"Top 3 predictions from {state.last_used_model} model: {suggestions}")
 
         # Set initial suggestions as letters (EXACT from webtrial2.py)
-        word1 = suggestions[0] if len(suggestions) > 0 else " "
-        word2 = suggestions[1] if len(suggestions) > 1 else " "
+        state.word1 = suggestions[0] if len(suggestions) > 0 else " "
+        state.word2 = suggestions[1] if len(suggestions) > 1 else " "
         
         # Add specific additional suggestions based on current symbol (EXACT from webtrial2.py)
-        if current_symbol == "T":
-            word3 = "P"  # Set P as third suggestion for T
-            word4 = "F"  # Set F as fourth suggestion for T
-        elif current_symbol == "B":
-            word3 = "W"  # Set W as third suggestion for B
-            word4 = suggestions[2] if len(suggestions) > 2 else " "
+        if state.current_symbol == "T":
+            state.word3 = "P"  # Set P as third suggestion for T
+            state.word4 = "F"  # Set F as fourth suggestion for T
+        elif state.current_symbol == "B":
+            state.word3 = "W"  # Set W as third suggestion for B
+            state.word4 = suggestions[2] if len(suggestions) > 2 else " "
         else:
-            word3 = suggestions[2] if len(suggestions) > 2 else " "
-            if current_symbol == "X":
-                word4 = "E"
-            elif current_symbol == "O":
-                word4 = "Q"
-            elif current_symbol == "W":
-                word4 = "B"
-            elif current_symbol == "C":
-                word4 = "U"
+            state.word3 = suggestions[2] if len(suggestions) > 2 else " "
+            if state.current_symbol == "X":
+                state.word4 = "E"
+            elif state.current_symbol == "O":
+                state.word4 = "Q"
+            elif state.current_symbol == "W":
+                state.word4 = "B"
+            elif state.current_symbol == "C":
+                state.word4 = "U"
             else:
-                word4 = " "
+                state.word4 = " "
 
-        # Get word suggestions based on the current sentence (EXACT from webtrial2.py)
-        current_sentence = str_text.strip()
-        word1_sug = word2_sug = word3_sug = word4_sug = " "
-        
-        if current_sentence:
+        # Word suggestions only depend on the sentence; recompute them when it changed
+        if state.str_text != state.suggestion_text:
+            state.suggestion_text = state.str_text
+            update_word_suggestions(state)
 
-            # EXACT logic from webtrial2.py - find words and get last word
-            words = current_sentence.split()
-            if words:
-                last_word = words[-1].upper()  # Get last word in uppercase
-                print(f"Current last word: '{last_word}'")
-                
-                # Generate word suggestions based on current partial word
-                word_suggestions = []
-                
-                # Common English words starting with current letters (EXACT from webtrial2.py)
-                common_words = {
-                    'A': ['AND', 'ARE', 'ALL', 'ALSO'],
-                    'B': ['BUT', 'BE', 'BEEN', 'BECAUSE'],
-                    'C': ['CAN', 'COME', 'COULD', 'CALL'],
-                    'D': ['DO', 'DID', 'DON\'T', 'DOWN'],
-                    'E': ['EACH', 'EVEN', 'EVERY', 'END'],
-                    'F': ['FOR', 'FROM', 'FIRST', 'FIND'],
-                    'G': ['GET', 'GO', 'GOOD', 'GREAT'],
-                    'H': ['HE', 'HER', 'HIM', 'HOW'],
-                    'I': ['I', 'IN', 'IS', 'IT'],
-                    'J': ['JUST', 'JOB', 'JOIN', 'JUMP'],
-                    'K': ['KNOW', 'KEEP', 'KIND', 'KEY'],
-                    'L': ['LIKE', 'LOOK', 'LAST', 'LONG'],
-                    'M': ['MY', 'ME', 'MORE', 'MAKE'],
-                    'N': ['NO', 'NOT', 'NOW', 'NEW'],
-                    'O': ['OF', 'ON', 'OR', 'ONE'],
-                    'P': ['PEOPLE', 'PLACE', 'PLEASE', 'PUT'],
-                    'Q': ['QUESTION', 'QUITE', 'QUICK', 'QUIET'],
-                    'R': ['RIGHT', 'REALLY', 'ROOM', 'RUN'],
-                    'S': ['SO', 'SHE', 'SEE', 'SOME'],
-                    'T': ['THE', 'TO', 'THAT', 'THIS'],
-                    'U': ['UP', 'US', 'USE', 'UNDER'],
-                    'V': ['VERY', 'VIEW', 'VISIT', 'VOICE'],
-                    'W': ['WE', 'WILL', 'WITH', 'WHAT'],
-                    'X': ['XBOX', 'XRAY', 'EXTRA', 'EXIT'],
-                    'Y': ['YOU', 'YOUR', 'YES', 'YEAR'],
-                    'Z': ['ZONE', 'ZERO', 'ZIP', 'ZOO']
-                }
-                
-                # If current word has only 1-2 letters, suggest common words starting with those letters
-                if len(last_word) <= 2:
-                    first_letter = last_word[0] if last_word else 'A'
-                    if first_letter in common_words:
-                        # Filter words that start with the current partial word
-                        matching_words = [word for word in common_words[first_letter] 
-                                        if word.startswith(last_word)]
-                        word_suggestions.extend(matching_words[:4])
+        return state.suggestions, state.word_suggestions
+
+    except Exception as e:
+        print(f"Error in suggestions: {str(e)}")
+        return [' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ']
+
+def update_word_suggestions(state):
+    """Word suggestions for the last (partial) word of the sentence (rules from webtrial2.py)"""
+    current_sentence = state.str_text.strip()
+    state.word1_sug = state.word2_sug = state.word3_sug = state.word4_sug = " "
+
+    # Find words and get last word
+    words = current_sentence.split()
+    if not words:
+        return
+    last_word = words[-1].upper()  # Get last word in uppercase
+    print(f"Current last word: '{last_word}'")
+
+    word_suggestions = completer.suggest(last_word)
+
+    # Fill word suggestions
+    if word_suggestions:
+        state.word1_sug = word_suggestions[0] if len(word_suggestions) > 0 else " "
+        state.word2_sug = word_suggestions[1] if len(word_suggestions) > 1 else " "
+        state.word3_sug = word_suggestions[2] if len(word_suggestions) > 2 else " "
+        state.word4_sug = word_suggestions[3] if len(word_suggestions) > 3 else " "
+        print(f"Word suggestions: {word_suggestions}")
+
+def detect_hands(frame, tracker=None, frame_size=None, detector=None):
+    """Run hand detection on a camera frame and return (hands, frame shape) in the mirrored
+    webcam view, at the full capture ``frame_size`` (width, height) if the frame was decoded smaller.
+
+    ``detector`` is a HandDetector used by one caller only, instead of the shared one.
+    """
+    height, width = frame.shape[:2]
+    full_width, full_height = frame_size or (width, height)
+
+    if MIRROR_LANDMARKS:
+        # Detect on the unflipped frame, then mirror the coordinates instead of the pixels
+        flip_type = False
+    else:
+        # Flip frame to match webcam mirror view
+        frame = cv2.flip(frame, 1)
+        flip_type = True
+
+    if tracker is not None:
+        hands = tracker.find_hands(frame)
+    elif detector is not None:
+        hands = find_hands(detector, frame, contextlib.nullcontext(), flip_type)
+    else:
+        # The shared detector is not safe to call concurrently
+        hands = find_hands(hd, frame, detector_lock, flip_type)
+
+    hands = scale_hands(hands, full_width / width, full_height / height)
+    if MIRROR_LANDMARKS:
+        hands = mirror_hands(hands, full_width)
+    return hands, (full_height, full_width) + frame.shape[2:]
+
+def detect_frame(state, frame, frame_size=None):
+    """Detect hands on one frame with the session's tracker; returns ``(hands, frame_shape)``"""
+    if TRACKING_ENABLED and state.tracker is None:
+        state.tracker = HandTracker(hd, REDETECT_INTERVAL, TRACK_PADDING, lock=detector_lock,
+                                    flip_type=not MIRROR_LANDMARKS)
+    with metrics.time('detect'):
+        return detect_hands(frame, state.tracker, frame_size)
+
+def process_frame(state, frame, frame_size=None):
+    """Detect hands on one frame, then run the gesture and letter pipeline on them"""
+    hands, frame_shape = detect_frame(state, frame, frame_size)
+    return process_hands(state, hands, frame_shape)
+
+def process_image(state, data):
+    """Decode one encoded frame and run it through the pipeline.
+
+    ``data`` is the encoded image, or a base64 data URL of it. Returns
+    ``(points, display_symbol)``, or None if ``data`` is not an image.
+    With the motion gate on, a frame that barely differs from the last
+    detected one skips the full decode and detection and reuses its hands.
+    """
+    # The 'decode' stage is the base64 decode plus the image decode, when the gate lets it run
+    decode_start = time.perf_counter()
+    if isinstance(data, str):
+        data = base64.b64decode(data.split(',')[1])
+    decode_seconds = time.perf_counter() - decode_start
+
+    gate = None
+    if MOTION_GATE:
+        if state.motion_gate is None:
+            state.motion_gate = MotionGate(GATE_PIXEL_THRESHOLD, GATE_CHANGED_FRACTION, GATE_REFRESH,
+                                           GATE_IDLE_AFTER, GATE_IDLE_INTERVAL_MS)
+        gate = state.motion_gate
+        with metrics.time('gate'):
+            thumbnail = encoded_thumbnail(data)
+        if thumbnail is None:
+            metrics.observe('decode', decode_seconds)
+            count_dropped('invalid')
+            return None
+        if gate.unchanged(thumbnail):
+            metrics.observe('decode', decode_seconds)
+            metrics.inc('gated_frames', 'Frames that reused the previous detection',
+                        'hands', 'present' if gate.hands else 'absent')
+            return process_hands(state, gate.hands, gate.frame_shape)
+
+    decode_start = time.perf_counter()
+    frame, frame_size = decode_frame(data, DECODE_MIN_WIDTH)
+    metrics.observe('decode', decode_seconds + time.perf_counter() - decode_start)
+    if frame is None:
+        count_dropped('invalid')
+        return None
+    hands, frame_shape = detect_frame(state, frame, frame_size)
+    if gate is not None:
+        gate.update(thumbnail, hands, frame_shape)
+    return process_hands(state, hands, frame_shape)
+
+PREDICTION_INTERVAL = 0.1  # Seconds between letter predictions for one signer
+
+def detect_gestures(hands):
+    """``(is_space_gesture, is_next_gesture)`` for a frame's hands (EXACT rules from webtrial2.py)"""
+    if not hands or len(hands) not in (1, 2):
+        return False, False
+    with metrics.time('gestures'):
+        # All landmark geometry for the frame's hands in one vectorized pass
+        features = HandFeatures([hand['lmList'] for hand in hands])
+        if len(hands) == 2:
+            return bool(features.is_open().all()), False
+        # EXACT NEXT gesture rules from webtrial2.py
+        return False, bool(features.is_next([hands[0]['type']])[0])
+
+def process_hands(state, hands, frame_shape, timestamp=None, prediction=None):
+    """Handle SPACE/NEXT gestures and predict for already-detected hands.
+
+    ``timestamp`` replaces the wall clock for the gesture and prediction
+    timing (the video time when replaying a clip), and ``prediction`` is a
+    precomputed ``(probabilities, decision)`` for the frame, if any.
+    Returns ``(points, display_symbol)`` where ``points`` are the skeleton's
+    400x400 canvas coordinates, or None when no skeleton was drawn.
+    """
+    # Skeleton landmarks stay None (blank preview) unless a letter frame is drawn below
+    points = None
+    probabilities = None
+
+    metrics.inc('frames', 'Frames run through the gesture and letter pipeline')
+
+    # EXACT gesture detection logic from webtrial2.py
+    now = time.time() if timestamp is None else timestamp
+    is_space_gesture, is_next_gesture = detect_gestures(hands)
+
+    # IMPROVED gesture handling logic - faster response
+    if is_space_gesture:
+        state.current_symbol = "SPACE"
+        state.last_valid_symbol = "SPACE"
+        # Reset suggestions for space gesture
+        state.clear_suggestions()
+    elif is_next_gesture:
+        # FASTER timing logic - reduced delay and frame requirement
+        if now - state.last_next_time > 0.8:  # Reduced from 2.0 to 0.8 seconds
+            state.next_gesture_counter += 1
+            if state.next_gesture_counter >= 2:  # Reduced from 5 to 2 consistent frames
+                # Check if the symbol to append is different from the last appended symbol
+                symbol_to_append = state.last_valid_symbol
+            
+                if symbol_to_append == "SPACE":
+                    if not state.str_text or not state.str_text[-1].isspace():
+                        state.str_text += " "
+                        state.last_appended_symbol = "SPACE"
+                        print(f"NEXT gesture: Added SPACE to sentence. New sentence: '{state.str_text}'")
+                elif symbol_to_append not in ["", " ", "NEXT"]:
+                    # Only append if it's different from the last appended symbol
+                    if symbol_to_append != state.last_appended_symbol:
+                        state.str_text += symbol_to_append
+                        state.last_appended_symbol = symbol_to_append
+                        print(f"NEXT gesture: Added '{symbol_to_append}' to sentence. New sentence: '{state.str_text}'")
+                    else:
+                        print(f"NEXT gesture: Skipping duplicate '{symbol_to_append}' - already appended")
+            
+                state.last_next_time = now
+                state.next_gesture_counter = 0
+        state.current_symbol = "NEXT"
+    else:
+        state.next_gesture_counter = 0
+        # Only update current_symbol if we're not in a next gesture state
+        if now - state.last_next_time > 0.8:  # Also reduced here
+            if hands:
+                # Skeleton in 400x400 canvas coordinates (see skeleton.py)
+                points = transform_landmarks(hands, frame_shape, offset)
+
+                # Make prediction with timing control
+                current_time = time.time() if timestamp is None else timestamp
+                if current_time - state.last_prediction_time > PREDICTION_INTERVAL:  # Limit predictions to 10 FPS
+                    probabilities = predict(state, points, hands, prediction)
+                    state.last_prediction_time = current_time
                 else:
-                    # For longer words, try pyspellchecker suggestions
-                    try:
-                        candidates = spell.candidates(last_word.lower())
-                        if candidates:
-                            # Filter candidates that start with the partial word
-                            spell_suggestions = [word.upper() for word in candidates 
-                                               if word.upper().startswith(last_word.upper())]
-                            word_suggestions.extend(spell_suggestions[:4])
-                        
-                        # If we still don't have enough suggestions, use common words
-                        if len(word_suggestions) < 4:
-                            first_letter = last_word[0]
-                            if first_letter in common_words:
-                                remaining_words = [word for word in common_words[first_letter] 
-                                                 if word not in word_suggestions and word.startswith(last_word)]
-                                word_suggestions.extend(remaining_words[:4-len(word_suggestions)])
-                    except Exception as spell_error:
-                        print(f"Spell checker error: {spell_error}")
-                        # If spell check fails, use common words starting with first letter
-                        first_letter = last_word[0] if last_word else 'A'
-                        if first_letter in common_words:
-                            word_suggestions = [word for word in common_words[first_letter] 
-                                              if word.startswith(last_word)][:4]
+                    count_dropped('throttled')
+            
+                # Reset last_appended_symbol when a new letter is detected
+                if state.current_symbol not in ["", " ", "SPACE", "NEXT"] and state.current_symbol != state.last_appended_symbol:
+                    state.last_appended_symbol = ""  # Reset to allow new letter to be appended
                 
-                # Fill word suggestions
-                if word_suggestions:
-                    word1_sug = word_suggestions[0] if len(word_suggestions) > 0 else " "
-                    word2_sug = word_suggestions[1] if len(word_suggestions) > 1 else " "
-                    word3_sug = word_suggestions[2] if len(word_suggestions) > 2 else " "
-                    word4_sug = word_suggestions[3] if len(word_suggestions) > 3 else " "
-                    print(f"Word suggestions: {word_suggestions}")
+                if state.current_symbol not in ["", " ", "SPACE", "NEXT"]:
+                    state.last_valid_symbol = state.current_symbol
+
+    if trace_store is not None:
+        record_trace(state, now, hands, frame_shape, probabilities)
 
-        return [word1, word2, word3, word4], [word1_sug, word2_sug, word3_sug, word4_sug]
+    # Determine display symbol
+    display_symbol = "SPACE" if is_space_gesture else ("NEXT" if is_next_gesture else state.last_valid_symbol)
+    return points, display_symbol
 
+def record_trace(state, timestamp, hands, frame_shape, probabilities):
+    """Append a frame to the session's landmark trace, opening the segment once the models are loaded"""
+    try:
+        if state.trace is None:
+            if fusion is None:
+                return
+            state.trace = trace_store.session(state.session_id, fusion.names, fusion.labels.tolist())
+        with metrics.time('trace'):
+            state.trace.append(timestamp, hands, frame_shape, probabilities)
     except Exception as e:
-        print(f"Error in suggestions: {str(e)}")
-        return [' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ']
+        print(f"Error recording trace: {e}")
+
+def recognition_result(state, display_symbol):
+    """Recognition fields shared by the /predict and streaming responses"""
+    result = {
+        'current_symbol': display_symbol,
+        'suggestions': state.suggestions,
+        'word_suggestions': state.word_suggestions,
+        'sentence': state.str_text,
+    }
+    if state.motion_gate is not None:
+        # Capture cadence hint: slower while no hands have been seen for a while
+        result['capture_interval_ms'] = state.motion_gate.capture_interval()
+    return result
+
+def parse_preview_options(value, base):
+    """Merge a request's ``preview`` value (bool, mode string or dict) into ``base`` options"""
+    if value is None:
+        return base
+    options = dict(base)
+    if isinstance(value, bool):
+        options['mode'] = 'image' if value else 'off'
+    elif isinstance(value, str):
+        options['mode'] = value
+    elif isinstance(value, dict):
+        options.update({k: value[k] for k in ('mode', 'size', 'quality') if k in value})
+    else:
+        raise ValueError("preview must be a bool, a mode string or an object")
+
+    if options['mode'] not in PREVIEW_MODES:
+        raise ValueError(f"preview mode must be one of {', '.join(PREVIEW_MODES)}")
+    options['size'] = min(CANVAS_SIZE, max(32, int(options['size'])))
+    options['quality'] = min(95, max(10, int(options['quality'])))
+    return options
+
+def skeletal_preview(state, points, options):
+    """Preview fields for a /predict response: JPEG, landmarks or nothing, per ``options``"""
+    mode = options['mode']
+    if mode == 'off':
+        return {'skeletal_image': None}
+    if mode == 'landmarks':
+        # The client draws the skeleton itself from the 400x400 canvas coordinates
+        return {
+            'skeletal_image': None,
+            'skeletal_landmarks': points.tolist() if points is not None else [],
+            'canvas_size': CANVAS_SIZE,
+        }
+
+    size, quality = options['size'], options['quality']
+    key = (points.tobytes() if points is not None else b'', size, quality)
+    if key != state.preview_key:
+        with metrics.time('preview_render'):
+            white = render_skeleton(points, size)
+        with metrics.time('preview_encode'):
+            _, buffer = cv2.imencode('.jpg', white, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        skeletal_image_data = base64.b64encode(buffer).decode('utf-8')
+        state.preview_image = f'data:image/jpeg;base64,{skeletal_image_data}'
+        state.preview_key = key
+    return {'skeletal_image': state.preview_image}
+
+def parse_landmark_hands(payload):
+    """Build cvzone-style hand dicts from client-side landmarks.
+
+    ``payload`` is ``{"frame_size": [width, height], "hands": [...]}`` where each
+    hand has ``lmList`` (21 ``[x, y, z]`` points in pixels of the mirrored frame),
+    ``type`` ("Left"/"Right", as cvzone reports it with flipType=True) and an
+    optional ``bbox`` ``[x, y, w, h]``. Instead of ``hands`` a flat list of 21 or
+    42 points may be sent as ``landmarks`` together with ``bboxes`` and ``types``.
+    Returns ``(hands, frame_shape)``.
+    """
+    frame_size = payload.get('frame_size')
+    if not frame_size or len(frame_size) != 2:
+        raise ValueError("landmarks.frame_size must be [width, height]")
+    frame_shape = (int(frame_size[1]), int(frame_size[0]), 3)
+
+    raw_hands = payload.get('hands')
+    if raw_hands is None:
+        points = payload.get('landmarks') or []
+        if len(points) not in (0, 21, 42):
+            raise ValueError("landmarks must contain 21 or 42 points")
+        bboxes = payload.get('bboxes') or []
+        types = payload.get('types') or []
+        raw_hands = []
+        for i in range(len(points) // 21):
+            raw_hands.append({
+                'lmList': points[i * 21:(i + 1) * 21],
+                'bbox': bboxes[i] if i < len(bboxes) else None,
+                'type': types[i] if i < len(types) else 'Right',
+            })
+    if len(raw_hands) > 2:
+        raise ValueError("at most two hands are supported")
+
+    hands = []
+    for raw in raw_hands:
+        lm_list = [[int(round(float(v))) for v in (list(pt) + [0])[:3]] for pt in raw.get('lmList') or []]
+        if len(lm_list) != 21:
+            raise ValueError("each hand needs 21 landmarks")
+        bbox = raw.get('bbox')
+        if bbox:
+            bbox = tuple(int(round(float(v))) for v in bbox)
+        else:
+            # Same bounding box cvzone derives from the landmarks
+            xs = [pt[0] for pt in lm_list]
+            ys = [pt[1] for pt in lm_list]
+            bbox = (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+        hands.append({
+            'lmList': lm_list,
+            'bbox': bbox,
+            'center': (bbox[0] + bbox[2] // 2, bbox[1] + bbox[3] // 2),
+            'type': raw.get('type') or 'Right',
+        })
+    return hands, frame_shape
+
+def run_frame_job(job):
+    """Run one mailbox frame (encoded image or client landmarks) through its session's pipeline"""
+    state, kind, data, preview = job
+    if kind == 'landmarks':
+        hands, frame_shape = parse_landmark_hands(data)
+
+    with state.lock:
+        if kind == 'image':
+            processed = process_image(state, data)
+            if processed is None:
+                return {'success': False, 'error': 'Invalid image data'}
+            points, display_symbol = processed
+        else:
+            points, display_symbol = process_hands(state, hands, frame_shape)
+        result = {'success': True, **recognition_result(state, display_symbol)}
+        if preview is not None:
+            result.update(skeletal_preview(state, points, preview))
+        return result
+
+frame_worker = LatestFrameWorker(run_frame_job, ASYNC_WORKERS) if ASYNC_INFERENCE else None
+
+def submit_frame(state, kind, data, preview=None):
+    """Queue a frame for the latest-frame workers and return the session's latest finished result.
+
+    The response carries ``seq`` (the frame the result was computed from),
+    ``frame_seq`` (the frame just submitted), ``age_ms`` (time since the
+    result's frame arrived) and ``pending`` (a frame is waiting to be run).
+    """
+    frame_seq, superseded = frame_worker.submit(state.frame_slot, (state, kind, data, preview))
+    if superseded:
+        count_dropped('superseded')
+    result, seq, age, pending = state.frame_slot.latest()
+    if result is None:
+        # Nothing finished yet for this session: answer from its state, read under its lock
+        with state.lock:
+            result = {
+                'success': True,
+                **recognition_result(state, state.last_valid_symbol),
+                **({'skeletal_image': None} if preview is not None else {}),
+            }
+    return {
+        **result,
+        'seq': seq,
+        'frame_seq': frame_seq,
+        'age_ms': round(age * 1000, 1) if age is not None else None,
+        'pending': pending,
+    }
+
+def predict_latest(payload):
+    """/predict in latest-frame mode: never waits for the models"""
+    state = sessions.get(get_session_id())
+    # /preview_settings replaces preview_options and never mutates it: the reference is a consistent snapshot
+    preview = parse_preview_options(payload.get('preview'), state.preview_options)
+    if payload.get('landmarks') is not None:
+        result = submit_frame(state, 'landmarks', payload['landmarks'], preview)
+    elif payload.get('image') is not None:
+        result = submit_frame(state, 'image', payload['image'], preview)
+    else:
+        with state.lock:
+            result = {'success': True, **recognition_result(state, state.current_symbol), 'skeletal_image': None}
+    with metrics.time('serialize'):
+        return jsonify(result)
 
 @app.route('/predict', methods=['POST'])
 def predict_route():
     """EXACT prediction route with proper timing from webtrial2.py"""
-    global current_symbol, prev_char, str_text, count, ten_prev_char, last_next_time, next_gesture_counter, last_valid_symbol
-    global last_prediction_time, gesture_start_time, consistent_gesture_count, last_gesture_type, last_appended_symbol
-    global word1, word2, word3, word4, word1_sug, word2_sug, word3_sug, word4_sug
     
     try:
-        if not request.json or 'image' not in request.json or request.json['image'] is None:
-            return jsonify({
-                'success': True,
-                'current_symbol': current_symbol,
-                'suggestions': [word1, word2, word3, word4],
-                'word_suggestions': [word1_sug, word2_sug, word3_sug, word4_sug],
-                'sentence': str_text,
-                'skeletal_image': None
-            })
-        
-        # Get image data from request
-        image_data = request.json['image'].split(',')[1]
-        img_bytes = base64.b64decode(image_data)
-        img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-        frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-        
-        if frame is None:
-            return jsonify({'success': False, 'error': 'Invalid image data'})
-        
-        # Flip frame to match webcam mirror view
-        frame = cv2.flip(frame, 1)
-        
-        # Detect hands
-        result = hd.findHands(frame, draw=False, flipType=True)
-        if isinstance(result, tuple) and len(result) == 2:
-            hands, _ = result
-        else:
-            hands = result  # Handle cases where only one value is returned
-        
-        # Create white canvas for skeletal image
-        white = np.ones((400, 400, 3), dtype=np.uint8) * 255
-        cv2.rectangle(white, (0,0), (399,399), (0,0,0), 2)
-        
-        # EXACT gesture detection logic from webtrial2.py
-        now = time.time()
-        is_space_gesture = False
-        is_next_gesture = False
+        if frame_worker is not None:
+            return predict_latest(request.json or {})
+
+        with sessions.session(get_session_id()) as state:
+            # The skeletal preview is opt-in, per request or via /preview_settings
+            preview = parse_preview_options((request.json or {}).get('preview'), state.preview_options)
+
+            if request.json and request.json.get('landmarks') is not None:
+                # Landmark-only mode: the client already ran hand tracking
+                hands, frame_shape = parse_landmark_hands(request.json['landmarks'])
+                points, display_symbol = process_hands(state, hands, frame_shape)
+                result = {
+                    'success': True,
+                    **recognition_result(state, display_symbol),
+                    **skeletal_preview(state, points, preview)
+                }
+                with metrics.time('serialize'):
+                    return jsonify(result)
+
+            if not request.json or 'image' not in request.json or request.json['image'] is None:
+                return jsonify({
+                    'success': True,
+                    'current_symbol': state.current_symbol,
+                    'suggestions': state.suggestions,
+                    'word_suggestions': state.word_suggestions,
+                    'sentence': state.str_text,
+                    'skeletal_image': None
+                })
         
-        if hands and len(hands) == 2:
-            hand1 = hands[0]
-            hand2 = hands[1]
-            pts1 = hand1['lmList']
-            pts2 = hand2['lmList']
-            hand1_open = all(pts1[tip][1] < pts1[pip][1] for tip, pip in [(8,6), (12,10), (16,14), (20,18)])
-            hand2_open = all(pts2[tip][1] < pts2[pip][1] for tip, pip in [(8,6), (12,10), (16,14), (20,18)])
-            is_space_gesture = hand1_open and hand2_open
-            
-        elif hands and len(hands) == 1:
-            hand = hands[0]
-            pts = hand['lmList']
-            
-            # EXACT NEXT gesture detection from webtrial2.py
-            fingers_extended = [
-                pts[8][1] < pts[6][1],   # Index finger
-                pts[12][1] < pts[10][1], # Middle finger  
-                pts[16][1] < pts[14][1], # Ring finger
-                pts[20][1] < pts[18][1]  # Pinky finger
-            ]
-            
-            thumb_extended = pts[4][0] > pts[3][0] if hand['type'] == 'Right' else pts[4][0] < pts[3][0]
-            all_fingers_extended = all(fingers_extended) and thumb_extended
-            
-            finger_spread = (
-                abs(pts[8][0] - pts[12][0]) > 20 and
-                abs(pts[12][0] - pts[16][0]) > 15 and
-                abs(pts[16][0] - pts[20][0]) > 10
-            )
-            
-            palm_facing = abs(pts[0][1] - pts[9][1]) > 40
-            is_next_gesture = all_fingers_extended and finger_spread and palm_facing
-
-        # IMPROVED gesture handling logic - faster response
-        if is_space_gesture:
-            current_symbol = "SPACE"
-            last_valid_symbol = "SPACE"
-            # Reset suggestions for space gesture
-            word1 = word2 = word3 = word4 = " "
-            word1_sug = word2_sug = word3_sug = word4_sug = " "
-        elif is_next_gesture:
-            # FASTER timing logic - reduced delay and frame requirement
-            if now - last_next_time > 0.8:  # Reduced from 2.0 to 0.8 seconds
-                next_gesture_counter += 1
-                if next_gesture_counter >= 2:  # Reduced from 5 to 2 consistent frames
-                    # Check if the symbol to append is different from the last appended symbol
-                    symbol_to_append = last_valid_symbol
-                    
-                    if symbol_to_append == "SPACE":
-                        if not str_text or not str_text[-1].isspace():
-                            str_text += " "
-                            last_appended_symbol = "SPACE"
-                            print(f"NEXT gesture: Added SPACE to sentence. New sentence: '{str_text}'")
-                    elif symbol_to_append not in ["", " ", "NEXT"]:
-                        # Only append if it's different from the last appended symbol
-                        if symbol_to_append != last_appended_symbol:
-                            str_text += symbol_to_append
-                            last_appended_symbol = symbol_to_append
-                            print(f"NEXT gesture: Added '{symbol_to_append}' to sentence. New sentence: '{str_text}'")
-                        else:
-                            print(f"NEXT gesture: Skipping duplicate '{symbol_to_append}' - already appended")
-                    
-                    last_next_time = now
-                    next_gesture_counter = 0
-            current_symbol = "NEXT"
-        else:
-            next_gesture_counter = 0
-            # Only update current_symbol if we're not in a next gesture state
-            if now - last_next_time > 0.8:  # Also reduced here
-                if hands:
-                    # ... rest of your existing skeletal drawing logic ...
-                    if len(hands) == 2:
-                        bboxes = []
-                        hands.sort(key=lambda x: x['bbox'][0])
-
-                        for hand in hands:
-                            bboxes.append(hand['bbox'])
-
-                        x = max(0, min(b[0] for b in bboxes) - offset)
-                        y = max(0, min(b[1] for b in bboxes) - offset)
-                        w = min(frame.shape[1] - x, max(b[0] + b[2] for b in bboxes) - x + 2*offset)
-                        h = min(frame.shape[0] - y, max(b[1] + b[3] for b in bboxes) - y + 2*offset)
-
-                        scale = min(350/w, 350/h)
-                        os = (400 - int(w * scale)) // 2
-                        os1 = (400 - int(h * scale)) // 2
-
-                        for hand in hands:
-                            for lm in hand['lmList']:
-                                cx = int((lm[0] - x) * scale) + os
-                                cy = int((lm[1] - y) * scale) + os1
-                                cv2.circle(white, (cx, cy), 5, (0, 255, 0), cv2.FILLED)
-
-                            connections = [
-                                [0,1,2,3,4], [0,5,6,7,8], [0,9,10,11,12],
-                                [0,13,14,15,16], [0,17,18,19,20]
-                            ]
-
-                            for connection in connections:
-                                for i in range(len(connection)-1):
-                                    pt1 = hand['lmList'][connection[i]]
-                                    pt2 = hand['lmList'][connection[i+1]]
-                                    x1 = int((pt1[0] - x) * scale) + os
-                                    y1 = int((pt1[1] - y) * scale) + os1
-                                    x2 = int((pt2[0] - x) * scale) + os
-                                    y2 = int((pt2[1] - y) * scale) + os1
-                                    cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-
-                            palm_connections = [[0,5], [5,9], [9,13], [13,17], [0,17]]
-                            for start, end in palm_connections:
-                                pt1 = hand['lmList'][start]
-                                pt2 = hand['lmList'][end]
-                                x1 = int((pt1[0] - x) * scale) + os
-                                y1 = int((pt1[1] - y) * scale) + os1
-                                x2 = int((pt2[0] - x) * scale) + os
-                                y2 = int((pt2[1] - y) * scale) + os1
-                                cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-
-                    else:  # Single hand
-                        hand = hands[0]
-                        x, y, w, h = hand['bbox']
-                        x = max(0, x - offset)
-                        y = max(0, y - offset)
-                        w = min(frame.shape[1] - x, w + 2*offset)
-                        h = min(frame.shape[0] - y, h + 2*offset)
-
-                        scale = min(350/w, 350/h)
-                        os = (400 - int(w * scale)) // 2
-                        os1 = (400 - int(h * scale)) // 2
-
-                        connections = [
-                            [0,1,2,3,4], [0,5,6,7,8], [0,9,10,11,12],
-                            [0,13,14,15,16], [0,17,18,19,20]
-                        ]
-
-                        for connection in connections:
-                            for i in range(len(connection)-1):
-                                pt1 = hand['lmList'][connection[i]]
-                                pt2 = hand['lmList'][connection[i+1]]
-                                x1 = int((pt1[0] - x) * scale) + os
-                                y1 = int((pt1[1] - y) * scale) + os1
-                                x2 = int((pt2[0] - x) * scale) + os
-                                y2 = int((pt2[1] - y) * scale) + os1
-                                cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-
-                        palm_connections = [[0,5], [5,9], [9,13], [13,17], [0,17]]
-                        for start, end in palm_connections:
-                            pt1 = hand['lmList'][start]
-                            pt2 = hand['lmList'][end]
-                            x1 = int((pt1[0] - x) * scale) + os
-                            y1 = int((pt1[1] - y) * scale) + os1
-                            x2 = int((pt2[0] - x) * scale) + os
-                            y2 = int((pt2[1] - y) * scale) + os1
-                            cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-
-                        for lm in hand['lmList']:
-                            cx = int((lm[0] - x) * scale) + os
-                            cy = int((lm[1] - y) * scale) + os1
-                            cv2.circle(white, (cx, cy), 1, (0,0,255), 1)
-
-                    # Make prediction with timing control
-                    current_time = time.time()
-                    if current_time - last_prediction_time > 0.1:  # Limit predictions to 10 FPS
-                        predict(white, hands)
-                        last_prediction_time = current_time
-                    
-                    # Reset last_appended_symbol when a new letter is detected
-                    if current_symbol not in ["", " ", "SPACE", "NEXT"] and current_symbol != last_appended_symbol:
-                        last_appended_symbol = ""  # Reset to allow new letter to be appended
-                        
-                    if current_symbol not in ["", " ", "SPACE", "NEXT"]:
-                        last_valid_symbol = current_symbol
-
-        # Get suggestions - use the global variables that are updated in predict()
-        suggestions = [word1, word2, word3, word4]
-        word_suggestions = [word1_sug, word2_sug, word3_sug, word4_sug]
+            # Get image data from request
+            processed = process_image(state, request.json['image'])
         
-        # Convert skeletal image to base64
-        _, buffer = cv2.imencode('.jpg', white, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        skeletal_image_data = base64.b64encode(buffer).decode('utf-8')
+            if processed is None:
+                return jsonify({'success': False, 'error': 'Invalid image data'})
         
-        # Determine display symbol
-        display_symbol = "SPACE" if is_space_gesture else ("NEXT" if is_next_gesture else last_valid_symbol)
+            points, display_symbol = processed
         
-        return jsonify({
-            'success': True,
-            'current_symbol': display_symbol,
-            'suggestions': suggestions,
-            'word_suggestions': word_suggestions,
-            'sentence': str_text,
-            'skeletal_image': f'data:image/jpeg;base64,{skeletal_image_data}'
-        })
+            result = {
+                'success': True,
+                **recognition_result(state, display_symbol),
+                **skeletal_preview(state, points, preview)
+            }
+            with metrics.time('serialize'):
+                return jsonify(result)
     
     except Exception as e:
         print(f"Error in prediction: {e}")
         traceback.print_exc()
+        count_dropped('error')
         return jsonify({
             'success': False,
             'error': str(e)
         })
 
+def predict_frame_bytes(session_id, img_bytes):
+    """Run one encoded frame through the pipeline and return the compact result, or None if undecodable"""
+    with sessions.session(session_id) as state:
+        processed = process_image(state, img_bytes)
+        if processed is None:
+            return None
+        return recognition_result(state, processed[1])
+
+def predict_landmarks(session_id, payload):
+    """Run client-side landmarks through the pipeline and return the compact result"""
+    hands, frame_shape = parse_landmark_hands(payload)
+    with sessions.session(session_id) as state:
+        _, display_symbol = process_hands(state, hands, frame_shape)
+        return recognition_result(state, display_symbol)
+
+@app.route('/predict/frame', methods=['POST'])
+def predict_frame_route():
+    """Binary prediction route: raw JPEG body in, compact JSON out (no base64, no skeletal image)"""
+    try:
+        if frame_worker is not None:
+            result = submit_frame(sessions.get(get_session_id()), 'image', request.get_data())
+            with metrics.time('serialize'):
+                return jsonify(result)
+
+        result = predict_frame_bytes(get_session_id(), request.get_data())
+        if result is None:
+            return jsonify({'success': False, 'error': 'Invalid image data'})
+        with metrics.time('serialize'):
+            return jsonify({'success': True, **result})
+    except Exception as e:
+        print(f"Error in frame prediction: {e}")
+        traceback.print_exc()
+        count_dropped('error')
+        return jsonify({'success': False, 'error': str(e)})
+
+if sock is not None:
+    @sock.route('/stream')
+    def stream(ws):
+        """Persistent sign-to-text stream: binary JPEG frames (or JSON landmark messages) in,
+        one compact JSON message out per frame"""
+        session_id = get_session_id()
+        seq = 0
+        while True:
+            message = ws.receive()
+            seq += 1
+            try:
+                if isinstance(message, str):
+                    # Text messages carry client-side landmarks (see parse_landmark_hands)
+                    result = predict_landmarks(session_id, json.loads(message)['landmarks'])
+                else:
+                    result = predict_frame_bytes(session_id, bytes(message))
+                if result is None:
+                    reply = {'seq': seq, 'success': False, 'error': 'Invalid image data'}
+                else:
+                    reply = {'seq': seq, 'success': True, **result}
+            except Exception as e:
+                print(f"Error in stream prediction: {e}")
+                traceback.print_exc()
+                count_dropped('error')
+                reply = {'seq': seq, 'success': False, 'error': str(e)}
+            with metrics.time('serialize'):
+                message = json.dumps(reply, separators=(',', ':'))
+            ws.send(message)
+
+def transcribe_clip(path):
+    """Replay the video at ``path`` through the gesture and letter pipeline.
+
+    Frames are decoded and run through hand detection a chunk at a time,
+    with a detector of the clip's own (in video order, so the hands are
+    tracked from frame to frame). The chunk's letter frames then go through
+    the models as one batch. Finally every frame is replayed in order
+    through process_hands on the video's clock, so the SPACE/NEXT timing
+    rules behave as they would live. Returns ``(transcript, state)``.
+    """
+    state = RecognitionState(session_id='transcribe')
+    # The clip's clock starts at 0: no NEXT or prediction happened before it
+    state.last_next_time = state.last_prediction_time = float('-inf')
+    detector = HandDetector(maxHands=2, detectionCon=0.5, minTrackCon=0.5)
+    transcript = Transcript()
+    last_batched = float('-inf')
+    try:
+        for chunk in batched(video_frames(path, TRANSCRIBE_FPS, DECODE_MIN_WIDTH), TRANSCRIBE_BATCH):
+            frames = []
+            for timestamp, frame, frame_size in chunk:
+                with metrics.time('detect'):
+                    hands, frame_shape = detect_hands(frame, frame_size=frame_size, detector=detector)
+                frames.append((timestamp, hands, frame_shape))
+
+            # Letter frames: hands without a SPACE/NEXT gesture, one per prediction interval.
+            # A frame the replay predicts that is not among them (after a NEXT pause) goes
+            # through the models on its own inside predict()
+            letter_frames, skeletons = [], []
+            for i, (timestamp, hands, frame_shape) in enumerate(frames):
+                if hands and timestamp - last_batched > PREDICTION_INTERVAL and not any(detect_gestures(hands)):
+                    letter_frames.append(i)
+                    skeletons.append(transform_landmarks(hands, frame_shape, offset))
+                    last_batched = timestamp
+            predictions = dict(zip(letter_frames, predict_batch(skeletons))) if skeletons else {}
+
+            for i, (timestamp, hands, frame_shape) in enumerate(frames):
+                _, display_symbol = process_hands(state, hands, frame_shape, timestamp, predictions.get(i))
+                transcript.add(timestamp, display_symbol, state.str_text, bool(hands))
+    finally:
+        state.close()
+        close = getattr(getattr(detector, 'hands', None), 'close', None)
+        if close is not None:
+            close()
+    return transcript, state
+
+def spool_limited(stream, f, limit, chunk_size=1024 * 1024):
+    """Copy ``stream`` into ``f``; False as soon as it turns out longer than ``limit`` bytes"""
+    copied = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return True
+        copied += len(chunk)
+        if copied > limit:
+            return False
+        f.write(chunk)
+
+def transcribe_too_large():
+    """The 413 response for a /transcribe upload over TRANSCRIBE_MAX_BYTES"""
+    return jsonify({'success': False, 'error': f'Video is larger than {TRANSCRIBE_MAX_BYTES // (1024 * 1024)} MB'}), 413
+
+@app.route('/transcribe', methods=['POST'])
+def transcribe_route():
+    """Timed letter and sentence transcript of an uploaded video (form field ``video`` or the raw body)"""
+    if not readiness.ready:
+        return jsonify({'success': False, 'error': 'Models are not loaded yet'}), 503
+    if request.content_length and request.content_length > TRANSCRIBE_MAX_BYTES:
+        return transcribe_too_large()
+
+    # OpenCV reads videos from files: spool the upload to a temporary one. A chunked
+    # upload has no Content-Length, so the limit is also checked while copying
+    try:
+        upload = request.files.get('video')
+    except RequestEntityTooLarge:
+        return transcribe_too_large()
+    suffix = os.path.splitext(upload.filename or '')[1] if upload is not None else ''
+    fd, path = tempfile.mkstemp(prefix='signbridge-', suffix=suffix or '.mp4')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if not spool_limited(upload.stream if upload is not None else request.stream, f, TRANSCRIBE_MAX_BYTES):
+                return transcribe_too_large()
+
+        start = time.perf_counter()
+        transcript, state = transcribe_clip(path)
+        elapsed = time.perf_counter() - start
+        print(f"✓ Transcribed {transcript.duration:.1f}s of video ({transcript.frames} frames) in {elapsed:.1f}s")
+        return jsonify({
+            'success': True,
+            'sentence': state.str_text,
+            'letters': transcript.letters,
+            'edits': transcript.edits,
+            'word_suggestions': state.word_suggestions,
+            'frames': transcript.frames,
+            'duration': round(transcript.duration, 3),
+            'processing_seconds': round(elapsed, 3),
+        })
+
+    except RequestEntityTooLarge:
+        return transcribe_too_large()
+    except Exception as e:
+        print(f"Error in transcription: {e}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)})
+    finally:
+        os.remove(path)
+
+@app.route('/capture_config', methods=['GET'])
+def capture_config():
+    """Preferred upload size and JPEG quality, so clients do not send oversized frames"""
+    return jsonify({
+        'width': CAPTURE_WIDTH,
+        'jpeg_quality': CAPTURE_QUALITY,
+        'format': 'image/jpeg',
+        'mirror': False,  # Upload the raw camera view; the server mirrors
+    })
+
+@app.route('/preview_settings', methods=['POST'])
+def preview_settings():
+    """Set the session's default skeletal preview: {"mode": "off"|"image"|"landmarks", "size", "quality"}"""
+    try:
+        with sessions.session(get_session_id()) as state:
+            state.preview_options = parse_preview_options(request.json or {}, state.preview_options)
+            return jsonify({'success': True, 'preview': state.preview_options})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/prediction_cache', methods=['GET'])
+def prediction_cache_stats():
+    """Hit/miss counters and settings of the held-pose prediction cache"""
+    if prediction_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **prediction_cache.stats()})
+
+@app.route('/cascade', methods=['GET'])
+def cascade_stats():
+    """How often each cascade stage was needed"""
+    if cascade is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **cascade.stats()})
+
+@app.route('/latest_frame', methods=['GET'])
+def latest_frame_stats():
+    """Frames run and superseded by the latest-frame workers"""
+    if frame_worker is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **frame_worker.stats()})
+
+@app.route('/inference_backend', methods=['GET'])
+def inference_backend_info():
+    """Active inference backend, its quantization and the startup parity check, if run"""
+    return jsonify(backend_report)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Pipeline stage latencies and frame counters in the Prometheus text format"""
+    if not metrics.enabled:
+        return jsonify({'status': 'error', 'message': 'Metrics are disabled (set SIGNBRIDGE_METRICS=1)'}), 404
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'healthy', 'message': 'SignBridge Sign-to-Text Backend is running'})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: 200 once the models are loaded and warmed up, 503 until then"""
+    status = readiness.snapshot()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/update_sentence', methods=['POST'])
 def update_sentence():
-    global str_text
     try:
-        data = request.json
-        str_text = data.get('text', ' ')
-        return jsonify({'success': True})
+        with sessions.session(get_session_id()) as state:
+            data = request.json
+            state.str_text = data.get('text', ' ')
+            return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/speak', methods=['POST'])
 def speak():
+    """Queue text to be spoken and return immediately; with "audio": true, render it to a
+    (cached) WAV file served from the returned audio_url instead"""
     try:
         data = request.json
         text_to_speak = data.get('text', '')
-        if text_to_speak and speak_engine:
-            speak_engine.say(text_to_speak)
-            speak_engine.runAndWait()
-            return jsonify({'status': 'success'}), 200
-        return jsonify({'status': 'error', 'message': 'No text provided or TTS not available'}), 400
+        if not text_to_speak or speech.available is False:
+            return jsonify({'status': 'error', 'message': 'No text provided or TTS not available'}), 400
+        if data.get('audio'):
+            ready = speech.render(text_to_speak).done()
+            return jsonify({
+                'status': 'success',
+                'ready': ready,
+                'audio_url': f"/speech/{speech.key(text_to_speak)}.wav"
+            }), 200
+        speech.say(text_to_speak)
+        return jsonify({'status': 'success', 'queued': True}), 200
+    except queue.Full:
+        return jsonify({'status': 'error', 'message': 'Speech queue is full, try again shortly'}), 503
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/speech/<key>.wav', methods=['GET'])
+def speech_audio(key):
+    """Rendered speech from /speak; 202 while it is still being rendered"""
+    if not re.fullmatch(r'[0-9a-f]{40}', key) or speech.cache is None:
+        return jsonify({'status': 'error', 'message': 'Unknown audio'}), 404
+    path = speech.cache.get(key)
+    if path is not None:
+        return send_file(path, mimetype='audio/wav')
+    if speech.is_pending(key):
+        return jsonify({'status': 'pending'}), 202
+    return jsonify({'status': 'error', 'message': 'Unknown audio'}), 404
+
 @app.route('/add_suggestion', methods=['POST'])
 def add_suggestion():
     """Add letter suggestion to sentence"""
-    global str_text
     try:
-        data = request.json
-        suggestion = data.get('suggestion', '')
-        if suggestion and suggestion.strip() != " ":
-            # Simply append the letter to the current sentence
-            str_text += suggestion
-            print(f"Added letter suggestion: '{suggestion}', new sentence: '{str_text}'")
-            return jsonify({'success': True, 'sentence': str_text})
-        return jsonify({'success': False, 'error': 'Invalid suggestion'})
+        with sessions.session(get_session_id()) as state:
+            data = request.json
+            suggestion = data.get('suggestion', '')
+            if suggestion and suggestion.strip() != " ":
+                # Simply append the letter to the current sentence
+                state.str_text += suggestion
+                print(f"Added letter suggestion: '{suggestion}', new sentence: '{state.str_text}'")
+                return jsonify({'success': True, 'sentence': state.str_text})
+            return jsonify({'success': False, 'error': 'Invalid suggestion'})
     except Exception as e:
         print(f"Error adding suggestion: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -911,36 +1308,31 @@ def add_suggestion():
 @app.route('/add_word_suggestion', methods=['POST'])
 def add_word_suggestion():
     """Replace current incomplete word with word suggestion - EXACT from webtrial2.py"""
-    global str_text, current_symbol, prev_char, count, ten_prev_char, last_valid_symbol, last_appended_symbol
     try:
-        data = request.json
-        word = data.get('word', '')
-        if word and word.strip() != " ":
-            current_sentence = str_text.strip()
-            if current_sentence:
-                words = current_sentence.split()
-                if words:
-                    # Replace the last word with the new word (EXACT logic from webtrial2.py)
-                    words[-1] = word.upper()
-                    str_text = " ".join(words) + " "
+        with sessions.session(get_session_id()) as state:
+            data = request.json
+            word = data.get('word', '')
+            if word and word.strip() != " ":
+                current_sentence = state.str_text.strip()
+                if current_sentence:
+                    words = current_sentence.split()
+                    if words:
+                        # Replace the last word with the new word (EXACT logic from webtrial2.py)
+                        words[-1] = word.upper()
+                        state.str_text = " ".join(words) + " "
+                    else:
+                        # If no words, just add the new word
+                        state.str_text = word.upper() + " "
                 else:
-                    # If no words, just add the new word
-                    str_text = word.upper() + " "
-            else:
-                # If sentence is empty, just add the new word
-                str_text = word.upper() + " "
+                    # If sentence is empty, just add the new word
+                    state.str_text = word.upper() + " "
             
-            # Clear letter backlog when word suggestion is used
-            current_symbol = "C"
-            prev_char = " "
-            count = -1
-            ten_prev_char = [" "] * 10
-            last_valid_symbol = ""
-            last_appended_symbol = ""
+                # Clear letter backlog when word suggestion is used
+                state.clear_letter_backlog()
             
-            print(f"Replaced current word with: {word}, new sentence: '{str_text}', cleared letter backlog")
-            return jsonify({'success': True, 'sentence': str_text})
-        return jsonify({'success': False, 'error': 'Invalid word'})
+                print(f"Replaced current word with: {word}, new sentence: '{state.str_text}', cleared letter backlog")
+                return jsonify({'success': True, 'sentence': state.str_text})
+            return jsonify({'success': False, 'error': 'Invalid word'})
     except Exception as e:
         print(f"Error adding word suggestion: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -948,11 +1340,11 @@ def add_word_suggestion():
 @app.route('/clear_sentence', methods=['POST'])
 def clear_sentence():
     """Clear the current sentence"""
-    global str_text
     try:
-        str_text = " "
-        print("Sentence cleared")
-        return jsonify({'success': True, 'sentence': str_text})
+        with sessions.session(get_session_id()) as state:
+            state.str_text = " "
+            print("Sentence cleared")
+            return jsonify({'success': True, 'sentence': state.str_text})
     except Exception as e:
         print(f"Error clearing sentence: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -960,12 +1352,12 @@ def clear_sentence():
 @app.route('/delete_last_char', methods=['POST'])
 def delete_last_char():
     """Delete the last character from sentence"""
-    global str_text
     try:
-        if len(str_text) > 1:  # Keep at least one space
-            str_text = str_text[:-1]
-        print(f"Deleted last character, new sentence: '{str_text}'")
-        return jsonify({'success': True, 'sentence': str_text})
+        with sessions.session(get_session_id()) as state:
+            if len(state.str_text) > 1:  # Keep at least one space
+                state.str_text = state.str_text[:-1]
+            print(f"Deleted last character, new sentence: '{state.str_text}'")
+            return jsonify({'success': True, 'sentence': state.str_text})
     except Exception as e:
         print(f"Error deleting character: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -0,0 +1,81 @@
+"""Cross-request micro-batching for the ensemble engine.
+
+Concurrent /predict requests each hand in a batch-of-one. The batcher
+collects them for a short window (or until ``max_batch`` frames are
+waiting), runs one batched forward pass per model through the wrapped
+engine and gives every caller back only its own rows.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Engine wrapper that coalesces concurrent calls into batched forward passes"""
+
+    def __init__(self, engine, window_ms=10, max_batch=16):
+        self.engine = engine
+        self.mode = getattr(engine, 'mode', 'custom')
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.batches = 0
+        self.frames = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='signbridge-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, inputs):
+        """Queue one request's input batches and return a Future for its outputs"""
+        future = Future()
+        self._queue.put((tuple(inputs), future))
+        return future
+
+    def __call__(self, inputs):
+        return self.submit(inputs).result()
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            rows = len(pending[0][0][0])
+            deadline = time.monotonic() + self.window
+
+            while rows < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                rows += len(item[0][0])
+
+            self._dispatch(pending, rows)
+
+    def _dispatch(self, pending, rows):
+        try:
+            if len(pending) == 1:
+                stacked = pending[0][0]
+            else:
+                stacked = tuple(
+                    np.concatenate([inputs[i] for inputs, _ in pending])
+                    for i in range(len(pending[0][0]))
+                )
+            outputs = self.engine(stacked)
+        except Exception as e:
+            print(f"Error in batched inference: {str(e)}")
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.frames += rows
+
+        start = 0
+        for inputs, future in pending:
+            end = start + len(inputs[0])
+            future.set_result(tuple(output[start:end] for output in outputs))
+            start = end
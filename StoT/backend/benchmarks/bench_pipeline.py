@@ -0,0 +1,246 @@
+"""Offline micro-benchmarks for the sign-to-text pipeline in app.py.
+
+Every stage runs one hot function in isolation, on synthetic webcam frames
+and the hands in fixtures/landmarks.json, with the NumPy stand-in models
+from stubs.py. No camera, GPU or .h5 files are needed. For each stage the
+report shows ops/sec, p50/p99 latency and the peak memory allocated per
+call (tracemalloc, in a separate pass so it does not distort the timings).
+
+    python benchmarks/bench_pipeline.py [--iterations 300] [--stages decode_full,predict]
+                                        [--json results.json] [--baseline results.json]
+
+With ``--baseline`` the run fails (exit code 1) when a stage's p50 is more
+than ``--tolerance`` slower than in the saved results.
+"""
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+sys.path[:0] = [BENCH_DIR, BACKEND_DIR]
+
+# Import app.py without real models, background threads or caches that would hide the work
+os.environ.setdefault('SIGNBRIDGE_MODELS_DIR', FIXTURES_DIR)
+os.environ.setdefault('SIGNBRIDGE_BACKGROUND_STARTUP', '0')
+os.environ.setdefault('SIGNBRIDGE_PREDICTION_CACHE', '0')
+os.environ.setdefault('SIGNBRIDGE_METRICS', '0')
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+from hand_features import HandFeatures
+from ingest import decode_frame
+from skeleton import render_skeleton, transform_landmarks
+from session_state import RecognitionState
+from stubs import install_stub_models
+
+SENTENCES = [" HEL", " HELLO WOR", " THAN", " GOOD MORN", " PLEA", " I NEED WAT", " SIGN LANG", " Q"]
+
+
+def synthetic_frame(width, height, seed=0):
+    """A webcam-like BGR frame: lit background gradient, sensor noise and a skin-toned hand blob"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    frame[..., 0] = 90 + 60 * x
+    frame[..., 1] = 100 + 50 * y
+    frame[..., 2] = 110 + 40 * (x * y)
+    frame += rng.normal(0, 6, frame.shape)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+    center = (int(width * 0.55), int(height * 0.55))
+    cv2.ellipse(frame, center, (width // 10, height // 5), 0, 0, 360, (120, 150, 205), -1)
+    for finger in range(5):
+        tip = (center[0] - width // 12 + finger * width // 28, center[1] - height // 3)
+        cv2.line(frame, (tip[0], center[1]), tip, (120, 150, 205), max(4, width // 60))
+    return frame
+
+
+def load_fixture():
+    with open(os.path.join(FIXTURES_DIR, 'landmarks.json'), 'r') as f:
+        fixture = json.load(f)
+    frame_size = fixture['frame_size']
+    frame_shape = (frame_size[1], frame_size[0], 3)
+    frames = []
+    for frame in fixture['frames']:
+        hands = [dict(hand, bbox=tuple(hand['bbox'])) for hand in frame['hands']]
+        frames.append((hands, transform_landmarks(hands, frame_shape)))
+    return frame_shape, frames
+
+
+def cycle(items):
+    state = {'i': -1}
+
+    def next_item():
+        state['i'] = (state['i'] + 1) % len(items)
+        return items[state['i']]
+    return next_item
+
+
+def build_stages():
+    """Stage name -> zero-argument callable running one operation"""
+    frame_shape, frames = load_fixture()
+    next_frame = cycle(frames)
+    next_sentence = cycle(SENTENCES)
+
+    hd_frame = synthetic_frame(640, 480)
+    jpeg = cv2.imencode('.jpg', synthetic_frame(1280, 720), [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    data_url = 'data:image/jpeg;base64,' + base64.b64encode(jpeg).decode('ascii')
+
+    state = RecognitionState()
+
+    def decode(min_width):
+        def run():
+            return decode_frame(base64.b64decode(data_url.split(',')[1]), min_width)
+        return run
+
+    def find_hands():
+        return app.hd.findHands(hd_frame, draw=False, flipType=False)
+
+    def transform():
+        hands, _ = next_frame()
+        return transform_landmarks(hands, frame_shape)
+
+    def render():
+        _, points = next_frame()
+        return render_skeleton(points)
+
+    def prepare_inputs():
+        _, points = next_frame()
+        app.model_inputs.prepare_one(points).release()
+
+    def predict():
+        hands, points = next_frame()
+        return app.predict(state, points, hands)
+
+    _, points = frames[0]
+    with app.model_inputs.prepare_one(points) as inputs:
+        probabilities = app.run_ensemble(inputs)
+
+    def vote():
+        return app.vote(*probabilities)
+
+    def gestures():
+        hands, _ = next_frame()
+        return HandFeatures([hand['lmList'] for hand in hands]).is_open()
+
+    def analyze_hand_shape():
+        hands, _ = next_frame()
+        return app.analyze_hand_shape([point for hand in hands for point in hand['lmList']])
+
+    def update_suggestions():
+        # A different sentence on every call, so the word suggestions are recomputed
+        state.str_text = next_sentence()
+        return app.update_suggestions(state, [0, 1, 2])
+
+    def update_suggestions_unchanged():
+        return app.update_suggestions(state, [0, 1, 2])
+
+    return {
+        'decode_full': decode(0),
+        'decode_reduced': decode(app.DECODE_MIN_WIDTH),
+        'find_hands': find_hands,
+        'transform_landmarks': transform,
+        'render_skeleton': render,
+        'prepare_inputs': prepare_inputs,
+        'predict': predict,
+        'vote': vote,
+        'gesture_features': gestures,
+        'analyze_hand_shape': analyze_hand_shape,
+        'update_suggestions': update_suggestions,
+        'update_suggestions_unchanged': update_suggestions_unchanged,
+    }
+
+
+def measure(operation, iterations, warmup=20, alloc_iterations=50):
+    """Time ``iterations`` calls, then measure the peak allocation of ``alloc_iterations`` more"""
+    for _ in range(warmup):
+        operation()
+
+    timings = np.empty(iterations, dtype=np.int64)
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        operation()
+        timings[i] = time.perf_counter_ns() - start
+
+    peaks = np.empty(alloc_iterations, dtype=np.int64)
+    tracemalloc.start()
+    try:
+        for i in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            operation()
+            peaks[i] = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'ops_per_sec': iterations / (timings.sum() / 1e9),
+        'p50_us': float(np.percentile(timings, 50)) / 1e3,
+        'p99_us': float(np.percentile(timings, 99)) / 1e3,
+        'alloc_kib': float(peaks.mean()) / 1024,
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Stages whose p50 got more than ``tolerance`` (a fraction) slower than in ``baseline``"""
+    slower = []
+    for stage, result in results.items():
+        previous = baseline.get(stage)
+        if previous and result['p50_us'] > previous['p50_us'] * (1 + tolerance):
+            slower.append((stage, previous['p50_us'], result['p50_us']))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the sign-to-text pipeline")
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--stages', default='', help="comma-separated subset of stages (default: all)")
+    parser.add_argument('--json', dest='json_path', help="write the results to this file")
+    parser.add_argument('--baseline', help="results file from an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed p50 slowdown vs the baseline")
+    args = parser.parse_args()
+
+    install_stub_models(app)
+    stages = build_stages()
+    selected = [name.strip() for name in args.stages.split(',') if name.strip()] or list(stages)
+    unknown = [name for name in selected if name not in stages]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)} (choose from {', '.join(stages)})")
+
+    results = {}
+    print(f"{'stage':<30}{'ops/sec':>12}{'p50 us':>12}{'p99 us':>12}{'alloc KiB':>12}")
+    for name in selected:
+        # The pipeline logs every prediction; keep that out of the report, not out of the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = measure(stages[name], args.iterations)
+        results[name] = result
+        print(f"{name:<30}{result['ops_per_sec']:>12.1f}{result['p50_us']:>12.1f}"
+              f"{result['p99_us']:>12.1f}{result['alloc_kib']:>12.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            slower = regressions(results, json.load(f), args.tolerance)
+        for stage, before, after in slower:
+            print(f"REGRESSION {stage}: p50 {before:.1f} us -> {after:.1f} us")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Tiny NumPy stand-ins for the three sign models, so benchmarks need no .h5 files or GPU."""
+from string import ascii_uppercase
+
+import numpy as np
+
+from ensemble import build_ensemble
+
+
+class StubModel:
+    """8x8 average pool, one dense layer and a softmax: cheap, deterministic, Keras calling convention"""
+
+    def __init__(self, input_size, classes=26, seed=0):
+        self.input_shape = (None, input_size, input_size, 3)
+        self._pool = input_size // 8
+        rng = np.random.default_rng(seed)
+        self.weights = rng.normal(0.0, 4.0, (8 * 8 * 3, classes)).astype(np.float32)
+
+    def __call__(self, x, training=False):
+        x = np.asarray(x, dtype=np.float32)
+        n, pool = len(x), self._pool
+        pooled = x[:, :pool * 8, :pool * 8].reshape(n, 8, pool, 8, pool, 3).mean(axis=(2, 4))
+        logits = (1.0 - pooled.reshape(n, -1)) @ self.weights
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, x, verbose=0):
+        return self(x)
+
+
+def install_stub_models(app):
+    """Put stub models, A-Z class indices, their fusion and a sequential ensemble into the imported app module"""
+    class_indices = {letter: index for index, letter in enumerate(ascii_uppercase)}
+    app.old_class_indices = dict(class_indices)
+    app.best_class_indices = dict(class_indices)
+    app.big_class_indices = dict(class_indices)
+    app.fusion = app.build_fusion()
+    app.old_model = StubModel(256, seed=1)
+    app.best_model = StubModel(224, seed=2)
+    app.big_model = StubModel(256, seed=3)
+    app.ensemble = build_ensemble('sequential', (app.old_model, app.best_model, app.big_model))
+    app.cascade = None
@@ -0,0 +1,107 @@
+"""Confidence-gated cascade over the three sign models.
+
+Instead of running all three models on every frame, the cascade runs the
+first model in ``order`` and stops when its top letter is one that model
+owns (per the ``*_model_letters`` lists), is not subject to the special
+letter or S/G/O/P rules, and clears ``threshold``. Otherwise it runs the
+model that owns the predicted letter, and accepts when that model agrees
+under the same conditions. Every other frame falls through to the full
+ensemble and the regular voting. ``stage_counts`` records how often each
+stage was needed.
+
+Stopping early is an approximation of the vote, so it has to be asked for
+with ``approximate=True``. The special-letter, exact-1.0, and agreement rules
+look at every model's prediction, so a model the cascade skipped can
+always override the early letter (best=B at 0.97 with big=K at 0.9 votes
+K). No early stop is safe under these rules. Without ``approximate`` every
+frame is decided by the full vote, exactly like the ensemble.
+"""
+import threading
+
+import numpy as np
+
+from fusion import top_k
+
+
+class CascadeEnsemble:
+    """Runs the models one at a time and stops as soon as a confident owner agrees"""
+
+    def __init__(self, models, input_sizes, class_labels, owned_letters, vote,
+                 order=('best', 'big', 'old'), threshold=0.95, guarded_letters=(), approximate=False):
+        self.models = dict(models)
+        self.input_sizes = dict(input_sizes)
+        self.class_labels = {name: list(labels) for name, labels in class_labels.items()}
+        self.owned_letters = {name: set(letters) for name, letters in owned_letters.items()}
+        self.vote = vote
+        self.order = tuple(order)
+        self.threshold = threshold
+        self.guarded_letters = set(guarded_letters)
+        self.approximate = approximate  # Allow the early stages (may change decisions, see above)
+        self.stage_counts = {1: 0, 2: 0, 3: 0}
+        self._lock = threading.Lock()
+
+    def _run_model(self, name, inputs):
+        x = inputs[self.input_sizes[name]]
+        return np.asarray(self.models[name](x, training=False))[0]
+
+    def _confident(self, name, predictions):
+        top3_idx = top_k(predictions)
+        letter = self.class_labels[name][top3_idx[0]]
+        accepted = (
+            predictions[top3_idx[0]] >= self.threshold and
+            letter in self.owned_letters[name] and
+            letter not in self.guarded_letters
+        )
+        return accepted, letter, top3_idx
+
+    def _finish(self, stage, probabilities, decision):
+        with self._lock:
+            self.stage_counts[stage] += 1
+        return tuple(probabilities.get(name) for name in ('old', 'best', 'big')), decision
+
+    def __call__(self, inputs):
+        """Return ``((old, best, big) probabilities, decision)`` for one frame.
+
+        Models that were not needed have None in place of their probabilities.
+        """
+        probabilities = {}
+        if not self.approximate:
+            return self._vote_all(probabilities, inputs)
+
+        first = self.order[0]
+        probabilities[first] = self._run_model(first, inputs)
+        accepted, letter, top3_idx = self._confident(first, probabilities[first])
+        if accepted:
+            return self._finish(1, probabilities, (letter, top3_idx, first))
+
+        owner = next((name for name in self.order[1:] if letter in self.owned_letters[name]), None)
+        if owner is not None:
+            probabilities[owner] = self._run_model(owner, inputs)
+            owner_accepted, owner_letter, owner_top3_idx = self._confident(owner, probabilities[owner])
+            if owner_accepted and owner_letter == letter:
+                return self._finish(2, probabilities, (letter, owner_top3_idx, owner))
+
+        return self._vote_all(probabilities, inputs)
+
+    def _vote_all(self, probabilities, inputs):
+        """Stage 3: run the models not run yet and decide by the full vote"""
+        for name in self.order:
+            if name not in probabilities:
+                probabilities[name] = self._run_model(name, inputs)
+        decision = self.vote(probabilities['old'], probabilities['best'], probabilities['big'])
+        return self._finish(3, probabilities, decision)
+
+    def stats(self):
+        with self._lock:
+            frames = sum(self.stage_counts.values())
+            return {
+                'order': list(self.order),
+                'approximate': self.approximate,
+                'threshold': self.threshold,
+                'frames': frames,
+                'stage_counts': {str(stage): count for stage, count in self.stage_counts.items()},
+                'stage_rates': {
+                    str(stage): count / frames if frames else 0.0
+                    for stage, count in self.stage_counts.items()
+                },
+            }
@@ -0,0 +1,74 @@
+"""Ensemble engines for the three sign recognition models.
+
+An engine takes the preprocessed input batches for the old, best and big
+models (in that order) and returns one probability batch per model, in the
+same order, so the voting logic in app.py can stay unchanged.
+"""
+import traceback
+
+import numpy as np
+
+MODEL_NAMES = ('old', 'best', 'big')
+ENSEMBLE_MODES = ('fused', 'sequential')
+
+
+class SequentialEnsemble:
+    """Runs every model through its own Keras ``predict`` call (original behaviour)"""
+
+    mode = 'sequential'
+
+    def __init__(self, models):
+        self.models = tuple(models)
+
+    def __call__(self, inputs):
+        return tuple(
+            np.asarray(model.predict(x, verbose=0))
+            for model, x in zip(self.models, inputs)
+        )
+
+
+class FusedEnsemble:
+    """Runs all three models as a single compiled multi-input, multi-output graph"""
+
+    mode = 'fused'
+
+    def __init__(self, models):
+        import tensorflow as tf
+
+        self.models = tuple(models)
+        signature = [
+            tf.TensorSpec(shape=(None,) + tuple(model.input_shape[1:]), dtype=tf.float32)
+            for model in self.models
+        ]
+
+        @tf.function(input_signature=signature)
+        def forward(*inputs):
+            return tuple(
+                model(x, training=False)
+                for model, x in zip(self.models, inputs)
+            )
+
+        self._forward = forward
+
+    def __call__(self, inputs):
+        outputs = self._forward(*(np.asarray(x, dtype=np.float32) for x in inputs))
+        return tuple(output.numpy() for output in outputs)
+
+
+def build_ensemble(mode, models):
+    """Build the ensemble engine selected at startup, falling back to sequential"""
+    if mode not in ENSEMBLE_MODES:
+        print(f"Unknown ensemble mode '{mode}', using 'sequential'")
+        mode = 'sequential'
+
+    if mode == 'fused':
+        try:
+            engine = FusedEnsemble(models)
+            print("✓ Using fused ensemble engine")
+            return engine
+        except Exception as e:
+            print(f"Fused ensemble unavailable ({e}), using sequential engine")
+            traceback.print_exc()
+
+    print("✓ Using sequential ensemble engine")
+    return SequentialEnsemble(models)
@@ -0,0 +1,242 @@
+"""Ensemble fusion: the letter decision over the three models' probabilities.
+
+``Fusion`` turns stacked ``(models, classes)`` probability arrays, or a
+batch of them shaped ``(frames, models, classes)``, into the voting
+outcome ``(symbol, top3_idx, model_used)`` (or None when no model is
+confident enough to change the current symbol).
+
+Each model's index -> label table is built once, as an array, from its
+class indices. The top 3 indices, top confidences and top letters are
+computed for the whole stack (or batch) at once: one sort over all rows
+for 26 classes, ``argpartition`` for much wider ones (``top_k``). The
+decision itself is a policy: an ordered table of rules, each looking at one
+frame's three (letter, confidence) pairs. For every frame the first rule
+that applies either picks a model or vetoes the frame. ``default_policy``
+is the voting tree from webtrial2.py:
+
+    group     S with only G/O/P/S predicted: the most confident S
+    special   F, Q, R, D, K, T, P, W or I predicted (first in that order):
+              its most confident model, if above 0.8, else veto
+    perfect   a model with confidence exactly 1.0: the first such model
+    majority  two models agree: their most confident one, if above 0.8, else veto
+    owned     the most confident model predicting one of its own letters,
+              if above 0.8, else veto
+
+Ties go to the first model in (old, best, big) order, as in the original
+code. A policy is plain data (a list of dicts), so a different one can be
+loaded from a JSON file with ``load_policy``.
+"""
+import json
+
+import numpy as np
+
+MODEL_NAMES = ('old', 'best', 'big')
+
+
+# Rows at least this wide take the partial sort; narrower ones are cheaper to sort whole
+PARTITION_MIN_CLASSES = 128
+
+VETO = -1  # A rule outcome: keep the current symbol
+
+
+def top_k(probabilities, k=3):
+    """Indices of the ``k`` largest values along the last axis, largest first.
+
+    Same result as ``np.argsort(p)[-k:][::-1]`` on every row, ties included.
+    Rows of at least PARTITION_MIN_CLASSES values only get a partial sort
+    (``argpartition``); the rows where equal values make the order depend on
+    the sort's tie handling are then sorted exactly that way.
+    """
+    p = np.asarray(probabilities)
+    flat = p.reshape(-1, p.shape[-1])
+    if flat.shape[1] < PARTITION_MIN_CLASSES:
+        return np.argsort(flat, axis=1)[:, :-k - 1:-1].reshape(p.shape[:-1] + (k,))
+
+    part = np.argpartition(flat, -k, axis=1)[:, -k:]
+    values = np.take_along_axis(flat, part, axis=1)
+    order = np.argsort(-values, axis=1)
+    top = np.take_along_axis(part, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+
+    tied = (values[:, :-1] == values[:, 1:]).any(axis=1)
+    tied |= np.count_nonzero(flat >= values[:, -1:], axis=1) > k
+    if flat.dtype.kind == 'f':
+        tied |= np.isnan(values).any(axis=1)
+    for row in np.flatnonzero(tied):
+        top[row] = np.argsort(flat[row])[-k:][::-1]
+    return top.reshape(p.shape[:-1] + (k,))
+
+
+def _most_confident(candidates, confidences):
+    """The candidate model with the highest confidence, the first one on ties"""
+    return max(candidates, key=lambda i: confidences[i])
+
+
+# Rules: built from their spec and the model names, each returns a function of one
+# frame's top letters and confidences (numpy scalars, in model order) that gives the
+# chosen model index, VETO, or None when the rule does not apply to the frame
+
+def _group_rule(spec, names):
+    letter, group = spec['letter'], set(spec['group'])
+    threshold = spec.get('threshold')
+
+    def evaluate(letters, confidences):
+        if letter not in letters or not all(l in group for l in letters):
+            return None
+        model = _most_confident([i for i, l in enumerate(letters) if l == letter], confidences)
+        if threshold is not None and not confidences[model] > threshold:
+            return VETO
+        return model
+    return evaluate
+
+
+def _special_rule(spec, names):
+    special = list(spec['letters'])
+    threshold = spec.get('threshold', 0.8)
+
+    def evaluate(letters, confidences):
+        for letter in special:
+            if letter in letters:
+                model = _most_confident([i for i, l in enumerate(letters) if l == letter], confidences)
+                return model if confidences[model] > threshold else VETO
+        return None
+    return evaluate
+
+
+def _perfect_rule(spec, names):
+    confidence = spec.get('confidence', 1.0)
+
+    def evaluate(letters, confidences):
+        for i, value in enumerate(confidences):
+            if value == confidence:
+                return i
+        return None
+    return evaluate
+
+
+def _majority_rule(spec, names):
+    votes = spec.get('votes', 2)
+    threshold = spec.get('threshold', 0.8)
+
+    def evaluate(letters, confidences):
+        voters = {}
+        for i, letter in enumerate(letters):
+            voters.setdefault(letter, []).append(i)
+        majority = [models for models in voters.values() if len(models) >= votes]
+        if not majority:
+            return None
+        # The agreeing letter with the highest mean confidence, then its most confident model
+        models = max(majority, key=lambda models: sum(confidences[i] for i in models) / len(models))
+        model = _most_confident(models, confidences)
+        return model if confidences[model] > threshold else VETO
+    return evaluate
+
+
+def _owned_rule(spec, names):
+    owned = [set(spec['letters'].get(name, ())) for name in names]
+    threshold = spec.get('threshold', 0.8)
+
+    def evaluate(letters, confidences):
+        candidates = [i for i, letter in enumerate(letters) if letter in owned[i]]
+        if not candidates:
+            return VETO
+        model = _most_confident(candidates, confidences)
+        return model if confidences[model] > threshold else VETO
+    return evaluate
+
+
+RULES = {
+    'group': _group_rule,
+    'special': _special_rule,
+    'perfect': _perfect_rule,
+    'majority': _majority_rule,
+    'owned': _owned_rule,
+}
+
+
+def default_policy(special_letters, sgop_letters, owned_letters, threshold=0.8):
+    """The voting tree from webtrial2.py as a policy table"""
+    return [
+        {'rule': 'group', 'letter': 'S', 'group': list(sgop_letters)},
+        {'rule': 'special', 'letters': list(special_letters), 'threshold': threshold},
+        {'rule': 'perfect', 'confidence': 1.0},
+        {'rule': 'majority', 'votes': 2, 'threshold': threshold},
+        {'rule': 'owned', 'letters': {name: list(letters) for name, letters in owned_letters.items()},
+         'threshold': threshold},
+    ]
+
+
+def load_policy(path):
+    """A policy table (a JSON list of rule objects) from ``path``"""
+    with open(path, 'r') as f:
+        policy = json.load(f)
+    if not isinstance(policy, list):
+        raise ValueError(f"{path}: a fusion policy is a list of rules")
+    return policy
+
+
+class FusionResult:
+    """Per-frame top letters, confidences, top-3 indices and the rule and model that decided"""
+
+    def __init__(self, names, letters, confidences, top3, rules, models):
+        self.names = names
+        self.letters = letters  # (frames, models) top-1 labels
+        self.confidences = confidences  # (frames, models) top-1 probabilities
+        self.top3 = top3  # (frames, models, 3) class indices
+        self.rules = rules  # Name of the deciding rule per frame, or None
+        self.models = models  # Index of the chosen model per frame, -1 for a veto
+
+    def decision(self, frame=0):
+        model = self.models[frame]
+        if model < 0:
+            return None
+        return str(self.letters[frame, model]), self.top3[frame, model], self.names[model]
+
+    def decisions(self):
+        return [self.decision(frame) for frame in range(len(self.models))]
+
+
+class Fusion:
+    """Precomputed label tables and a compiled policy over the models' probability vectors"""
+
+    def __init__(self, class_labels, policy):
+        self.names = tuple(class_labels)
+        tables = [list(labels) for labels in class_labels.values()]
+        if len({len(table) for table in tables}) != 1:
+            raise ValueError("all models must have the same number of classes to be fused")
+        self.labels = np.array(tables, dtype=str)  # (models, classes)
+        self.policy = list(policy)
+        self._rules = []
+        for spec in self.policy:
+            if spec.get('rule') not in RULES:
+                raise ValueError(f"Unknown fusion rule {spec.get('rule')!r}, expected one of {sorted(RULES)}")
+            self._rules.append((spec.get('name', spec['rule']), RULES[spec['rule']](spec, self.names)))
+
+    def label_list(self, name, indices):
+        """Labels of class ``indices`` for model ``name``"""
+        return self.labels[self.names.index(name)][np.asarray(indices)].tolist()
+
+    def evaluate(self, probabilities):
+        """Run the policy on ``(models, classes)`` or ``(frames, models, classes)`` probabilities"""
+        p = np.asarray(probabilities)
+        if p.ndim == 2:
+            p = p[None]
+        top3 = top_k(p, 3)
+        confidences = np.take_along_axis(p, top3[..., :1], axis=2)[..., 0]
+        letters = self.labels[np.arange(len(self.names)), top3[..., 0]]
+
+        models, rules = [], []
+        for frame_letters, frame_confidences in zip(letters.tolist(), confidences):
+            model = rule_name = None
+            for name, rule in self._rules:
+                model = rule(frame_letters, frame_confidences)
+                if model is not None:
+                    rule_name = name
+                    break
+            models.append(VETO if model is None else model)
+            rules.append(rule_name)
+        return FusionResult(self.names, letters, confidences, top3, rules, models)
+
+    def decide(self, probabilities):
+        """Decisions ``(symbol, top3_idx, model_used)`` or None, one per frame"""
+        return self.evaluate(probabilities).decisions()
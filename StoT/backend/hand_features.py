@@ -0,0 +1,149 @@
+"""Vectorized hand-geometry features for gesture and letter-shape checks.
+
+HandFeatures converts a hand's ``lmList`` (or a batch of them) into one
+float32 ``(..., 21, 3)`` array and derives every joint angle, finger curl,
+pairwise fingertip distance and palm-normalised ratio with a handful of
+array operations. Angles use the same 2D arccos formula the original
+per-call helpers used, so degenerate joints still come out as NaN and fail
+every threshold check. The geometry itself is evaluated in float64: arccos is
+ill-conditioned near straight joints, and float32 would flip the 160 degree
+straightness checks on nearly collinear fingers.
+"""
+import numpy as np
+
+FINGER_BASES = (5, 9, 13, 17)  # Index, middle, ring, pinky MCP joints
+FINGERTIPS = (4, 8, 12, 16, 20)  # Thumb to pinky
+# (tip, pip) pairs compared for "finger extended" in the SPACE/NEXT gestures
+EXTENDED_PAIRS = ((8, 6), (12, 10), (16, 14), (20, 18))
+
+# Angle triples (a, vertex, b), evaluated together in one pass
+_TRIPLES = np.array(
+    [(0, 2, 4)]                                         # 0: thumb angle
+    + [(b, b + 1, b + 2) for b in FINGER_BASES]         # 1-4: lower finger joints
+    + [(b + 1, b + 2, b + 3) for b in FINGER_BASES]     # 5-8: upper finger joints
+    + [(b, b + 2, b + 3) for b in FINGER_BASES]         # 9-12: finger curls
+    + [(5, 9, 12)],                                     # 13: index/middle angle
+    dtype=np.intp,
+)
+_TIPS = np.array(FINGERTIPS, dtype=np.intp)
+_EXT_TIPS = np.array([tip for tip, _ in EXTENDED_PAIRS], dtype=np.intp)
+_EXT_PIPS = np.array([pip for _, pip in EXTENDED_PAIRS], dtype=np.intp)
+_UP = np.array([0.0, -10.0])
+
+
+def _angle_between(v1, v2):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cos = np.sum(v1 * v2, axis=-1) / (np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1))
+        return np.degrees(np.arccos(cos))
+
+
+class HandFeatures:
+    """Geometry features for one hand ``(21, 3)`` or a batch of hands ``(N, 21, 3)``"""
+
+    def __init__(self, landmarks):
+        self.landmarks = np.asarray(landmarks, dtype=np.float32)
+        xy = self.landmarks[..., :2].astype(np.float64)
+        self.xy = xy
+
+        angles = _angle_between(xy[..., _TRIPLES[:, 0], :] - xy[..., _TRIPLES[:, 1], :],
+                                xy[..., _TRIPLES[:, 2], :] - xy[..., _TRIPLES[:, 1], :])
+        self.thumb_angle = angles[..., 0]
+        self.joint_angles = np.stack([angles[..., 1:5], angles[..., 5:9]], axis=-1)  # (..., 4, 2)
+        self.curls = angles[..., 9:13]  # Index, middle, ring, pinky
+        self.index_middle_angle = angles[..., 13]
+        self.finger_straight = np.all(self.joint_angles > 160, axis=-1)
+
+        # How far the index and middle distal segments deviate from vertical
+        tilt = _angle_between(xy[..., [6, 10], :] - xy[..., [8, 12], :], _UP)
+        self.index_middle_parallel = np.abs(tilt[..., 0] - tilt[..., 1])
+
+        tips = xy[..., _TIPS, :]
+        self.tip_distances = np.linalg.norm(tips[..., :, None, :] - tips[..., None, :, :], axis=-1)
+        self.palm_width = np.linalg.norm(xy[..., 5, :] - xy[..., 17, :], axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.tip_ratios = self.tip_distances / self.palm_width[..., None, None]
+
+        self.fingers_extended = xy[..., _EXT_TIPS, 1] < xy[..., _EXT_PIPS, 1]
+
+    def _tip_distance(self, a, b):
+        return self.tip_distances[..., FINGERTIPS.index(a), FINGERTIPS.index(b)]
+
+    def _tip_ratio(self, a, b):
+        return self.tip_ratios[..., FINGERTIPS.index(a), FINGERTIPS.index(b)]
+
+    def is_d_shape(self):
+        """Single-handed 'D': index and middle straight together, ring and pinky curled"""
+        palm_width = self.palm_width
+        xy = self.xy
+        return (
+            self.finger_straight[..., 0] &
+            self.finger_straight[..., 1] &
+            (self.curls[..., 2] > 30) &
+            (self.curls[..., 3] > 30) &
+            (np.abs(xy[..., 8, 1] - xy[..., 12, 1]) < palm_width * 0.2) &
+            (self._tip_distance(8, 12) < palm_width * 0.3) &
+            (self.index_middle_angle < 25) &
+            (self.index_middle_parallel < 20) &
+            (self._tip_ratio(12, 16) > 0.3) &
+            (self._tip_ratio(16, 20) < 0.4)
+        )
+
+    def is_index_up(self):
+        """Index finger straight and vertical with the other three fingers curled"""
+        return (
+            self.finger_straight[..., 0] &
+            np.all(self.curls[..., 1:] > 30, axis=-1) &
+            (np.abs(self.xy[..., 8, 0] - self.xy[..., 5, 0]) < 30)
+        )
+
+    def is_c_shape(self):
+        """All four fingers half-curled with the fingertips in a shallow curve"""
+        tips_y = self.xy[..., _TIPS, 1]
+        return (
+            np.all((self.curls > 30) & (self.curls < 120), axis=-1) &
+            (np.ptp(tips_y, axis=-1) < 100)
+        )
+
+    def is_open(self):
+        """All four fingertips above their PIP joints (one half of the SPACE gesture)"""
+        return np.all(self.fingers_extended, axis=-1)
+
+    def is_next(self, hand_types):
+        """Open, spread hand with the thumb out and the palm facing the camera (NEXT gesture)"""
+        xy = self.xy
+        is_right = np.asarray(hand_types) == 'Right'
+        thumb_extended = np.where(is_right, xy[..., 4, 0] > xy[..., 3, 0], xy[..., 4, 0] < xy[..., 3, 0])
+        finger_spread = (
+            (np.abs(xy[..., 8, 0] - xy[..., 12, 0]) > 20) &
+            (np.abs(xy[..., 12, 0] - xy[..., 16, 0]) > 15) &
+            (np.abs(xy[..., 16, 0] - xy[..., 20, 0]) > 10)
+        )
+        palm_facing = np.abs(xy[..., 0, 1] - xy[..., 9, 1]) > 40
+        return self.is_open() & thumb_extended & finger_spread & palm_facing
+
+
+def shape_letter(landmarks):
+    """The letter the hand-shape rules pick for 21 (one hand) or 42 (two hands) landmarks, or None.
+
+    Two hands only ever give a two-handed 'D' (one hand index-up, the other
+    a C shape); one hand gives 'D', 'B', 'O', 'Z' or 'C' (rules from
+    webtrial2.py's analyze_hand_shape).
+    """
+    if len(landmarks) == 42:
+        features = HandFeatures([landmarks[:21], landmarks[21:]])
+        index_up = features.is_index_up()
+        c_shape = features.is_c_shape()
+        return 'D' if (index_up[0] and c_shape[1]) or (index_up[1] and c_shape[0]) else None
+
+    features = HandFeatures(landmarks)
+    if not features.palm_width:
+        return None  # The original ratios divided by zero here
+    if features.is_d_shape():
+        return 'D'
+    if features.finger_straight[0] and not features.finger_straight[1]:
+        return 'B'
+    if features.curls[2] > 45 and features.curls[3] > 45:
+        return 'O'
+    if features.thumb_angle > 45:
+        return 'Z'
+    return 'C'
@@ -0,0 +1,108 @@
+"""Region-of-interest hand tracking on top of cvzone's HandDetector.
+
+Hands move little between consecutive frames. Once a hand has been found,
+HandTracker runs the detector only on a padded crop around the previous
+hand bounding boxes and shifts the landmarks, bboxes and centers it finds
+back to frame coordinates. A full-frame detection runs every
+``redetect_interval`` frames, and whenever tracking is lost: fewer hands are
+found in the crop than before, or a hand touches the crop border and may be
+cut off.
+"""
+import threading
+
+import numpy as np
+
+
+def find_hands(detector, image, lock, flip_type=True):
+    """Run ``detector`` on ``image`` under ``lock`` and return the list of hand dicts"""
+    with lock:
+        result = detector.findHands(image, draw=False, flipType=flip_type)
+    if isinstance(result, tuple) and len(result) == 2:
+        hands, _ = result
+    else:
+        hands = result  # Handle cases where only one value is returned
+    return hands or []
+
+
+def _shift_hand(hand, dx, dy):
+    """Copy of ``hand`` with landmarks, bbox and center moved by (dx, dy)"""
+    shifted = dict(hand)
+    shifted['lmList'] = [[x + dx, y + dy, *rest] for x, y, *rest in hand['lmList']]
+    x, y, w, h = hand['bbox']
+    shifted['bbox'] = (x + dx, y + dy, w, h)
+    if 'center' in hand:
+        cx, cy = hand['center']
+        shifted['center'] = (cx + dx, cy + dy)
+    return shifted
+
+
+class HandTracker:
+    """Detects hands in a padded crop around the last known hands, with periodic full re-detection"""
+
+    def __init__(self, detector, redetect_interval=10, padding=0.5, min_size=128, lock=None,
+                 flip_type=True):
+        self.detector = detector
+        self.flip_type = flip_type
+        self.redetect_interval = max(1, int(redetect_interval))
+        self.padding = padding
+        self.min_size = min_size
+        self.lock = lock or threading.Lock()
+        self.full_detections = 0
+        self.roi_detections = 0
+        self.reset()
+
+    def reset(self):
+        self._bboxes = None
+        self._frames_since_full = 0
+
+    def _roi(self, frame_shape):
+        """Padded union of the previous bboxes, at least ``min_size`` square, clipped to the frame"""
+        bboxes = np.asarray(self._bboxes, dtype=np.int64)
+        x0, y0 = bboxes[:, 0].min(), bboxes[:, 1].min()
+        x1, y1 = (bboxes[:, 0] + bboxes[:, 2]).max(), (bboxes[:, 1] + bboxes[:, 3]).max()
+        pad = int(max(x1 - x0, y1 - y0) * self.padding)
+        grow_x = max(pad, (self.min_size - (x1 - x0)) // 2)
+        grow_y = max(pad, (self.min_size - (y1 - y0)) // 2)
+        height, width = frame_shape[:2]
+        return (max(0, int(x0 - grow_x)), max(0, int(y0 - grow_y)),
+                min(width, int(x1 + grow_x)), min(height, int(y1 + grow_y)))
+
+    def _detect_full(self, frame):
+        self.full_detections += 1
+        self._frames_since_full = 0
+        return find_hands(self.detector, frame, self.lock, self.flip_type)
+
+    def _detect_roi(self, frame):
+        x0, y0, x1, y1 = self._roi(frame.shape)
+        crop_width, crop_height = x1 - x0, y1 - y0
+        self.roi_detections += 1
+        hands = find_hands(self.detector, frame[y0:y1, x0:x1], self.lock, self.flip_type)
+        if len(hands) < len(self._bboxes):
+            return None
+        for hand in hands:
+            x, y, w, h = hand['bbox']
+            # A hand at the crop border (but not the frame border) may be cut off
+            if ((x <= 1 and x0 > 0) or (y <= 1 and y0 > 0) or
+                    (x + w >= crop_width - 1 and x1 < frame.shape[1]) or
+                    (y + h >= crop_height - 1 and y1 < frame.shape[0])):
+                return None
+        return [_shift_hand(hand, x0, y0) for hand in hands]
+
+    def find_hands(self, frame):
+        """Hands in ``frame`` with landmarks in full-frame coordinates (cvzone's hand dicts)"""
+        hands = None
+        if self._bboxes and self._frames_since_full < self.redetect_interval:
+            self._frames_since_full += 1
+            hands = self._detect_roi(frame)
+        if hands is None:
+            hands = self._detect_full(frame)
+        self._bboxes = [hand['bbox'] for hand in hands] or None
+        return hands
+
+    def stats(self):
+        detections = self.full_detections + self.roi_detections
+        return {
+            'full_detections': self.full_detections,
+            'roi_detections': self.roi_detections,
+            'roi_rate': self.roi_detections / detections if detections else 0.0,
+        }
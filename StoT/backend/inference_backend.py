@@ -0,0 +1,288 @@
+"""Pluggable CPU inference backends for the three sign models.
+
+The Keras ``.h5`` models stay the source of truth. For the 'tflite' and
+'onnx' backends, each model is exported once to that format, optionally
+quantized to float16 or int8, and then run through TFLite or ONNX Runtime.
+int8 is calibrated on skeleton canvases rendered from synthetic hands.
+Exports are cached next to the models and keyed by the source file and the
+quantization, so they are only rebuilt when a model changes.
+
+The runtime wrappers behave like the Keras models as far as the rest of the
+pipeline is concerned: they have ``input_shape``, ``predict(x, verbose=0)``
+and ``__call__(x, training=False)`` and return ``(batch, 26)``
+probabilities. So the sequential ensemble, the micro-batcher, the cascade
+and the voting code run on them unchanged. ``top1_agreement`` is the
+parity check against the Keras models.
+
+Run ``python inference_backend.py --backend tflite --quantize int8`` to
+export the models and print their top-1 agreement.
+"""
+import argparse
+import os
+import threading
+
+import numpy as np
+
+from skeleton import render_skeleton, transform_landmarks
+
+BACKENDS = ('keras', 'tflite', 'onnx')
+QUANTIZATIONS = ('none', 'float16', 'int8')
+EXTENSIONS = {'tflite': '.tflite', 'onnx': '.onnx'}
+
+
+class TFLiteModel:
+    """A TFLite interpreter with the Keras model calling convention"""
+
+    def __init__(self, path, threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.path = path
+        self._interpreter = Interpreter(model_path=path, num_threads=threads)
+        self._interpreter.allocate_tensors()
+        input_details = self._interpreter.get_input_details()[0]
+        self._input_index = input_details['index']
+        self._output_index = self._interpreter.get_output_details()[0]['index']
+        self._batch = int(input_details['shape'][0])
+        self.input_shape = (None,) + tuple(int(d) for d in input_details['shape'][1:])
+        self._lock = threading.Lock()  # An interpreter runs one invocation at a time
+
+    def __call__(self, x, training=False):
+        x = np.asarray(x, dtype=np.float32)
+        with self._lock:
+            if len(x) != self._batch:
+                self._interpreter.resize_tensor_input(self._input_index, x.shape)
+                self._interpreter.allocate_tensors()
+                self._batch = len(x)
+            self._interpreter.set_tensor(self._input_index, x)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index).copy()
+
+    def predict(self, x, verbose=0):
+        return self(x)
+
+
+class OnnxModel:
+    """An ONNX Runtime CPU session with the Keras model calling convention"""
+
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        self.path = path
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self._session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_shape = (None,) + tuple(model_input.shape[1:])
+
+    def __call__(self, x, training=False):
+        return self._session.run(None, {self._input_name: np.asarray(x, dtype=np.float32)})[0]
+
+    def predict(self, x, verbose=0):
+        return self(x)
+
+
+RUNTIMES = {'tflite': TFLiteModel, 'onnx': OnnxModel}
+
+
+def _synthetic_hand(rng, frame_shape):
+    """A plausible right hand: five fingers fanning out from the wrist with random curls"""
+    height, width = frame_shape[:2]
+    size = rng.uniform(0.25, 0.45) * height
+    wrist = np.array([rng.uniform(0.3, 0.7) * width, rng.uniform(0.6, 0.85) * height])
+    tilt = rng.uniform(-0.4, 0.4)
+
+    landmarks = [wrist]
+    for finger, spread in enumerate(np.linspace(-1.1, 0.5, 5)):
+        direction = tilt + spread - np.pi / 2
+        point = wrist + size * 0.35 * np.array([np.cos(direction), np.sin(direction)])
+        curl = rng.uniform(0.0, 1.6)
+        for joint in range(4):
+            if finger > 0 and joint == 0:
+                landmarks.append(point)  # MCP joint
+                continue
+            direction += curl / 3
+            point = point + size * 0.16 * np.array([np.cos(direction), np.sin(direction)])
+            landmarks.append(point)
+
+    landmarks = np.asarray(landmarks) + rng.normal(0, size * 0.01, (21, 2))
+    landmarks = np.clip(landmarks, 0, [width - 1, height - 1])
+    low, high = landmarks.min(axis=0), landmarks.max(axis=0)
+    return {
+        'lmList': [[int(x), int(y), 0] for x, y in landmarks],
+        'bbox': (int(low[0]), int(low[1]), int(high[0] - low[0]), int(high[1] - low[1])),
+        'type': 'Right',
+    }
+
+
+def calibration_canvases(sizes, samples=100, seed=0, frame_shape=(480, 640)):
+    """Normalised ``(samples, size, size, 3)`` float32 skeleton canvases for each size.
+
+    About a quarter of the samples have two hands, like the two-handed letters.
+    """
+    rng = np.random.default_rng(seed)
+    canvases = {size: np.empty((samples, size, size, 3), dtype=np.float32) for size in sizes}
+    for i in range(samples):
+        hands = [_synthetic_hand(rng, frame_shape)]
+        if rng.random() < 0.25:
+            second = _synthetic_hand(rng, frame_shape)
+            second['type'] = 'Left'
+            hands.append(second)
+        points = transform_landmarks(hands, frame_shape)
+        for size in sizes:
+            canvases[size][i] = render_skeleton(points, size) / 255.0
+    return canvases
+
+
+def export_path(model_path, backend, quantize, export_dir):
+    """Cache path of an exported model, keyed by the source file and the quantization"""
+    stat = os.stat(model_path)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    quantize = quantize or 'none'
+    return os.path.join(export_dir, f"{stem}-{stat.st_size}-{stat.st_mtime_ns}-{quantize}{EXTENSIONS[backend]}")
+
+
+def _write_atomic(path, data):
+    partial = f"{path}.{os.getpid()}.partial"
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def export_tflite(model, path, quantize=None, calibration=None):
+    """Convert a Keras model to TFLite, with float16 or int8 (float I/O) weight quantization"""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == 'int8':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([sample[None]] for sample in calibration)
+    _write_atomic(path, converter.convert())
+
+
+def export_onnx(model, path, quantize=None, calibration=None):
+    """Convert a Keras model to ONNX, with float16 weights or static int8 quantization"""
+    import tensorflow as tf
+    import tf2onnx
+
+    signature = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name='input'),)
+    onnx_model, _ = tf2onnx.convert.from_keras(model, input_signature=signature, opset=13)
+    if quantize == 'float16':
+        from onnxconverter_common import float16
+        onnx_model = float16.convert_float_to_float16(onnx_model, keep_io_types=True)
+
+    if quantize != 'int8':
+        _write_atomic(path, onnx_model.SerializeToString())
+        return
+
+    from onnxruntime.quantization import CalibrationDataReader, quantize_static
+
+    input_name = onnx_model.graph.input[0].name
+
+    class CanvasReader(CalibrationDataReader):
+        def __init__(self):
+            self._samples = iter(calibration)
+
+        def get_next(self):
+            sample = next(self._samples, None)
+            return None if sample is None else {input_name: sample[None]}
+
+    float_path = f"{path}.{os.getpid()}.float.onnx"
+    partial = f"{path}.{os.getpid()}.partial.onnx"
+    _write_atomic(float_path, onnx_model.SerializeToString())
+    try:
+        quantize_static(float_path, partial, CanvasReader())
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(float_path):
+            os.remove(float_path)
+
+
+EXPORTERS = {'tflite': export_tflite, 'onnx': export_onnx}
+
+
+def convert_models(backend, models, model_paths, export_dir, quantize=None,
+                   calibration_samples=100, threads=None):
+    """Export (or reuse cached exports of) Keras models and load them into ``backend``.
+
+    ``models`` and ``model_paths`` map model names to the Keras models and
+    their ``.h5`` files. Returns a dict of runtime models with the same names.
+    """
+    if backend not in EXPORTERS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+    if quantize == 'none':
+        quantize = None
+    if quantize not in (None, 'float16', 'int8'):
+        raise ValueError(f"Unknown quantization '{quantize}', expected one of {QUANTIZATIONS}")
+
+    os.makedirs(export_dir, exist_ok=True)
+    paths = {name: export_path(model_paths[name], backend, quantize, export_dir) for name in models}
+    calibration = None
+    if quantize == 'int8' and not all(os.path.exists(path) for path in paths.values()):
+        sizes = sorted({models[name].input_shape[1] for name in models})
+        calibration = calibration_canvases(sizes, calibration_samples)
+
+    runtime_models = {}
+    for name, model in models.items():
+        path = paths[name]
+        if not os.path.exists(path):
+            print(f"Exporting {name} model to {backend} ({quantize or 'no'} quantization)...")
+            EXPORTERS[backend](model, path, quantize, calibration and calibration[model.input_shape[1]])
+        runtime_models[name] = RUNTIMES[backend](path, threads)
+        print(f"✓ Using {backend} {name} model: {os.path.basename(path)}")
+    return runtime_models
+
+
+def top1_agreement(reference, candidate, samples=200, seed=1):
+    """Fraction of calibration-style canvases on which both model sets pick the same letter.
+
+    ``reference`` and ``candidate`` map model names to models (Keras and a
+    runtime backend, typically). Returns ``{name: agreement}``.
+    """
+    sizes = sorted({model.input_shape[1] for model in reference.values()})
+    canvases = calibration_canvases(sizes, samples, seed)
+    report = {}
+    for name, model in reference.items():
+        x = canvases[model.input_shape[1]]
+        expected = np.argmax(np.asarray(model.predict(x, verbose=0)), axis=-1)
+        actual = np.argmax(np.asarray(candidate[name].predict(x, verbose=0)), axis=-1)
+        report[name] = float(np.mean(expected == actual))
+    return report
+
+
+def main():
+    from keras.models import load_model
+
+    from startup import MODEL_FILES
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Export the sign models and check top-1 parity with Keras")
+    parser.add_argument('--backend', choices=EXPORTERS, default='tflite')
+    parser.add_argument('--quantize', choices=QUANTIZATIONS, default='none')
+    parser.add_argument('--models-dir', default=os.path.join(script_dir, 'models'))
+    parser.add_argument('--export-dir', default=None, help="defaults to <models-dir>/runtime")
+    parser.add_argument('--calibration-samples', type=int, default=100)
+    parser.add_argument('--samples', type=int, default=200, help="canvases for the parity check")
+    args = parser.parse_args()
+
+    model_paths = {name: os.path.join(args.models_dir, model_file)
+                   for name, (model_file, _) in MODEL_FILES.items()}
+    models = {name: load_model(path) for name, path in model_paths.items()}
+    runtime_models = convert_models(
+        args.backend, models, model_paths, args.export_dir or os.path.join(args.models_dir, 'runtime'),
+        args.quantize, args.calibration_samples,
+    )
+    for name, agreement in top1_agreement(models, runtime_models, args.samples).items():
+        print(f"{name}: top-1 agreement {agreement:.1%} over {args.samples} canvases")
+
+
+if __name__ == '__main__':
+    main()
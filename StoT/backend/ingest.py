@@ -0,0 +1,114 @@
+"""Frame ingest for uploaded webcam frames.
+
+The skeleton only needs a few hundred pixels of hand, but browsers upload
+full-resolution screenshots. ``decode_frame`` reads the image size from the
+JPEG/PNG header and, when the frame is at least twice as wide as needed,
+lets libjpeg decode it at 1/2 or 1/4 scale (``IMREAD_REDUCED_COLOR_*``),
+which skips most of the IDCT work. Detected hands are then mapped back to
+the full capture resolution with ``scale_hands``.
+
+Instead of copying the whole frame with ``cv2.flip`` to get the mirrored
+webcam view, hands can be detected on the unflipped frame (with cvzone's
+``flipType=False``, which then yields the same handedness labels) and
+mirrored with ``mirror_hands``: x' = W - x, bbox x' = W - (x + w).
+"""
+import struct
+
+import cv2
+import numpy as np
+
+# Reduced-decode flags, largest reduction first
+REDUCED_DECODE = ((4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# JPEG start-of-frame markers (all except DHT 0xC4, JPG 0xC8 and DAC 0xCC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(data):
+    """(width, height) from a JPEG or PNG header, or None if it cannot be read"""
+    if data[:8] == PNG_SIGNATURE and len(data) >= 24:
+        width, height = struct.unpack('>II', data[16:24])
+        return width, height
+
+    if data[:2] != b'\xff\xd8':
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # Markers without a length
+            i += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def decode_frame(data, min_width=0):
+    """Decode JPEG/PNG bytes as small as ``min_width`` allows.
+
+    Returns ``(frame, (width, height))`` with the full-resolution size of the
+    image, or ``(None, None)`` if the bytes are not a valid image.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    size = image_size(data) if min_width else None
+
+    flag = cv2.IMREAD_COLOR
+    if size is not None:
+        for factor, reduced_flag in REDUCED_DECODE:
+            if size[0] // factor >= min_width:
+                flag = reduced_flag
+                break
+
+    frame = cv2.imdecode(buffer, flag)
+    if frame is None:
+        return None, None
+    if size is None or flag == cv2.IMREAD_COLOR:
+        return frame, (frame.shape[1], frame.shape[0])
+    width, height = size
+    if (width >= height) != (frame.shape[1] >= frame.shape[0]):
+        width, height = height, width  # EXIF rotation was applied while decoding
+    return frame, (width, height)
+
+
+def scale_hands(hands, scale_x, scale_y):
+    """Hand dicts with landmarks, bbox and center scaled by (scale_x, scale_y)"""
+    if scale_x == 1 and scale_y == 1:
+        return hands
+    scaled = []
+    for hand in hands:
+        hand = dict(hand)
+        hand['lmList'] = [[int(round(x * scale_x)), int(round(y * scale_y)), int(round(z * scale_x)), *rest]
+                          for x, y, z, *rest in hand['lmList']]
+        x, y, w, h = hand['bbox']
+        hand['bbox'] = (int(round(x * scale_x)), int(round(y * scale_y)),
+                        int(round(w * scale_x)), int(round(h * scale_y)))
+        if 'center' in hand:
+            bx, by, bw, bh = hand['bbox']
+            hand['center'] = (bx + bw // 2, by + bh // 2)
+        scaled.append(hand)
+    return scaled
+
+
+def mirror_hands(hands, width):
+    """Hand dicts mirrored horizontally in a frame ``width`` pixels wide"""
+    mirrored = []
+    for hand in hands:
+        hand = dict(hand)
+        hand['lmList'] = [[width - x, y, *rest] for x, y, *rest in hand['lmList']]
+        x, y, w, h = hand['bbox']
+        hand['bbox'] = (width - (x + w), y, w, h)
+        if 'center' in hand:
+            bx, by, bw, bh = hand['bbox']
+            hand['center'] = (bx + bw // 2, by + bh // 2)
+        mirrored.append(hand)
+    return mirrored
@@ -0,0 +1,134 @@
+"""Latest-frame-wins background inference for the sign-to-text backend.
+
+Every session has a ``FrameSlot``: a single-slot mailbox for the next frame
+to process plus the most recent finished result. A request drops its frame
+into the slot, replacing any frame still waiting there, and answers straight
+away with the latest result, its frame sequence number and its age.
+``LatestFrameWorker`` threads take frames out of the slots and run them
+through the pipeline. So a slow model never queues up a backlog of stale
+frames, the request latency no longer includes the model latency, and the
+worker always runs on the freshest frame of each session. A session's frames
+run on one worker at a time, so they finish in order: a frame arriving
+while its slot is running waits, and the worker queues the slot again when
+it is done.
+"""
+import queue
+import threading
+import time
+import traceback
+
+
+class FrameSlot:
+    """Single-slot frame mailbox and latest result for one session"""
+
+    __slots__ = ('_lock', '_job', '_job_seq', '_job_time', '_scheduled', 'seq', 'superseded',
+                 'result', 'result_seq', 'result_time')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._job = None
+        self._job_seq = 0
+        self._job_time = 0.0
+        self._scheduled = False  # Queued for, or being run by, a worker: at most one at a time
+        self.seq = 0  # Sequence number of the last frame put into the slot
+        self.superseded = 0  # Frames replaced before a worker got to them
+        self.result = None
+        self.result_seq = 0
+        self.result_time = 0.0  # When the frame behind the result arrived
+
+    def put(self, job):
+        """Store ``job`` as the next frame.
+
+        Returns (its seq, whether it replaced a waiting frame, whether the
+        caller must queue the slot: no worker has it queued or running).
+        """
+        with self._lock:
+            replaced = self._job is not None
+            if replaced:
+                self.superseded += 1
+            self.seq += 1
+            self._job, self._job_seq, self._job_time = job, self.seq, time.monotonic()
+            schedule = not self._scheduled
+            self._scheduled = True
+            return self.seq, replaced, schedule
+
+    def take(self):
+        """Empty the slot; returns (seq, arrival time, job) or None"""
+        with self._lock:
+            if self._job is None:
+                self._scheduled = False
+                return None
+            taken = (self._job_seq, self._job_time, self._job)
+            self._job = None
+            return taken
+
+    def finish(self, seq, arrived, result):
+        """Publish the result of frame ``seq``; returns whether a newer frame waits (re-queue the slot)"""
+        with self._lock:
+            if seq > self.result_seq:
+                self.result, self.result_seq, self.result_time = result, seq, arrived
+            self._scheduled = self._job is not None
+            return self._scheduled
+
+    def latest(self):
+        """(result, its seq, its age in seconds, whether a frame is waiting); result is None before the first"""
+        with self._lock:
+            age = time.monotonic() - self.result_time if self.result is not None else None
+            return self.result, self.result_seq, age, self._job is not None
+
+
+class LatestFrameWorker:
+    """Threads running ``process(job)`` on the newest frame of every session with one waiting"""
+
+    def __init__(self, process, threads=1):
+        self.process = process
+        self.processed = 0
+        self.superseded = 0
+        self._counts_lock = threading.Lock()  # submit() and the worker threads all update the counts
+        self._ready = queue.Queue()  # Slots holding a frame, each at most once and never while one runs
+        self._threads = [
+            threading.Thread(target=self._run, name=f'signbridge-frames-{i}', daemon=True)
+            for i in range(max(1, int(threads)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, slot, job):
+        """Put ``job`` into ``slot``; returns (its sequence number, whether it replaced a waiting frame)"""
+        seq, replaced, schedule = slot.put(job)
+        if schedule:
+            self._ready.put(slot)
+        if replaced:
+            with self._counts_lock:
+                self.superseded += 1
+        return seq, replaced
+
+    def _run(self):
+        while True:
+            slot = self._ready.get()
+            taken = slot.take()
+            if taken is None:
+                continue
+            seq, arrived, job = taken
+            try:
+                result = self.process(job)
+            except Exception as e:
+                print(f"Error in frame worker: {e}")
+                traceback.print_exc()
+                result = {'success': False, 'error': str(e)}
+            requeue = slot.finish(seq, arrived, result)
+            with self._counts_lock:
+                self.processed += 1
+            if requeue:
+                # A frame arrived while this one ran: queue the slot again, behind the other sessions
+                self._ready.put(slot)
+
+    def stats(self):
+        with self._counts_lock:
+            processed, superseded = self.processed, self.superseded
+        return {
+            'threads': len(self._threads),
+            'waiting': self._ready.qsize(),
+            'processed': processed,
+            'superseded': superseded,
+        }
@@ -0,0 +1,190 @@
+"""Low-overhead pipeline metrics in the Prometheus text format.
+
+``Metrics`` holds latency histograms and counters, each optionally split by
+one label (the pipeline stage, the model, the drop reason). Timing a stage
+is ``with metrics.time('detect'):``. When metrics are disabled every call
+returns a shared no-op context manager or does nothing, so the
+instrumentation costs a method call and nothing else. ``render()`` produces
+the text served on ``/metrics``.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, from sub-millisecond geometry to whole-frame inference
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class _Counter:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _Timer:
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_TIMER = _NoopTimer()
+
+
+class _Family:
+    """One metric name with its help text and children per label value"""
+
+    def __init__(self, kind, name, help_text, label, factory):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def child(self, value=''):
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(value, self._factory())
+        return child
+
+    def children(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+class TimedModel:
+    """Model proxy that records each forward pass in a histogram"""
+
+    def __init__(self, model, histogram):
+        self.model = model
+        self.input_shape = model.input_shape
+        self._histogram = histogram
+
+    def __call__(self, x, training=False):
+        with _Timer(self._histogram):
+            return self.model(x, training=training)
+
+    def predict(self, x, verbose=0):
+        with _Timer(self._histogram):
+            return self.model.predict(x, verbose=verbose)
+
+
+class Metrics:
+    """Registry of the pipeline's histograms and counters, a no-op when disabled"""
+
+    def __init__(self, enabled=False, namespace='signbridge', buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _family(self, kind, name, help_text, label):
+        family = self._families.get(name)
+        if family is None:
+            factory = (lambda: _Histogram(self.buckets)) if kind == 'histogram' else _Counter
+            with self._lock:
+                family = self._families.setdefault(
+                    name, _Family(kind, f"{self.namespace}_{name}", help_text, label, factory))
+        return family
+
+    def time(self, stage):
+        """Context manager recording the duration of a pipeline ``stage``"""
+        if not self.enabled:
+            return NOOP_TIMER
+        return _Timer(self._family('histogram', 'stage_seconds', 'Pipeline stage latency', 'stage').child(stage))
+
+    def observe(self, stage, seconds):
+        """Record ``seconds`` for a pipeline ``stage`` timed in several pieces"""
+        if self.enabled:
+            self._family('histogram', 'stage_seconds', 'Pipeline stage latency', 'stage').child(stage).observe(seconds)
+
+    def inc(self, name, help_text='', label=None, value='', amount=1):
+        """Increment counter ``name`` (with ``label=value`` if the counter has a label)"""
+        if self.enabled:
+            self._family('counter', f"{name}_total", help_text, label).child(value).inc(amount)
+
+    def instrument_model(self, name, model):
+        """Wrap ``model`` to time its forward passes under ``model="name"`` (or return it as is)"""
+        if not self.enabled or model is None:
+            return model
+        histogram = self._family('histogram', 'model_inference_seconds', 'Forward pass latency per model', 'model')
+        return TimedModel(model, histogram.child(name))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            families = sorted(self._families.values(), key=lambda family: family.name)
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for value, child in family.children():
+                labels = [(family.label, value)] if family.label else []
+                if family.kind == 'counter':
+                    lines.append(f"{family.name}{_format_labels(labels)} {child.value}")
+                    continue
+                counts, total, count = child.snapshot()
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{family.name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{family.name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{family.name}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,98 @@
+"""Motion / no-hand gating for incoming frames.
+
+Most kiosk frames show either nobody or the same still scene. Before paying
+for a full decode and ``hd.findHands``, ``MotionGate`` compares a tiny
+grayscale thumbnail of the frame with the thumbnail of the last frame that
+went through detection. For an encoded upload the thumbnail comes straight
+from libjpeg at 1/8 scale (``IMREAD_REDUCED_GRAYSCALE_8``, which only needs
+the DC coefficients), so a gated frame costs a fraction of a full decode.
+
+When too few thumbnail pixels changed, the caller reuses the hands found
+on that last frame instead of detecting again. The comparison is against
+the last detected frame rather than the previous upload, so slow movement
+still adds up to a change. A refresh interval bounds how long detection
+can be skipped. The gate also remembers when hands were last seen; after
+``idle_after`` seconds without hands, ``capture_interval`` returns a slower
+capture cadence for the client.
+"""
+import time
+
+import cv2
+import numpy as np
+
+THUMBNAIL_WIDTH = 64
+
+
+def _fit(gray, width):
+    height = max(1, round(gray.shape[0] * width / gray.shape[1]))
+    return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def encoded_thumbnail(data, width=THUMBNAIL_WIDTH):
+    """Grayscale thumbnail of JPEG/PNG bytes, decoded at 1/8 scale, or None if not an image"""
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    return None if gray is None else _fit(gray, width)
+
+
+def frame_thumbnail(frame, width=THUMBNAIL_WIDTH):
+    """Grayscale thumbnail of a BGR frame (shrunk before the color conversion)"""
+    small = _fit(frame, width)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+class MotionGate:
+    """Decides per frame whether detection must run, and keeps the hands it found last"""
+
+    __slots__ = ('pixel_threshold', 'changed_fraction', 'refresh', 'idle_after',
+                 'idle_interval_ms', 'active_interval_ms',
+                 'reference', 'hands', 'frame_shape', 'detected_at', 'hands_seen_at', 'skipped')
+
+    def __init__(self, pixel_threshold=8, changed_fraction=0.005, refresh=1.0,
+                 idle_after=3.0, idle_interval_ms=1000, active_interval_ms=0):
+        self.pixel_threshold = pixel_threshold  # Gray levels a pixel must change by to count
+        self.changed_fraction = changed_fraction  # Fraction of pixels that must change
+        self.refresh = refresh  # Seconds after which detection runs regardless
+        self.idle_after = idle_after
+        self.idle_interval_ms = idle_interval_ms
+        self.active_interval_ms = active_interval_ms
+        self.reference = None
+        self.hands = []
+        self.frame_shape = None
+        self.detected_at = 0.0
+        self.hands_seen_at = time.monotonic()
+        self.skipped = 0
+
+    def unchanged(self, thumbnail, now=None):
+        """Whether ``thumbnail`` matches the last detected frame closely enough to reuse its hands"""
+        now = time.monotonic() if now is None else now
+        reference = self.reference
+        if reference is None or thumbnail.shape != reference.shape or now - self.detected_at > self.refresh:
+            return False
+        changed = np.count_nonzero(cv2.absdiff(thumbnail, reference) > self.pixel_threshold)
+        if changed > self.changed_fraction * thumbnail.size:
+            return False
+        self.skipped += 1
+        return True
+
+    def update(self, thumbnail, hands, frame_shape, now=None):
+        """Record the result of running detection on the frame behind ``thumbnail``"""
+        now = time.monotonic() if now is None else now
+        self.reference = thumbnail
+        self.hands = hands
+        self.frame_shape = frame_shape
+        self.detected_at = now
+        if hands:
+            self.hands_seen_at = now
+
+    def idle(self, now=None):
+        now = time.monotonic() if now is None else now
+        return now - self.hands_seen_at > self.idle_after
+
+    def capture_interval(self, now=None):
+        """Suggested ms between client captures: slower once hands have been absent for a while.
+
+        None means no suggestion (the client keeps its own rate).
+        """
+        if self.idle(now):
+            return self.idle_interval_ms
+        return self.active_interval_ms or None
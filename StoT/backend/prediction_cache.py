@@ -0,0 +1,71 @@
+"""LRU cache of ensemble outcomes keyed on the skeleton's landmark signature.
+
+While a signer holds a letter, consecutive frames produce (almost) the same
+skeleton. The key is built from the landmarks after the skeleton transform,
+i.e. already normalised to the hand bounding box on the 400x400 canvas, and
+quantized to a grid of ``tolerance * 400`` pixels. With ``tolerance=0`` only
+identical skeletons share an entry, and since the model inputs are rendered
+from exactly these points, a hit returns what the models would have
+produced. Larger tolerances trade a little accuracy for fewer model runs.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from skeleton import CANVAS_SIZE
+
+
+class PredictionCache:
+    """Bounded LRU mapping landmark signatures to (probabilities, decision)"""
+
+    def __init__(self, max_entries=256, tolerance=0.0):
+        self.max_entries = max(1, int(max_entries))
+        self.tolerance = max(0.0, float(tolerance))
+        self.hits = 0
+        self.misses = 0
+        self._step = self.tolerance * CANVAS_SIZE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, points):
+        """Quantized signature for transformed skeleton ``points``, or None if there is no skeleton"""
+        if points is None:
+            return None
+        points = np.asarray(points)
+        if self._step > 1:
+            points = np.floor_divide(points, self._step)
+        return points.shape, points.astype(np.int16).tobytes()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'tolerance': self.tolerance,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,113 @@
+"""Shared, allocation-free preprocessing of skeletons into model inputs.
+
+The old and big models both take the same 256x256 input and the best model
+a 224x224 one. ``ModelInputs.prepare`` renders each distinct resolution
+once, straight into a preallocated uint8 canvas, and normalises it into a
+preallocated float32 ``(batch, size, size, 3)`` buffer with a single
+in-place divide (the same float32 ``x / 255.0`` as before). Every model
+reading a resolution gets a view of the same buffer.
+
+Werkzeug serves every request on a new thread, so the buffers live in a
+small lock-guarded pool shared by all threads rather than per thread.
+``prepare`` takes a buffer set out of the pool and returns ``Inputs``, a
+dict of views into it; releasing the ``Inputs`` (or leaving its ``with``
+block) puts the set back. Pooled sets hold ``max_batch`` frames, so the
+pool never grows past ``pool_size * max_batch`` frames of buffers; larger
+batches (a /transcribe chunk) get temporary buffers instead.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+from skeleton import CANVAS_SIZE, render_skeleton
+
+
+class Inputs(dict):
+    """``{size: (n, size, size, 3) float32}`` views of a pooled buffer set, valid until released"""
+
+    def __init__(self, views, pool=None, buffers=None):
+        super().__init__(views)
+        self._pool = pool
+        self._buffers = buffers
+
+    def release(self):
+        """Return the buffers to the pool; the arrays must not be used afterwards"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool._give_back(self._buffers)
+        self._buffers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class ModelInputs:
+    """Pooled preallocated input buffers for a set of model input resolutions"""
+
+    def __init__(self, sizes, native_render=True, markers=True, chained_resize=False,
+                 max_batch=8, pool_size=4):
+        self.sizes = tuple(sorted(set(sizes), reverse=True))
+        self.native_render = native_render
+        self.markers = markers  # Red landmark markers on single-hand canvases (see render_skeleton)
+        # Without native rendering, resize each size from the next larger one (400 -> 256 -> 224)
+        # instead of straight from the 400x400 canvas
+        self.chained_resize = chained_resize
+        self.max_batch = max(1, int(max_batch))
+        self.pool_size = max(0, int(pool_size))
+        self._free = []
+        self._lock = threading.Lock()
+
+    def _new_buffers(self, capacity):
+        return {
+            'inputs': {size: np.empty((capacity, size, size, 3), dtype=np.float32) for size in self.sizes},
+            'canvases': {size: np.empty((size, size, 3), dtype=np.uint8) for size in self.sizes},
+            'full_canvas': np.empty((CANVAS_SIZE, CANVAS_SIZE, 3), dtype=np.uint8),
+        }
+
+    def _take(self, batch):
+        """A buffer set for ``batch`` frames and whether it belongs to the pool"""
+        if batch > self.max_batch:
+            return self._new_buffers(batch), False
+        with self._lock:
+            if self._free:
+                return self._free.pop(), True
+        return self._new_buffers(self.max_batch), True
+
+    def _give_back(self, buffers):
+        with self._lock:
+            if len(self._free) < self.pool_size:
+                self._free.append(buffers)
+
+    def prepare(self, skeletons):
+        """Normalised ``Inputs`` ``{size: (n, size, size, 3) float32}`` for a list of skeletons.
+
+        Each skeleton is a ``transform_landmarks`` result (or None for an
+        empty canvas). Release the result (``with model_inputs.prepare(...)
+        as inputs:``) once the models have run on it.
+        """
+        batch = len(skeletons)
+        buffers, pooled = self._take(batch)
+        inputs, canvases = buffers['inputs'], buffers['canvases']
+        for row, points in enumerate(skeletons):
+            source = None
+            if not self.native_render:
+                source = render_skeleton(points, CANVAS_SIZE, out=buffers['full_canvas'], markers=self.markers)
+            for size in self.sizes:
+                canvas = canvases[size]
+                if self.native_render:
+                    render_skeleton(points, size, out=canvas, markers=self.markers)
+                else:
+                    cv2.resize(source, (size, size), dst=canvas)
+                    if self.chained_resize:
+                        source = canvas
+                np.divide(canvas, 255.0, out=inputs[size][row], dtype=np.float32)
+        views = {size: inputs[size][:batch] for size in self.sizes}
+        return Inputs(views, self, buffers) if pooled else Inputs(views)
+
+    def prepare_one(self, points):
+        """Normalised ``(1, size, size, 3)`` inputs for a single skeleton"""
+        return self.prepare([points])
@@ -1,18 +1,34 @@
 import cv2
-import numpy as np
 import json
 import sys
 import os
+import time
 from cvzone.HandTrackingModule import HandDetector
 from keras.models import load_model
-import pyttsx3
+
+# Shared pipeline modules live in the backend directory above this one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fusion import top_k
+from hand_tracking import HandTracker
+from motion_gate import MotionGate, frame_thumbnail
+from preprocess import ModelInputs
+from trace_store import TraceStore
+from skeleton import render_skeleton, transform_landmarks
 
 # Check if running in socket mode
 SOCKET_MODE = '--socket' in sys.argv
+# Track hands in a crop around their last position instead of searching every full frame
+TRACKING_MODE = '--track' in sys.argv
+# Skip detection, inference and the frame update while the camera image does not change
+GATE_MODE = '--gate' in sys.argv
+# Append every processed frame's landmarks and model probabilities to a trace store: --record DIR
+RECORD_DIR = sys.argv[sys.argv.index('--record') + 1] if '--record' in sys.argv[:-1] else ''
 
 # Initialize hand detector
 hd = HandDetector(maxHands=2, detectionCon=0.5, minTrackCon=0.5)
 offset = 29
+# The script's original input path: no landmark markers, and 400 -> 256 -> 224 resizes
+model_inputs = ModelInputs((256, 224), native_render=False, markers=False, chained_resize=True)
 
 # Load models
 try:
@@ -31,11 +47,10 @@ except Exception as e:
     print(json.dumps({'error': str(e)}))
     sys.exit(1)
 
-# Initialize text-to-speech engine
-speak_engine = pyttsx3.init()
-speak_engine.setProperty("rate", 100)
-voices = speak_engine.getProperty("voices")
-speak_engine.setProperty("voice", voices[0].id)
+# Index -> letter tables, built once instead of per frame
+old_labels = list(old_class_indices.keys())
+best_labels = list(best_class_indices.keys())
+big_labels = list(big_class_indices.keys())
 
 # Global variables
 current_symbol = " "
@@ -51,33 +66,26 @@ def send_update(type, data):
     else:
         print(f"{type}: {data}")
 
-def predict(test_image, hands):
+def predict(points, hands):
+    """Predict and send the letter for the skeleton at ``points``; returns the three probability vectors"""
     global current_symbol, current_text, suggestions, prev_char, ten_prev_char, count
     
     try:
-        # Resize images for each model
-        old_input = cv2.resize(test_image, (256, 256))
-        old_input = old_input.astype(np.float32) / 255.0
-        
-        best_input = cv2.resize(test_image, (224, 224))
-        best_input = best_input.astype(np.float32) / 255.0
-        
-        big_input = cv2.resize(test_image, (256, 256))
-        big_input = big_input.astype(np.float32) / 255.0
-        
-        # Get predictions
-        old_predictions = old_model.predict(old_input.reshape(1, 256, 256, 3), verbose=0)[0]
-        best_predictions = best_model.predict(best_input.reshape(1, 224, 224, 3), verbose=0)[0]
-        big_predictions = big_model.predict(big_input.reshape(1, 256, 256, 3), verbose=0)[0]
+        # Render and normalise each input resolution once, into reused buffers
+        with model_inputs.prepare_one(points) as inputs:
+            # Get predictions (the old and big models share the 256x256 input)
+            old_predictions = old_model.predict(inputs[256], verbose=0)[0]
+            best_predictions = best_model.predict(inputs[224], verbose=0)[0]
+            big_predictions = big_model.predict(inputs[256], verbose=0)[0]
         
         # Get top predictions
-        old_top3_idx = np.argsort(old_predictions)[-3:][::-1]
-        best_top3_idx = np.argsort(best_predictions)[-3:][::-1]
-        big_top3_idx = np.argsort(big_predictions)[-3:][::-1]
+        old_top3_idx = top_k(old_predictions)
+        best_top3_idx = top_k(best_predictions)
+        big_top3_idx = top_k(big_predictions)
         
-        old_predicted_letter = list(old_class_indices.keys())[old_top3_idx[0]]
-        best_predicted_letter = list(best_class_indices.keys())[best_top3_idx[0]]
-        big_predicted_letter = list(big_class_indices.keys())[big_top3_idx[0]]
+        old_predicted_letter = old_labels[old_top3_idx[0]]
+        best_predicted_letter = best_labels[best_top3_idx[0]]
+        big_predicted_letter = big_labels[big_top3_idx[0]]
         
         # Update current symbol and suggestions
         current_symbol = best_predicted_letter
@@ -105,12 +113,20 @@ def predict(test_image, hands):
             current_text = ""
         elif current_symbol != " ":
             current_text += current_symbol
+
+        return old_predictions, best_predictions, big_predictions
             
     except Exception as e:
         send_update('error', {'message': str(e)})
 
 def main():
     cap = cv2.VideoCapture(0)
+    tracker = HandTracker(hd) if TRACKING_MODE else None
+    gate = MotionGate() if GATE_MODE else None
+    store = trace = None
+    if RECORD_DIR:
+        store = TraceStore(RECORD_DIR)
+        trace = store.session('camera', ('old', 'best', 'big'), (old_labels, best_labels, big_labels))
     
     while True:
         success, frame = cap.read()
@@ -118,114 +134,43 @@ def main():
             break
             
         frame = cv2.flip(frame, 1)
-        hands, _ = hd.findHands(frame, draw=False, flipType=True)
+        if gate is not None:
+            thumbnail = frame_thumbnail(frame)
+            if gate.unchanged(thumbnail):
+                # Same scene as the last processed frame: nothing new to detect or send.
+                # Poll the camera less often once no hands have been seen for a while
+                if cv2.waitKey(gate.capture_interval() or 1) & 0xFF == ord('q'):
+                    break
+                continue
+
+        if tracker is not None:
+            hands = tracker.find_hands(frame)
+        else:
+            hands, _ = hd.findHands(frame, draw=False, flipType=True)
+        if gate is not None:
+            gate.update(thumbnail, hands, frame.shape)
         
+        probabilities = None
         if hands:
-            # Create white canvas
-            white = np.ones((400, 400, 3), dtype=np.uint8) * 255
-            cv2.rectangle(white, (0,0), (399,399), (0,0,0), 2)
-            
-            if len(hands) == 2:
-                # Handle both hands
-                bboxes = []
-                combined_landmarks = []
-                hands.sort(key=lambda x: x['bbox'][0])
-                
-                for hand in hands:
-                    bboxes.append(hand['bbox'])
-                    combined_landmarks.extend(hand['lmList'])
-                
-                x = max(0, min(b[0] for b in bboxes) - offset)
-                y = max(0, min(b[1] for b in bboxes) - offset)
-                w = min(frame.shape[1] - x, max(b[0] + b[2] for b in bboxes) - x + 2*offset)
-                h = min(frame.shape[0] - y, max(b[1] + b[3] for b in bboxes) - y + 2*offset)
-                
-                scale = min(350/w, 350/h)
-                os = (400 - int(w * scale)) // 2
-                os1 = (400 - int(h * scale)) // 2
-                
-                for hand in hands:
-                    for lm in hand['lmList']:
-                        cx = int((lm[0] - x) * scale) + os
-                        cy = int((lm[1] - y) * scale) + os1
-                        cv2.circle(white, (cx, cy), 5, (0, 255, 0), cv2.FILLED)
-                    
-                    connections = [
-                        [0,1,2,3,4], [0,5,6,7,8], [0,9,10,11,12],
-                        [0,13,14,15,16], [0,17,18,19,20]
-                    ]
-                    
-                    for connection in connections:
-                        for i in range(len(connection)-1):
-                            pt1 = hand['lmList'][connection[i]]
-                            pt2 = hand['lmList'][connection[i+1]]
-                            x1 = int((pt1[0] - x) * scale) + os
-                            y1 = int((pt1[1] - y) * scale) + os1
-                            x2 = int((pt2[0] - x) * scale) + os
-                            y2 = int((pt2[1] - y) * scale) + os1
-                            cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-                    
-                    palm_connections = [[0,5], [5,9], [9,13], [13,17], [0,17]]
-                    for start, end in palm_connections:
-                        pt1 = hand['lmList'][start]
-                        pt2 = hand['lmList'][end]
-                        x1 = int((pt1[0] - x) * scale) + os
-                        y1 = int((pt1[1] - y) * scale) + os1
-                        x2 = int((pt2[0] - x) * scale) + os
-                        y2 = int((pt2[1] - y) * scale) + os1
-                        cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-            else:
-                # Single hand
-                hand = hands[0]
-                x, y, w, h = hand['bbox']
-                x = max(0, x - offset)
-                y = max(0, y - offset)
-                w = min(frame.shape[1] - x, w + 2*offset)
-                h = min(frame.shape[0] - y, h + 2*offset)
-                
-                scale = min(350/w, 350/h)
-                os = (400 - int(w * scale)) // 2
-                os1 = (400 - int(h * scale)) // 2
-                
-                connections = [
-                    [0,1,2,3,4], [0,5,6,7,8], [0,9,10,11,12],
-                    [0,13,14,15,16], [0,17,18,19,20]
-                ]
-                
-                for connection in connections:
-                    for i in range(len(connection)-1):
-                        pt1 = hand['lmList'][connection[i]]
-                        pt2 = hand['lmList'][connection[i+1]]
-                        x1 = int((pt1[0] - x) * scale) + os
-                        y1 = int((pt1[1] - y) * scale) + os1
-                        x2 = int((pt2[0] - x) * scale) + os
-                        y2 = int((pt2[1] - y) * scale) + os1
-                        cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-                
-                palm_connections = [[0,5], [5,9], [9,13], [13,17], [0,17]]
-                for start, end in palm_connections:
-                    pt1 = hand['lmList'][start]
-                    pt2 = hand['lmList'][end]
-                    x1 = int((pt1[0] - x) * scale) + os
-                    y1 = int((pt1[1] - y) * scale) + os1
-                    x2 = int((pt2[0] - x) * scale) + os
-                    y2 = int((pt2[1] - y) * scale) + os1
-                    cv2.line(white, (x1, y1), (x2, y2), (0,255,0), 2)
-            
-            # Resize for prediction
-            res = cv2.resize(white, (256, 256))
-            predict(res, hands)
+            # Skeleton in 400x400 canvas coordinates (see skeleton.py)
+            points = transform_landmarks(hands, frame.shape, offset)
+            probabilities = predict(points, hands)
             
             # Send frame update
             if SOCKET_MODE:
+                white = render_skeleton(points, markers=False)
                 _, buffer = cv2.imencode('.jpg', white)
                 send_update('frame', {'frame': buffer.tobytes().hex()})
+        if trace is not None:
+            trace.append(time.time(), hands, frame.shape, probabilities)
         
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
     
     cap.release()
     cv2.destroyAllWindows()
+    if store is not None:
+        store.close()
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""Multi-process production server for the sign-to-text backend.
+
+``python app.py`` runs Flask's debug server: one process (the GIL
+serialises the Python parts of every request) plus a reloader process with
+a second copy of everything. ``serve.py`` instead runs N worker processes
+under a small master that restarts workers that die and forwards SIGTERM /
+SIGINT to them.
+
+The master never imports app.py: TensorFlow is not fork-safe once its
+runtime and thread pools have started, so each worker is forked clean and
+then imports the app, builds and warms up the three models and serves with
+Werkzeug's threaded server. Before forking, the master reads the models'
+weights with h5py (no TensorFlow) into shared memory, and every worker
+builds its models on those pages (see shared_weights.py), so the weights
+are held once however many workers run. ``--no-share-weights`` (or the
+TFLite / ONNX backends, which convert from private Keras models) makes each
+worker load its own copy instead. Each worker gets its own TensorFlow
+intra-op / inter-op thread counts (default: the cores divided between the
+workers, one inter-op thread) and, with ``--pin``, its own slice of the
+cores.
+
+Sessions live in worker memory, so every worker listens on its own port
+(``--port`` + its index): a load balancer in front pins each signer's
+session to one of them. ``/metrics`` and ``/cascade`` likewise report the
+worker that answers. The default is one worker.
+
+    python serve.py --workers 4 --port 5000 [--intra-op-threads 2] [--pin]
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+
+
+def configure_threads(intra_op, inter_op):
+    """Size TensorFlow's (and OpenMP's) thread pools; must run before TensorFlow starts"""
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op)
+    os.environ['OMP_NUM_THREADS'] = str(intra_op)
+    os.environ['SIGNBRIDGE_INTRA_OP_THREADS'] = str(intra_op)  # TFLite / ONNX Runtime sessions
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except ImportError:
+        pass
+    except RuntimeError as e:
+        print(f"Could not set TensorFlow thread counts: {e}")
+
+
+def worker_cpus(index, cpus, per_worker):
+    """The ``per_worker`` cores for worker ``index``, wrapping around when they run out"""
+    return {cpus[(index * per_worker + i) % len(cpus)] for i in range(per_worker)}
+
+
+def run_worker(index, host, port, threads, cpus):
+    """Load the app in this (freshly forked) worker and serve it on ``port``"""
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    configure_threads(*threads)
+
+    # Build the models in this process (on the master's shared weights), before serving
+    os.environ['SIGNBRIDGE_BACKGROUND_STARTUP'] = '0'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app
+    from werkzeug.serving import make_server
+
+    if not app.readiness.ready:
+        print(f"❌ Worker {index}: models not ready ({app.readiness.snapshot()['detail']}); "
+              "answering without them")
+    server = make_server(host, port, app.app, threaded=True)
+    print(f"✓ Worker {index} (pid {os.getpid()}) serving on http://{host}:{port}"
+          + (f", CPUs {sorted(cpus)}" if cpus else ''))
+    server.serve_forever()
+
+
+class Master:
+    """Forks the workers and keeps ``workers`` of them running until told to stop"""
+
+    def __init__(self, host, port, workers, threads, cpus_for):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads  # (intra-op, inter-op) per worker
+        self.cpus_for = cpus_for
+        self.children = {}  # pid -> worker index
+        self.stopping = False
+
+    def spawn(self, index):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(index, self.host, self.port + index, self.threads, self.cpus_for(index))
+            except KeyboardInterrupt:
+                pass
+            except Exception as e:
+                print(f"❌ Worker {index} failed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = index
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.workers):
+            self.spawn(index)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index = self.children.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            print(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(1)  # Do not spin when a worker dies at startup
+            self.spawn(index)
+
+
+def main():
+    cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Pre-fork server for the SignBridge backend")
+    parser.add_argument('--host', default=os.environ.get('SIGNBRIDGE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('SIGNBRIDGE_PORT', '5000')),
+                        help="port of the first worker; worker i listens on port + i")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SIGNBRIDGE_WORKERS', '1')),
+                        help="worker processes, sharing one copy of the model weights")
+    parser.add_argument('--intra-op-threads', type=int, default=int(os.environ.get('SIGNBRIDGE_INTRA_OP_THREADS', '0')),
+                        help="threads per operation in each worker (default: cores / workers)")
+    parser.add_argument('--inter-op-threads', type=int, default=int(os.environ.get('SIGNBRIDGE_INTER_OP_THREADS', '1')),
+                        help="operations run in parallel in each worker")
+    parser.add_argument('--pin', action='store_true', default=os.environ.get('SIGNBRIDGE_PIN_CPUS', '0') == '1',
+                        help="pin each worker to its own intra-op-threads cores")
+    parser.add_argument('--no-share-weights', dest='share_weights', action='store_false',
+                        default=os.environ.get('SIGNBRIDGE_SHARE_WEIGHTS', '1') == '1',
+                        help="let every worker load a private copy of the model weights")
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    intra_op = args.intra_op_threads or max(1, cpu_count // workers)
+    inter_op = max(1, args.inter_op_threads)
+    cpus = sorted(os.sched_getaffinity(0)) if args.pin and hasattr(os, 'sched_getaffinity') else []
+    ports = f"{args.port}" if workers == 1 else f"{args.port}-{args.port + workers - 1}"
+    print(f"Starting {workers} worker{'s' if workers > 1 else ''} on {args.host} port {ports} "
+          f"({intra_op} intra-op / {inter_op} inter-op threads each)")
+
+    if args.share_weights and os.environ.get('SIGNBRIDGE_BACKEND', 'keras') == 'keras':
+        # Workers import the same module, with the weights read here, when app.py loads its models
+        backend_dir = os.path.dirname(os.path.abspath(__file__))
+        sys.path.insert(0, backend_dir)
+        import shared_weights
+        from startup import MODEL_FILES
+
+        models_dir = os.environ.get('SIGNBRIDGE_MODELS_DIR', os.path.join(backend_dir, 'models'))
+        shared_weights.preload(os.path.join(models_dir, model_file) for model_file, _ in MODEL_FILES.values())
+
+    Master(args.host, args.port, workers, (intra_op, inter_op),
+           lambda index: worker_cpus(index, cpus, intra_op) if cpus else None).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Per-session recognition state for the sign-to-text backend.
+
+Every signer gets its own RecognitionState, looked up by session id in a
+SessionStore. The store is split into shards, each guarded by its own lock,
+so lookups from different signers rarely contend. Each state also carries
+a lock that is held for the duration of a request touching it. Sessions
+idle for longer than ``idle_timeout`` seconds are evicted.
+"""
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from latest_frame import FrameSlot
+
+DEFAULT_SESSION_ID = 'default'
+
+
+class RecognitionState:
+    """Recognition and sentence state for one signer (the former app.py globals)"""
+
+    __slots__ = (
+        'current_symbol', 'prev_char', 'str_text', 'count', 'ten_prev_char',
+        'last_next_time', 'next_gesture_counter', 'last_valid_symbol',
+        'word1', 'word2', 'word3', 'word4',
+        'word1_sug', 'word2_sug', 'word3_sug', 'word4_sug', 'suggestion_text',
+        'last_prediction_time', 'gesture_start_time', 'consistent_gesture_count',
+        'last_gesture_type', 'last_appended_symbol',
+        'current_top3_idx', 'last_used_model',
+        'preview_options', 'preview_key', 'preview_image',
+        'tracker', 'motion_gate', 'frame_slot', 'trace', 'session_id', 'lock', 'last_seen',
+    )
+
+    def __init__(self, preview_options=None, session_id=DEFAULT_SESSION_ID):
+        # Tracking state (EXACT from webtrial2.py)
+        self.current_symbol = "C"
+        self.prev_char = " "
+        self.str_text = " "
+        self.count = -1
+        self.ten_prev_char = [" "] * 10
+        self.last_next_time = 0
+        self.next_gesture_counter = 0
+        self.last_valid_symbol = ""
+
+        # Word suggestions (exact from webtrial2.py)
+        self.word1 = self.word2 = self.word3 = self.word4 = " "
+        self.word1_sug = self.word2_sug = self.word3_sug = self.word4_sug = " "
+        self.suggestion_text = None  # Sentence the word suggestions were computed for
+
+        # Timing variables for gesture detection
+        self.last_prediction_time = 0
+        self.gesture_start_time = 0
+        self.consistent_gesture_count = 0
+        self.last_gesture_type = ""
+        self.last_appended_symbol = ""  # Last symbol appended, to prevent duplicates
+
+        # Prediction indices and the model that produced them
+        self.current_top3_idx = [0, 1, 2]
+        self.last_used_model = "big"
+
+        # Skeletal preview settings and the last encoded preview, reused while unchanged
+        self.preview_options = dict(preview_options or {'mode': 'off', 'size': 400, 'quality': 80})
+        self.preview_key = None
+        self.preview_image = None
+
+        # Hand tracker following this signer's hands between frames (when tracking is enabled)
+        self.tracker = None
+        # Thumbnail of the last detected frame and its hands (when the motion gate is enabled)
+        self.motion_gate = None
+
+        # Latest-frame mailbox and result for asynchronous inference
+        self.frame_slot = FrameSlot()
+
+        # Landmark trace segment this session is recorded to (when recording is enabled)
+        self.trace = None
+        self.session_id = session_id
+
+        self.lock = threading.Lock()
+        self.last_seen = time.monotonic()
+
+    @property
+    def suggestions(self):
+        return [self.word1, self.word2, self.word3, self.word4]
+
+    @property
+    def word_suggestions(self):
+        return [self.word1_sug, self.word2_sug, self.word3_sug, self.word4_sug]
+
+    def clear_suggestions(self):
+        self.word1 = self.word2 = self.word3 = self.word4 = " "
+        self.word1_sug = self.word2_sug = self.word3_sug = self.word4_sug = " "
+        self.suggestion_text = None
+
+    def close(self):
+        """Release what outlives the request: the trace segment is flushed and closed"""
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def clear_letter_backlog(self):
+        self.current_symbol = "C"
+        self.prev_char = " "
+        self.count = -1
+        self.ten_prev_char = [" "] * 10
+        self.last_valid_symbol = ""
+        self.last_appended_symbol = ""
+
+
+class SessionStore:
+    """Sharded session-id -> RecognitionState map with per-shard locks and idle eviction"""
+
+    def __init__(self, shards=16, idle_timeout=1800, sweep_interval=60, preview_options=None):
+        self.preview_options = preview_options
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._shards = [{} for _ in range(max(1, shards))]
+        self._locks = [threading.Lock() for _ in self._shards]
+        self._last_sweep = [time.monotonic()] * len(self._shards)
+
+    def _shard_index(self, session_id):
+        return zlib.crc32(session_id.encode('utf-8')) % len(self._shards)
+
+    def get(self, session_id):
+        """Return the state for ``session_id``, creating it if needed"""
+        index = self._shard_index(session_id)
+        sessions = self._shards[index]
+        now = time.monotonic()
+        with self._locks[index]:
+            state = sessions.get(session_id)
+            if state is None:
+                state = sessions[session_id] = RecognitionState(self.preview_options, session_id)
+            state.last_seen = now
+            if now - self._last_sweep[index] > self.sweep_interval:
+                self._evict_idle(sessions, now)
+                self._last_sweep[index] = now
+        return state
+
+    @contextmanager
+    def session(self, session_id):
+        """Hold the session's lock while the caller reads or mutates its state"""
+        state = self.get(session_id)
+        with state.lock:
+            yield state
+
+    def _evict_idle(self, sessions, now):
+        for session_id, state in list(sessions.items()):
+            if now - state.last_seen <= self.idle_timeout:
+                continue
+            # Skip sessions a request is using; holding the lock keeps requests out while closing
+            if not state.lock.acquire(blocking=False):
+                continue
+            try:
+                del sessions[session_id]
+                state.close()
+            finally:
+                state.lock.release()
+
+    def __len__(self):
+        return sum(len(sessions) for sessions in self._shards)
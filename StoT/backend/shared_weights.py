@@ -0,0 +1,141 @@
+"""Model weights shared by the worker processes of serve.py.
+
+TensorFlow is not fork-safe once it has started, so serve.py's master never
+imports it. Instead, ``preload`` reads the weights of the three ``.h5``
+files with h5py, before the workers are forked, into one anonymous shared
+memory mapping per model. Every worker (including ones restarted later)
+maps the same physical pages.
+
+In a worker, ``SharedModel`` builds the Keras model from the file's config
+without allocating its variables, and runs it through ``stateless_call``
+with zero-copy (DLPack) tensors over the shared arrays. So N workers hold
+one copy of the weights instead of N. This needs Keras 3 on TensorFlow;
+when the shared weights cannot be used, ``loader`` falls back to loading
+the file normally.
+
+``SharedModel`` behaves like the Keras model as far as the rest of the
+pipeline is concerned (``input_shape``, ``predict(x, verbose=0)`` and
+``__call__(x, training=False)``), like the runtime wrappers in
+inference_backend.py, so the fused and sequential ensembles, the cascade
+and the warm-up run on it unchanged.
+"""
+import json
+import mmap
+import os
+
+import numpy as np
+
+ALIGNMENT = 64  # TensorFlow wraps CPU buffers aligned to 64 bytes without copying them
+
+# Weights read in the master before forking: absolute model path -> SharedWeights
+preloaded = {}
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class SharedWeights:
+    """A legacy ``.h5`` model's config and weight arrays, read into one anonymous shared mapping"""
+
+    def __init__(self, path):
+        import h5py
+
+        with h5py.File(path, 'r') as f:
+            self.config = _text(f.attrs['model_config'])
+            group = f['model_weights'] if 'model_weights' in f else f
+            datasets = []  # (layer name, [dataset, ...]) for the layers that have weights, in file order
+            for layer_name in group.attrs['layer_names']:
+                layer_group = group[_text(layer_name)]
+                names = [_text(name) for name in layer_group.attrs['weight_names']]
+                if names:
+                    datasets.append((_text(layer_name), [layer_group[name] for name in names]))
+
+            sizes = [-(-dataset.nbytes // ALIGNMENT) * ALIGNMENT for _, layer in datasets for dataset in layer]
+            self.nbytes = sum(sizes)
+            # An anonymous mmap is MAP_SHARED: forked workers see the same pages, not copies
+            self._buffer = mmap.mmap(-1, max(1, self.nbytes))
+            self.layers = []
+            offset = 0
+            for layer_name, layer in datasets:
+                arrays = []
+                for dataset in layer:
+                    array = np.frombuffer(self._buffer, dtype=dataset.dtype, count=dataset.size, offset=offset)
+                    array = array.reshape(dataset.shape)
+                    if dataset.size:
+                        dataset.read_direct(array)
+                    arrays.append(array)
+                    offset += -(-dataset.nbytes // ALIGNMENT) * ALIGNMENT
+                self.layers.append((layer_name, arrays))
+
+
+class SharedModel:
+    """A Keras 3 model that runs on ``SharedWeights`` instead of variables of its own"""
+
+    def __init__(self, weights):
+        import keras
+        import tensorflow as tf
+        from keras.src.legacy.saving import saving_utils  # The config reader load_model uses for .h5 files
+
+        self.weights = weights
+        self._keras = keras
+        # Create the layers' variables without allocating or initialising them
+        with keras.StatelessScope(initialize_variables=False):
+            self.model = saving_utils.model_from_config(json.loads(weights.config))
+        self.input_shape = tuple(self.model.input_shape)
+
+        # Match the arrays to the layers with weights by position, as the legacy .h5 loader does
+        layers = [layer for layer in self.model.layers if layer.weights]
+        if len(layers) != len(weights.layers):
+            raise ValueError(f"the file has weights for {len(weights.layers)} layers, the model {len(layers)}")
+        values = {}
+        for layer, (layer_name, arrays) in zip(layers, weights.layers):
+            variables = layer.trainable_weights + layer.non_trainable_weights
+            if [tuple(v.shape) for v in variables] != [array.shape for array in arrays]:
+                raise ValueError(f"weights of layer '{layer_name}' do not match the model config")
+            for variable, array in zip(variables, arrays):
+                values[id(variable)] = tf.experimental.dlpack.from_dlpack(array.__dlpack__())
+
+        # Variables that are not weights (dropout seed states) are not in the file; inference never reads them
+        def value(variable):
+            if id(variable) in values:
+                return values[id(variable)]
+            return tf.zeros(variable.shape, dtype=variable.dtype)
+
+        self._trainable = [value(v) for v in self.model.trainable_variables]
+        self._non_trainable = [value(v) for v in self.model.non_trainable_variables]
+        self._predict = tf.function(lambda x: self(x), reduce_retracing=True)
+
+    def __call__(self, x, training=False):
+        # The enclosing scope keeps stateless_call's own scope from allocating the variables on exit
+        with self._keras.StatelessScope(initialize_variables=False):
+            return self.model.stateless_call(self._trainable, self._non_trainable, x, training=training)[0]
+
+    def predict(self, x, verbose=0):
+        return self._predict(np.asarray(x, dtype=np.float32)).numpy()
+
+
+def preload(paths):
+    """Read the weights of ``paths`` into shared memory; call in the master, before forking"""
+    for path in paths:
+        try:
+            weights = SharedWeights(path)
+        except Exception as e:
+            print(f"❌ Could not share the weights of {path} ({e}); workers load it themselves")
+            continue
+        preloaded[os.path.abspath(path)] = weights
+        print(f"✓ Shared {os.path.basename(path)} weights ({weights.nbytes / 2 ** 20:.1f} MB)")
+
+
+def loader(load_model):
+    """``load_model``, except that preloaded files are built on their shared weights"""
+    def load(path):
+        weights = preloaded.get(os.path.abspath(path))
+        if weights is None:
+            return load_model(path)
+        try:
+            return SharedModel(weights)
+        except Exception as e:
+            print(f"Shared weights unusable for {os.path.basename(path)} ({e}), loading a private copy")
+            return load_model(path)
+    return load
@@ -0,0 +1,140 @@
+"""Shared skeleton renderer for the sign recognition pipeline.
+
+Both app.py and python/sign_language.py draw detected hands as a green
+skeleton on a white 400x400 canvas before feeding it to the models. This
+module does the landmark transform for all points in one NumPy operation,
+draws every bone with a single ``cv2.polylines`` call and starts from a
+preallocated template canvas. It can also render straight at the model
+input resolutions, so the 400 -> 256/224 resize chain can be skipped.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+CANVAS_SIZE = 400
+FIT_SIZE = 350
+OFFSET = 29
+
+# Finger chains plus the palm outline (0-5, 5-9, 9-13, 13-17, 17-0)
+HAND_CHAINS = (
+    (0, 1, 2, 3, 4),
+    (0, 5, 6, 7, 8),
+    (0, 9, 10, 11, 12),
+    (0, 13, 14, 15, 16),
+    (0, 17, 18, 19, 20),
+    (0, 5, 9, 13, 17, 0),
+)
+
+GREEN = (0, 255, 0)
+RED = (0, 0, 255)
+BLACK = (0, 0, 0)
+
+# Fixed-point bits used for sub-pixel drawing below canvas resolution
+SHIFT = 4
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def _template(size):
+    template = _templates.get(size)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(size)
+            if template is None:
+                template = np.full((size, size, 3), 255, dtype=np.uint8)
+                thickness = max(1, round(2 * size / CANVAS_SIZE))
+                cv2.rectangle(template, (0, 0), (size - 1, size - 1), BLACK, thickness)
+                template.setflags(write=False)
+                _templates[size] = template
+    return template
+
+
+def crop_region(hands, frame_shape, offset=OFFSET):
+    """Padded crop (x, y, w, h) around one hand or the union of two hands, clipped to the frame"""
+    bboxes = np.asarray([hand['bbox'] for hand in hands], dtype=np.int64)
+    x = max(0, int(bboxes[:, 0].min()) - offset)
+    y = max(0, int(bboxes[:, 1].min()) - offset)
+    if len(hands) == 1:
+        w = min(frame_shape[1] - x, int(bboxes[0, 2]) + 2 * offset)
+        h = min(frame_shape[0] - y, int(bboxes[0, 3]) + 2 * offset)
+    else:
+        w = min(frame_shape[1] - x, int((bboxes[:, 0] + bboxes[:, 2]).max()) - x + 2 * offset)
+        h = min(frame_shape[0] - y, int((bboxes[:, 1] + bboxes[:, 3]).max()) - y + 2 * offset)
+    return x, y, w, h
+
+
+def transform_landmarks(hands, frame_shape, offset=OFFSET):
+    """Map hand landmarks to integer 400x400 canvas coordinates.
+
+    Returns an ``(n_hands, 21, 2)`` int32 array, or None when there are no
+    hands. Two hands are ordered left to right by bbox, as the drawing code
+    always did.
+    """
+    if not hands:
+        return None
+    if len(hands) == 2:
+        hands = sorted(hands, key=lambda hand: hand['bbox'][0])
+
+    x, y, w, h = crop_region(hands, frame_shape, offset)
+    scale = min(FIT_SIZE / w, FIT_SIZE / h)
+    origin = np.array([x, y], dtype=np.float64)
+    margin = np.array([
+        (CANVAS_SIZE - int(w * scale)) // 2,
+        (CANVAS_SIZE - int(h * scale)) // 2,
+    ], dtype=np.int32)
+
+    landmarks = np.asarray([hand['lmList'] for hand in hands], dtype=np.float64)[:, :, :2]
+    # astype truncates toward zero, exactly like the int() calls it replaces
+    return ((landmarks - origin) * scale).astype(np.int32) + margin
+
+
+def render_skeleton(points, size=CANVAS_SIZE, out=None, markers=True):
+    """Draw transformed landmarks as a skeleton on a fresh (or ``out``) canvas of ``size``.
+
+    ``points`` are 400x400 canvas coordinates from ``transform_landmarks``.
+    For other sizes the geometry is scaled the same way ``cv2.resize`` would
+    map the 400x400 canvas, using sub-pixel drawing. ``markers`` draws the
+    red landmark markers of a single hand (app.py's canvas has them,
+    sign_language.py's never did).
+    """
+    template = _template(size)
+    if out is None:
+        canvas = template.copy()
+    else:
+        canvas = out
+        np.copyto(canvas, template)
+    if points is None or len(points) == 0:
+        return canvas
+
+    if size == CANVAS_SIZE:
+        factor = 1.0
+        shift = 0
+        line_type = cv2.LINE_8
+        pts = points
+    else:
+        # Anti-aliased sub-pixel strokes approximate the smoothing of a downscale
+        factor = size / CANVAS_SIZE
+        shift = SHIFT
+        line_type = cv2.LINE_AA
+        pts = np.rint(((points + 0.5) * factor - 0.5) * (1 << SHIFT)).astype(np.int32)
+
+    line_thickness = max(1, round(2 * factor))
+    chains = [pts[hand][list(chain)] for hand in range(len(pts)) for chain in HAND_CHAINS]
+
+    if len(pts) == 2:
+        # Two hands: filled landmark dots under the bones
+        radius = max(1, round(5 * factor * (1 << shift)))
+        for cx, cy in pts.reshape(-1, 2).tolist():
+            cv2.circle(canvas, (cx, cy), radius, GREEN, cv2.FILLED, line_type, shift)
+        cv2.polylines(canvas, chains, False, GREEN, line_thickness, line_type, shift=shift)
+    else:
+        # Single hand: bones first, then (optionally) small red landmark markers
+        cv2.polylines(canvas, chains, False, GREEN, line_thickness, line_type, shift=shift)
+        if not markers:
+            return canvas
+        radius = max(1, round(factor * (1 << shift)))
+        for cx, cy in pts[0].tolist():
+            cv2.circle(canvas, (cx, cy), radius, RED, 1, line_type, shift)
+    return canvas
@@ -0,0 +1,200 @@
+"""Non-blocking text-to-speech for the sign-to-text backend.
+
+pyttsx3 engines are not safe to share between threads, and ``runAndWait``
+blocks for the whole utterance. SpeechWorker owns the only engine, on its
+own thread, and takes jobs from a bounded queue, so callers return right
+away (or learn at once that the queue is full).
+
+Besides speaking through the server's audio device, the worker can render
+an utterance to a WAV file with ``save_to_file``. Rendered files live in an
+on-disk LRU cache keyed by text, voice and rate, so a repeated phrase is
+served straight from disk without touching the engine.
+"""
+import hashlib
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class AudioCache:
+    """On-disk LRU of rendered WAV files, bounded by the number of entries"""
+
+    def __init__(self, directory, max_entries=256):
+        self.directory = directory
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Pick up files rendered by earlier runs, least recently used first
+        files = [name for name in os.listdir(directory) if name.endswith('.wav')]
+        for name in sorted(files, key=lambda name: os.path.getmtime(os.path.join(directory, name))):
+            self._entries[name[:-len('.wav')]] = None
+        self._prune()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def get(self, key):
+        """Path of the cached file for ``key``, or None"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self.path(key)
+        try:
+            os.utime(path)  # Keep the on-disk order in step for the next restart
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return path
+
+    def add(self, key):
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        for key in evicted:
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SpeechWorker:
+    """Single thread owning the pyttsx3 engine, fed through a bounded job queue"""
+
+    def __init__(self, rate=100, voice=0, queue_size=8, cache_dir=None, cache_entries=256):
+        self.rate = rate
+        self.voice = voice  # Index into the engine's voices, or a voice id
+        self.cache = AudioCache(cache_dir, cache_entries) if cache_dir else None
+        self.available = None  # Unknown until the engine has been initialised
+        self.spoken = 0
+        self.rendered = 0
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='signbridge-speech', daemon=True)
+        self._thread.start()
+
+    def _init_engine(self):
+        import pyttsx3
+
+        engine = pyttsx3.init()
+        engine.setProperty("rate", self.rate)
+        if isinstance(self.voice, int):
+            voices = engine.getProperty("voices")
+            if voices and self.voice < len(voices):
+                engine.setProperty("voice", voices[self.voice].id)
+        elif self.voice:
+            engine.setProperty("voice", self.voice)
+        return engine
+
+    def wait_ready(self, timeout=None):
+        """Wait for the engine to initialise; returns whether TTS is available"""
+        self._ready.wait(timeout)
+        return bool(self.available)
+
+    def key(self, text):
+        """Cache key for ``text`` at this worker's voice and rate"""
+        return hashlib.sha1(f"{self.voice}\0{self.rate}\0{text}".encode('utf-8')).hexdigest()
+
+    def _submit(self, kind, text, key=None):
+        future = Future()
+        self._queue.put_nowait((kind, text, key, future))  # Raises queue.Full when saturated
+        return future
+
+    def say(self, text):
+        """Queue ``text`` to be spoken on the server; raises queue.Full if the queue is full"""
+        return self._submit('say', text)
+
+    def render(self, text):
+        """Future for the path of a WAV rendering of ``text``, already resolved on a cache hit.
+
+        Raises queue.Full if a new rendering cannot be queued.
+        """
+        if self.cache is None:
+            raise RuntimeError("speech rendering needs a cache directory")
+        key = self.key(text)
+        path = self.cache.get(key)
+        if path is not None:
+            future = Future()
+            future.set_result(path)
+            return future
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._submit('render', text, key)
+        return future
+
+    def is_pending(self, key):
+        """Whether a rendering for ``key`` is queued or in progress"""
+        with self._lock:
+            return key in self._pending
+
+    def _render(self, engine, text, key):
+        path = self.cache.path(key)
+        partial = f"{path[:-len('.wav')]}.{os.getpid()}.partial.wav"
+        engine.save_to_file(text, partial)
+        engine.runAndWait()
+        os.replace(partial, path)
+        self.cache.add(key)
+        self.rendered += 1
+        return path
+
+    def _run(self):
+        try:
+            engine = self._init_engine()
+            self.available = True
+            print("✓ TTS engine initialized")
+        except Exception as e:
+            print(f"TTS initialization error: {e}")
+            engine = None
+            self.available = False
+        self._ready.set()
+
+        while True:
+            kind, text, key, future = self._queue.get()
+            try:
+                if engine is None:
+                    raise RuntimeError("TTS not available")
+                if kind == 'say':
+                    start = time.perf_counter()
+                    engine.say(text)
+                    engine.runAndWait()
+                    self.spoken += 1
+                    future.set_result(time.perf_counter() - start)
+                else:
+                    future.set_result(self._render(engine, text, key))
+            except Exception as e:
+                print(f"Speech error: {str(e)}")
+                traceback.print_exc()
+                future.set_exception(e)
+            finally:
+                if key is not None:
+                    with self._lock:
+                        self._pending.pop(key, None)
+
+    def stats(self):
+        return {
+            'available': self.available,
+            'queued': self._queue.qsize(),
+            'queue_size': self._queue.maxsize,
+            'spoken': self.spoken,
+            'rendered': self.rendered,
+            'cached': len(self.cache) if self.cache is not None else 0,
+        }
@@ -0,0 +1,143 @@
+"""Startup subsystem for the sign-to-text backend.
+
+The three Keras models are loaded concurrently instead of one after the
+other. With a cache directory configured, the first load also writes a
+Keras-format (``.keras``) copy of each ``.h5`` file, keyed by the source
+file's size and mtime, and later restarts load that copy and skip the legacy
+HDF5 conversion. After loading, every model and the ensemble engine run
+warm-up forward passes at their input shapes, so TensorFlow builds and
+traces its graphs before real frames arrive. ``Readiness`` tracks where
+startup is, for the ``/ready`` probe.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Model and class-index files in the models directory (exact from webtrial2.py)
+MODEL_FILES = {
+    'old': ('isl_model_v2.h5', 'class_indices.json'),  # Old model for specific letters
+    'best': ('best_skeletal_model.h5', 'skeletal_class_indices.json'),
+    'big': ('big_skeletal_model.h5', 'skeletal_class_indices2.json'),
+}
+
+
+class Readiness:
+    """Startup stage ('starting', 'loading', 'warming', 'ready' or 'failed') plus per-step timings"""
+
+    def __init__(self):
+        self.stage = 'starting'
+        self.detail = ''
+        self.timings = {}
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set(self, stage, detail=''):
+        with self._lock:
+            self.stage = stage
+            self.detail = detail
+
+    def record(self, step, seconds):
+        with self._lock:
+            self.timings[step] = round(seconds, 3)
+
+    @property
+    def ready(self):
+        return self.stage == 'ready'
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'ready': self.stage == 'ready',
+                'stage': self.stage,
+                'detail': self.detail,
+                'uptime': round(time.monotonic() - self._started, 3),
+                'timings': dict(self.timings),
+            }
+
+
+def cached_model_path(model_path, cache_dir):
+    """Path of the Keras-format copy of ``model_path``; changes whenever the source file does"""
+    stat = os.stat(model_path)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{stat.st_size}-{stat.st_mtime_ns}.keras")
+
+
+def load_model_file(model_path, loader, cache_dir=None):
+    """Load one model, through the cached Keras-format copy when ``cache_dir`` is set"""
+    if not cache_dir:
+        return loader(model_path)
+
+    cached = cached_model_path(model_path, cache_dir)
+    if os.path.exists(cached):
+        try:
+            return loader(cached)
+        except Exception as e:
+            print(f"Cached model {cached} unusable ({e}), loading {model_path}")
+
+    model = loader(model_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a temporary name so concurrent workers never load a partial file
+        partial = f"{cached[:-len('.keras')]}.{os.getpid()}.partial.keras"
+        model.save(partial)
+        os.replace(partial, cached)
+        print(f"✓ Cached {os.path.basename(model_path)} as {cached}")
+    except Exception as e:
+        print(f"Could not cache {model_path}: {e}")
+    return model
+
+
+def load_models(specs, loader, cache_dir=None, max_workers=None):
+    """Load models and their class indices concurrently.
+
+    ``specs`` maps a model name to ``(model_path, indices_path)``. Returns a
+    dict mapping each name to ``(model, class_indices)``, with
+    ``(None, {})`` for models that are missing or failed to load.
+    """
+    def load_one(name):
+        model_path, indices_path = specs[name]
+        if not os.path.exists(model_path):
+            print(f"❌ {name} model not found at: {model_path}")
+            return None, {}
+        start = time.perf_counter()
+        model = load_model_file(model_path, loader, cache_dir)
+        with open(indices_path, 'r') as f:
+            class_indices = json.load(f)
+        print(f"✓ Loaded {name} model in {time.perf_counter() - start:.1f}s")
+        return model, class_indices
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(specs)) as pool:
+        futures = {name: pool.submit(load_one, name) for name in specs}
+
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"Error loading {name} model: {str(e)}")
+            traceback.print_exc()
+            results[name] = (None, {})
+    return results
+
+
+def warm_up(models, engine=None, passes=1):
+    """Run forward passes on blank inputs at each model's input shape.
+
+    Every model is called directly (the path the cascade uses), and the
+    ensemble ``engine`` gets the full (old, best, big) input tuple, which
+    traces the fused graph or builds the Keras predict functions.
+    """
+    inputs = tuple(
+        np.ones((1,) + tuple(model.input_shape[1:]), dtype=np.float32)
+        for model in models
+    )
+    for _ in range(max(1, passes)):
+        for model, x in zip(models, inputs):
+            model(x, training=False)
+        if engine is not None:
+            engine(inputs)
@@ -0,0 +1,76 @@
+"""The cascade against the full vote on frames where the models disagree"""
+import os
+import sys
+from string import ascii_uppercase
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cascade import CascadeEnsemble
+from fusion import Fusion, default_policy
+
+OWNED = {
+    'old': ['A', 'T', 'B', 'X'],
+    'best': ['B', 'C', 'G', 'I', 'J', 'L', 'M', 'S', 'V', 'X', 'Z', 'Q', 'R'],
+    'big': ['D', 'F', 'G', 'H', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'U', 'V', 'W', 'Y', 'R'],
+}
+SPECIAL = ['F', 'Q', 'R', 'D', 'K', 'T', 'P', 'W', 'I']
+SGOP = ['G', 'O', 'P', 'S']
+LABELS = list(ascii_uppercase)
+
+fusion = Fusion({name: LABELS for name in ('old', 'best', 'big')}, default_policy(SPECIAL, SGOP, OWNED))
+
+
+def vote(old, best, big):
+    return fusion.decide(np.stack((old, best, big)))[0]
+
+
+def scores(letter, confidence):
+    """A probability vector with ``letter`` on top at ``confidence``"""
+    p = np.full(len(LABELS), (1.0 - confidence) / (len(LABELS) - 1), dtype=np.float32)
+    p[LABELS.index(letter)] = confidence
+    return p
+
+
+def cascade(frame, approximate):
+    models = {name: (lambda p: lambda x, training=False: p[None])(frame[name]) for name in frame}
+    return CascadeEnsemble(models, {'old': 256, 'best': 224, 'big': 256},
+                           {name: LABELS for name in frame}, OWNED, vote,
+                           threshold=0.95, guarded_letters=SPECIAL + SGOP, approximate=approximate)
+
+
+CONFLICTS = [
+    # A confident owner outvoted by a special letter from a model it would have skipped
+    {'old': scores('A', 0.5), 'best': scores('B', 0.97), 'big': scores('K', 0.9)},
+    # Owner confident, the other two agree on something else
+    {'old': scores('X', 0.85), 'best': scores('C', 0.99), 'big': scores('X', 0.9)},
+    # Owner confident, a skipped model saturated at exactly 1.0
+    {'old': scores('A', 1.0), 'best': scores('L', 0.96), 'big': scores('H', 0.4)},
+    # S/G/O/P group and a weak special letter
+    {'old': scores('B', 0.3), 'best': scores('S', 0.99), 'big': scores('G', 0.97)},
+    {'old': scores('T', 0.6), 'best': scores('M', 0.98), 'big': scores('M', 0.99)},
+]
+
+
+def same(a, b):
+    if a is None or b is None:
+        return a is b
+    return a[0] == b[0] and a[2] == b[2] and list(a[1]) == list(b[1])
+
+
+@pytest.mark.parametrize('frame', CONFLICTS)
+def test_cascade_matches_vote(frame):
+    inputs = {256: np.zeros((1, 1)), 224: np.zeros((1, 1))}
+    probabilities, decision = cascade(frame, approximate=False)(inputs)
+    assert same(decision, vote(frame['old'], frame['best'], frame['big']))
+    assert all(p is not None for p in probabilities)
+
+
+def test_approximate_cascade_can_skip_an_override():
+    frame = CONFLICTS[0]
+    engine = cascade(frame, approximate=True)
+    _, decision = engine({256: np.zeros((1, 1)), 224: np.zeros((1, 1))})
+    assert vote(frame['old'], frame['best'], frame['big'])[0] == 'K'
+    assert decision[0] == 'B' and engine.stage_counts[1] == 1
@@ -0,0 +1,224 @@
+"""The fusion policy against the webtrial2.py voting tree it replaced"""
+import json
+import os
+import sys
+from collections import Counter
+from string import ascii_uppercase
+
+import numpy as np
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from fusion import Fusion, default_policy
+
+OWNED = {
+    'old': ['A', 'T', 'B', 'X'],
+    'best': ['B', 'C', 'G', 'I', 'J', 'L', 'M', 'S', 'V', 'X', 'Z', 'Q', 'R'],
+    'big': ['D', 'F', 'G', 'H', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'U', 'V', 'W', 'Y', 'R'],
+}
+SPECIAL = ['F', 'Q', 'R', 'D', 'K', 'T', 'P', 'W', 'I']
+SGOP = ['G', 'O', 'P', 'S']
+INDEX_FILES = {'old': 'class_indices.json', 'best': 'skeletal_class_indices.json', 'big': 'skeletal_class_indices2.json'}
+
+
+def original_vote(old_predictions, best_predictions, big_predictions, old_class_indices, best_class_indices,
+                  big_class_indices):
+    """The voting part of the original predict(), statement for statement, without its prints.
+
+    Returns (current_symbol, top3_idx, model_used), or None where predict() returned early.
+    """
+    old_model_letters, best_model_letters, big_model_letters = OWNED['old'], OWNED['best'], OWNED['big']
+    current_symbol = None
+
+    old_top3_idx = np.argsort(old_predictions)[-3:][::-1]
+    best_top3_idx = np.argsort(best_predictions)[-3:][::-1]
+    big_top3_idx = np.argsort(big_predictions)[-3:][::-1]
+
+    old_predicted_letter = list(old_class_indices.keys())[old_top3_idx[0]]
+    best_predicted_letter = list(best_class_indices.keys())[best_top3_idx[0]]
+    big_predicted_letter = list(big_class_indices.keys())[big_top3_idx[0]]
+
+    special_letters = ['F','Q','R','D','K', 'T', 'P','W','I']
+    predicted_letters = [old_predicted_letter, best_predicted_letter, big_predicted_letter]
+
+    top3_idx = big_top3_idx
+    model_used = "big"
+
+    if 'S' in predicted_letters and all(letter in ['G', 'O', 'P', 'S'] for letter in predicted_letters):
+        s_predictions = []
+        if old_predicted_letter == 'S':
+            s_predictions.append((old_predictions[old_top3_idx[0]], old_predictions, old_top3_idx, 'old'))
+        if best_predicted_letter == 'S':
+            s_predictions.append((best_predictions[best_top3_idx[0]], best_predictions, best_top3_idx, 'best'))
+        if big_predicted_letter == 'S':
+            s_predictions.append((big_predictions[big_top3_idx[0]], big_predictions, big_top3_idx, 'big'))
+
+        if s_predictions:
+            conf, preds, idx, model_name = max(s_predictions, key=lambda x: x[0])
+            current_symbol = 'S'
+            top3_idx = idx
+            model_used = model_name
+    else:
+        for special_letter in special_letters:
+            if special_letter in predicted_letters:
+                special_predictions = []
+                if old_predicted_letter == special_letter:
+                    special_predictions.append((old_predictions[old_top3_idx[0]], old_predictions, old_top3_idx, 'old'))
+                if best_predicted_letter == special_letter:
+                    special_predictions.append((best_predictions[best_top3_idx[0]], best_predictions, best_top3_idx, 'best'))
+                if big_predicted_letter == special_letter:
+                    special_predictions.append((big_predictions[big_top3_idx[0]], big_predictions, big_top3_idx, 'big'))
+
+                if special_predictions:
+                    conf, preds, idx, model_name = max(special_predictions, key=lambda x: x[0])
+                    if conf > 0.8:
+                        current_symbol = special_letter
+                        top3_idx = idx
+                        model_used = model_name
+                        break
+                    else:
+                        return None
+        else:
+            all_predictions = [
+                (old_predictions[old_top3_idx[0]], old_predicted_letter, old_predictions, old_top3_idx, 'old'),
+                (best_predictions[best_top3_idx[0]], best_predicted_letter, best_predictions, best_top3_idx, 'best'),
+                (big_predictions[big_top3_idx[0]], big_predicted_letter, big_predictions, big_top3_idx, 'big')
+            ]
+
+            perfect_predictions = [pred for pred in all_predictions if pred[0] == 1.0]
+            if perfect_predictions:
+                # All three branches of the original take the first perfect prediction
+                conf, letter, preds, idx, model_name = perfect_predictions[0]
+                current_symbol = letter
+                top3_idx = idx
+                model_used = model_name
+            else:
+                letter_counts = {}
+                for conf, letter, preds, idx, model_name in all_predictions:
+                    if letter not in letter_counts:
+                        letter_counts[letter] = []
+                    letter_counts[letter].append((conf, preds, idx, model_name))
+
+                majority_letters = {letter: votes for letter, votes in letter_counts.items() if len(votes) >= 2}
+
+                if majority_letters:
+                    best_letter = max(majority_letters.items(),
+                                      key=lambda x: sum(vote[0] for vote in x[1]) / len(x[1]))
+                    letter, votes = best_letter
+                    conf, preds, idx, model_name = max(votes, key=lambda x: x[0])
+                    if conf > 0.8:
+                        current_symbol = letter
+                        top3_idx = idx
+                        model_used = model_name
+                    else:
+                        return None
+                else:
+                    all_predictions = []
+                    if old_predicted_letter in old_model_letters:
+                        all_predictions.append((old_predictions[old_top3_idx[0]], old_predicted_letter, old_predictions, old_top3_idx, 'old'))
+                    if best_predicted_letter in best_model_letters:
+                        all_predictions.append((best_predictions[best_top3_idx[0]], best_predicted_letter, best_predictions, best_top3_idx, 'best'))
+                    if big_predicted_letter in big_model_letters:
+                        all_predictions.append((big_predictions[big_top3_idx[0]], big_predicted_letter, big_predictions, big_top3_idx, 'big'))
+
+                    if not all_predictions:
+                        return None
+
+                    all_predictions.sort(key=lambda x: x[0], reverse=True)
+                    conf, letter, preds, idx, model_name = all_predictions[0]
+                    if conf > 0.8:
+                        current_symbol = letter
+                        top3_idx = idx
+                        model_used = model_name
+                    else:
+                        return None
+
+    if current_symbol is None:
+        return None
+    return current_symbol, top3_idx, model_used
+
+
+def original_suggestions(class_indices, top3_idx):
+    """The letter suggestions of the original update_suggestions()"""
+    return [list(class_indices.keys())[i] for i in top3_idx]
+
+
+def real_tables():
+    tables = {}
+    for name, index_file in INDEX_FILES.items():
+        with open(os.path.join(BACKEND, 'models', index_file)) as f:
+            tables[name] = json.load(f)
+    return tables
+
+
+def shuffled_tables(rng, extra=0):
+    """Per-model class indices in different orders, ``extra`` made-up classes past the 26 letters"""
+    labels = list(ascii_uppercase) + [f'x{i}' for i in range(extra)]
+    return {name: {labels[j]: i for i, j in enumerate(rng.permutation(len(labels)))} for name in INDEX_FILES}
+
+
+LETTER_POOLS = (SPECIAL, SGOP, sorted(set().union(*OWNED.values())), list(ascii_uppercase))
+CONFIDENCES = (1.0, 0.95, 0.85, 0.8, 0.75, 0.5)
+
+
+def frame_probabilities(rng, tables):
+    """(3, classes) probabilities around the rules' edges.
+
+    The top letters come from the special, S/G/O/P or owned letters and
+    often agree. Confidences sit on the 0.8 and 1.0 thresholds, and some rows
+    tie at the top.
+    """
+    label_lists = [list(table) for table in tables.values()]
+    classes = len(label_lists[0])
+    if rng.random() < 0.15:
+        return rng.dirichlet(np.full(classes, 0.2), size=3).astype(np.float32)
+
+    pool = LETTER_POOLS[rng.integers(len(LETTER_POOLS))]
+    letters = [pool[rng.integers(len(pool))] for _ in range(3)]
+    if rng.random() < 0.5:
+        letters[rng.integers(3)] = letters[rng.integers(3)]  # Two (or three) models agree
+    rows = []
+    for labels, letter in zip(label_lists, letters):
+        confidence = CONFIDENCES[rng.integers(len(CONFIDENCES))] if rng.random() < 0.7 else rng.uniform(0.2, 1.0)
+        row = np.zeros(classes)
+        others = [i for i in range(classes) if i != labels.index(letter)]
+        row[others] = rng.dirichlet(np.ones(classes - 1)) * (1.0 - confidence)
+        row[labels.index(letter)] = confidence
+        if rng.random() < 0.1:
+            row[others[rng.integers(len(others))]] = confidence  # A tie at the top
+        rows.append(row)
+    return np.array(rows, dtype=np.float32)
+
+
+def check_against_original(rng, tables, frames):
+    fusion = Fusion({name: table.keys() for name, table in tables.items()}, default_policy(SPECIAL, SGOP, OWNED))
+    batch = np.stack([frame_probabilities(rng, tables) for _ in range(frames)])
+    result = fusion.evaluate(batch)
+
+    for frame, probabilities in enumerate(batch):
+        expected = original_vote(*probabilities, *tables.values())
+        for actual in (fusion.decide(probabilities)[0], result.decision(frame)):
+            if expected is None:
+                assert actual is None, f"frame {frame}"
+                continue
+            assert actual is not None, f"frame {frame}"
+            symbol, top3_idx, model_used = actual
+            assert (symbol, model_used) == (expected[0], expected[2]), f"frame {frame}"
+            assert np.array_equal(top3_idx, expected[1]), f"frame {frame}"
+            assert fusion.label_list(model_used, top3_idx) == original_suggestions(tables[model_used], expected[1])
+    return Counter(rule if model >= 0 else 'veto' for rule, model in zip(result.rules, result.models))
+
+
+def test_real_class_tables_match_the_original_vote():
+    rules = check_against_original(np.random.default_rng(23), real_tables(), 6000)
+    assert all(rules[rule] > 50 for rule in ('group', 'special', 'perfect', 'majority', 'owned', 'veto')), rules
+
+
+@pytest.mark.parametrize('extra', [0, 134])
+def test_shuffled_class_tables_match_the_original_vote(extra):
+    rng = np.random.default_rng(230 + extra)
+    for _ in range(5):
+        rules = check_against_original(rng, shuffled_tables(rng, extra), 800)
+        assert rules['veto'] and len(rules) > 3, rules
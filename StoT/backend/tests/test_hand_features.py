@@ -0,0 +1,269 @@
+"""HandFeatures against the per-call hand-shape and gesture helpers it replaced"""
+import math
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_features import HandFeatures, shape_letter
+
+
+# The original helpers from app.py / webtrial2.py, without their prints
+
+def distance(x, y):
+    return math.sqrt(((x[0] - y[0]) ** 2) + ((x[1] - y[1]) ** 2))
+
+
+def is_finger_straight(finger_points):
+    try:
+        angle1 = calculate_angle(finger_points[0], finger_points[1], finger_points[2])
+        angle2 = calculate_angle(finger_points[1], finger_points[2], finger_points[3])
+        return angle1 > 160 and angle2 > 160
+    except:
+        return False
+
+
+def calculate_angle(p1, p2, p3):
+    try:
+        v1 = np.array([p1[0] - p2[0], p1[1] - p2[1]])
+        v2 = np.array([p3[0] - p2[0], p3[1] - p2[1]])
+        angle = np.degrees(np.arccos(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))))
+        return angle
+    except:
+        return 0
+
+
+def calculate_curl(finger_points):
+    try:
+        start = np.array(finger_points[0])
+        mid = np.array(finger_points[2])
+        end = np.array(finger_points[3])
+        return calculate_angle(start, mid, end)
+    except:
+        return 0
+
+
+def analyze_hand_shape(landmarks):
+    try:
+        if len(landmarks) == 42:
+            hand1 = landmarks[:21]
+            hand2 = landmarks[21:]
+            if check_two_handed_d(hand1, hand2):
+                return 'D'
+            return None
+
+        palm_width = distance(landmarks[5], landmarks[17])
+
+        features = {
+            'thumb_angle': calculate_angle(landmarks[0], landmarks[2], landmarks[4]),
+            'index_straight': is_finger_straight(landmarks[5:9]),
+            'middle_straight': is_finger_straight(landmarks[9:13]),
+            'ring_curl': calculate_curl(landmarks[13:17]),
+            'pinky_curl': calculate_curl(landmarks[17:21]),
+            'index_middle_distance': distance(landmarks[8], landmarks[12]),
+            'index_tip_y': landmarks[8][1],
+            'middle_tip_y': landmarks[12][1],
+            'index_middle_angle': calculate_angle(landmarks[5], landmarks[9], landmarks[12]),
+            'index_middle_parallel': abs(calculate_angle(landmarks[6], landmarks[8], [landmarks[8][0], landmarks[8][1]-10]) -
+                                      calculate_angle(landmarks[10], landmarks[12], [landmarks[12][0], landmarks[12][1]-10])),
+            'ring_pinky_separation': distance(landmarks[16], landmarks[20]) / palm_width,
+            'middle_ring_separation': distance(landmarks[12], landmarks[16]) / palm_width,
+        }
+
+        is_d = (
+            features['index_straight'] and
+            features['middle_straight'] and
+            features['ring_curl'] > 30 and
+            features['pinky_curl'] > 30 and
+            abs(features['index_tip_y'] - features['middle_tip_y']) < palm_width * 0.2 and
+            features['index_middle_distance'] < palm_width * 0.3 and
+            features['index_middle_angle'] < 25 and
+            features['index_middle_parallel'] < 20 and
+            features['middle_ring_separation'] > 0.3 and
+            features['ring_pinky_separation'] < 0.4
+        )
+
+        if is_d:
+            return 'D'
+        elif features['index_straight'] and not features['middle_straight']:
+            return 'B'
+        elif all(features[f'{finger}_curl'] > 45 for finger in ['ring', 'pinky']):
+            return 'O'
+        elif features['thumb_angle'] > 45:
+            return 'Z'
+        else:
+            return 'C'
+
+    except Exception:
+        return None
+
+
+def check_two_handed_d(hand1, hand2):
+    try:
+        return (is_index_up_hand(hand1) and is_c_shape_hand(hand2)) or \
+               (is_index_up_hand(hand2) and is_c_shape_hand(hand1))
+    except Exception:
+        return False
+
+
+def is_index_up_hand(landmarks):
+    try:
+        index_straight = is_finger_straight(landmarks[5:9])
+        middle_curl = calculate_curl(landmarks[9:13])
+        ring_curl = calculate_curl(landmarks[13:17])
+        pinky_curl = calculate_curl(landmarks[17:21])
+        index_vertical = abs(landmarks[8][0] - landmarks[5][0]) < 30
+        return (
+            index_straight and
+            middle_curl > 30 and
+            ring_curl > 30 and
+            pinky_curl > 30 and
+            index_vertical
+        )
+    except Exception:
+        return False
+
+
+def is_c_shape_hand(landmarks):
+    try:
+        thumb_tip = landmarks[4]
+        index_tip = landmarks[8]
+        middle_tip = landmarks[12]
+        ring_tip = landmarks[16]
+        pinky_tip = landmarks[20]
+        all_fingers_curved = all(
+            30 < calculate_curl(landmarks[i:i+4]) < 120
+            for i in [5, 9, 13, 17]
+        )
+        tips_y_sorted = sorted([thumb_tip[1], index_tip[1], middle_tip[1], ring_tip[1], pinky_tip[1]])
+        tips_form_curve = abs(tips_y_sorted[-1] - tips_y_sorted[0]) < 100
+        return all_fingers_curved and tips_form_curve
+    except Exception:
+        return False
+
+
+def hand_open(pts):
+    return all(pts[tip][1] < pts[pip][1] for tip, pip in [(8, 6), (12, 10), (16, 14), (20, 18)])
+
+
+def next_gesture(hand):
+    pts = hand['lmList']
+    fingers_extended = [pts[8][1] < pts[6][1], pts[12][1] < pts[10][1],
+                        pts[16][1] < pts[14][1], pts[20][1] < pts[18][1]]
+    thumb_extended = pts[4][0] > pts[3][0] if hand['type'] == 'Right' else pts[4][0] < pts[3][0]
+    all_fingers_extended = all(fingers_extended) and thumb_extended
+    finger_spread = (
+        abs(pts[8][0] - pts[12][0]) > 20 and
+        abs(pts[12][0] - pts[16][0]) > 15 and
+        abs(pts[16][0] - pts[20][0]) > 10
+    )
+    palm_facing = abs(pts[0][1] - pts[9][1]) > 40
+    return all_fingers_extended and finger_spread and palm_facing
+
+
+# Seeded hands: jointed fingers that are straight, half bent or curled, plus noise
+
+def random_hand(rng):
+    wrist = rng.uniform(100, 500, 2)
+    heading = rng.uniform(-math.pi, math.pi) if rng.random() < 0.3 else -math.pi / 2 + rng.normal(0, 0.3)
+    scale = rng.uniform(0.3, 2.0)
+    points = [wrist]
+    # Thumb, then index to pinky, fanned out around the heading
+    for finger, spread in enumerate((-0.9, -0.3, 0.0, 0.25, 0.5)):
+        direction = heading + spread * rng.uniform(0.2, 1.6)
+        base = wrist + 60 * scale * np.array([math.cos(direction), math.sin(direction)])
+        if finger == 0:
+            base = wrist + 25 * scale * np.array([math.cos(direction), math.sin(direction)])
+        bend = rng.choice([0.0, 0.6, 1.5]) + rng.normal(0, 0.1)
+        point = base
+        joints = []
+        for segment in range(3 if finger else 4):
+            if finger == 0 and segment == 0:
+                joints.append(point)
+                continue
+            direction += bend * rng.uniform(0.5, 1.2) * (1 if rng.random() < 0.8 else -1)
+            point = point + 25 * scale * np.array([math.cos(direction), math.sin(direction)])
+            joints.append(point)
+        points.extend([base] + joints if finger else joints)
+    landmarks = np.asarray(points[:21]) + rng.normal(0, rng.choice([0.0, 1.0, 4.0]), (21, 2))
+    lm_list = [[int(round(x)), int(round(y)), 0] for x, y in landmarks]
+    if rng.random() < 0.02:
+        lm_list[17] = list(lm_list[5])  # Zero palm width
+    if rng.random() < 0.02:
+        lm_list[7] = list(lm_list[6])  # Degenerate joint
+    return lm_list
+
+
+# Hand-made poses near the decision boundaries of the 'D' rules: a single-handed D,
+# an index-up hand and a C-shaped hand (together a two-handed D)
+D_POSE = [(300, 400), (285, 385), (275, 365), (270, 345), (268, 330),
+          (300, 310), (300, 290), (300, 270), (300, 250),
+          (302, 340), (302, 315), (302, 290), (302, 252),
+          (320, 340), (322, 320), (330, 310), (340, 312),
+          (340, 345), (342, 328), (350, 318), (358, 316)]
+INDEX_UP_POSE = D_POSE[:10] + [(305, 320), (315, 310), (318, 325)] + D_POSE[13:]
+C_POSE = [(300, 400), (270, 380), (255, 355), (250, 330), (255, 305),
+          (285, 320), (270, 300), (262, 280), (280, 275),
+          (305, 320), (292, 295), (285, 272), (302, 268),
+          (322, 325), (312, 300), (306, 280), (320, 278),
+          (338, 332), (332, 312), (327, 295), (340, 292)]
+
+
+def jittered(rng, pose):
+    offset = rng.uniform(-100, 100, 2)
+    noise = rng.choice([0.0, 1.0, 2.0])
+    return [[int(round(x + offset[0] + rng.normal(0, noise))), int(round(y + offset[1] + rng.normal(0, noise))), 0]
+            for x, y in pose]
+
+
+def generated_landmarks(rng, trial):
+    kind = trial % 6
+    if kind == 0:
+        return jittered(rng, D_POSE)
+    if kind == 1:
+        hands = [jittered(rng, INDEX_UP_POSE), jittered(rng, C_POSE)]
+        return hands[0] + hands[1] if rng.random() < 0.5 else hands[1] + hands[0]
+    if kind == 2:
+        return random_hand(rng) + random_hand(rng)
+    return random_hand(rng)
+
+
+def test_shape_letters_match_the_original_rules():
+    rng = np.random.default_rng(8)
+    letters = Counter()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for trial in range(4000):
+            landmarks = generated_landmarks(rng, trial)
+            expected = analyze_hand_shape(landmarks)
+            assert shape_letter(landmarks) == expected, f"trial {trial}"
+            letters[expected] += 1
+    assert {'D', 'B', 'O', 'Z', 'C', None} <= set(letters), letters
+    assert letters['D'] > 500, letters
+
+
+def test_two_hand_predicates_match_the_original_helpers():
+    rng = np.random.default_rng(80)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for trial in range(2000):
+            hands = [random_hand(rng), random_hand(rng)]
+            if trial % 3 == 0:
+                hands = [jittered(rng, INDEX_UP_POSE), jittered(rng, C_POSE)]
+            features = HandFeatures(hands)
+            for i, hand in enumerate(hands):
+                assert bool(features.is_index_up()[i]) == is_index_up_hand(hand), f"trial {trial}"
+                assert bool(features.is_c_shape()[i]) == is_c_shape_hand(hand), f"trial {trial}"
+                assert bool(features.is_open()[i]) == hand_open(hand), f"trial {trial}"
+
+
+def test_next_gesture_matches_the_original_rules():
+    rng = np.random.default_rng(88)
+    seen = Counter()
+    for trial in range(4000):
+        hand = {'type': 'Right' if trial % 2 else 'Left', 'lmList': random_hand(rng)}
+        expected = next_gesture(hand)
+        assert bool(HandFeatures([hand['lmList']]).is_next([hand['type']])[0]) == expected, f"trial {trial}"
+        seen[expected] += 1
+    assert seen[True] and seen[False], seen
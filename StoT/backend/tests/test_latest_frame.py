@@ -0,0 +1,73 @@
+"""Latest-frame workers: one worker per session at a time, frames in order"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latest_frame import FrameSlot, LatestFrameWorker
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_sessions_run_on_one_worker_at_a_time_and_in_order():
+    slots = [FrameSlot() for _ in range(3)]
+    running = [0] * len(slots)
+    seen = [[] for _ in slots]
+    overlaps = []
+    lock = threading.Lock()
+    rng = random.Random(21)
+
+    def process(job):
+        session, seq = job
+        with lock:
+            running[session] += 1
+            if running[session] > 1:
+                overlaps.append(job)
+        time.sleep(rng.uniform(0, 0.004))
+        with lock:
+            running[session] -= 1
+            seen[session].append(seq)
+        return seq
+
+    worker = LatestFrameWorker(process, threads=4)
+    last = [0] * len(slots)
+    for _ in range(400):
+        session = rng.randrange(len(slots))
+        last[session], _ = worker.submit(slots[session], (session, last[session] + 1))
+        time.sleep(rng.uniform(0, 0.001))
+
+    assert wait_for(lambda: all(slot.result_seq == seq for slot, seq in zip(slots, last)))
+    assert overlaps == []
+    for frames in seen:
+        assert frames == sorted(frames) and len(set(frames)) == len(frames)
+    assert all(slot.result == seq for slot, seq in zip(slots, last))
+
+
+def test_frame_arriving_while_running_is_queued_again():
+    slot = FrameSlot()
+    started, release = threading.Event(), threading.Event()
+
+    def process(job):
+        if job == 'first':
+            started.set()
+            release.wait(5)
+        return job
+
+    worker = LatestFrameWorker(process, threads=2)
+    worker.submit(slot, 'first')
+    assert started.wait(5)
+    assert worker.submit(slot, 'second') == (2, False)
+    assert worker.submit(slot, 'third') == (3, True)
+    assert worker.stats()['waiting'] == 0  # The running worker owns the slot
+
+    release.set()
+    assert wait_for(lambda: worker.stats()['processed'] == 2)
+    assert slot.result == 'third' and worker.stats()['superseded'] == 1
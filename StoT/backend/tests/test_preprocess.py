@@ -0,0 +1,54 @@
+"""ModelInputs: the original model inputs and the shared buffer pool"""
+import os
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocess import ModelInputs
+from skeleton import render_skeleton, transform_landmarks
+
+
+def test_resize_path_matches_the_original_model_inputs():
+    rng = np.random.default_rng(15)
+    model_inputs = ModelInputs((256, 224), native_render=False)
+    for trial in range(50):
+        lm_list = [[int(v) for v in rng.integers((60, 60), (580, 420))] + [0] for _ in range(21)]
+        xs, ys = [p[0] for p in lm_list], [p[1] for p in lm_list]
+        hand = {'type': 'Right', 'lmList': lm_list, 'bbox': (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))}
+        points = transform_landmarks([hand], (480, 640, 3))
+        canvas = render_skeleton(points)
+        with model_inputs.prepare_one(points) as inputs:
+            for size in (256, 224):
+                expected = cv2.resize(canvas, (size, size)).astype(np.float32) / 255.0
+                assert np.array_equal(inputs[size][0], expected)
+
+
+def test_released_buffers_are_reused_across_threads():
+    model_inputs = ModelInputs((256, 224), max_batch=2, pool_size=1)
+    with model_inputs.prepare_one(None) as inputs:
+        first = inputs[256]
+
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(model_inputs.prepare_one(None)[256]))
+    thread.start()
+    thread.join()
+    assert np.shares_memory(first, seen[0])
+
+
+def test_held_buffers_are_not_shared():
+    model_inputs = ModelInputs((256, 224), max_batch=1, pool_size=2)
+    with model_inputs.prepare_one(None) as a, model_inputs.prepare_one(None) as b:
+        assert not np.shares_memory(a[256], b[256])
+    assert len(model_inputs._free) == 2
+
+
+def test_large_batches_use_temporary_buffers():
+    model_inputs = ModelInputs((256, 224), max_batch=2, pool_size=2)
+    with model_inputs.prepare([None] * 5) as inputs:
+        assert inputs[256].shape == (5, 256, 256, 3)
+        assert inputs[224].shape == (5, 224, 224, 3)
+    assert model_inputs._free == []
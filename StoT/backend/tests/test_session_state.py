@@ -0,0 +1,39 @@
+"""Idle eviction of the session store"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_state import SessionStore
+
+
+class FakeTrace:
+    def __init__(self, state):
+        self.state = state
+        self.closed_with_lock_held = None
+
+    def close(self):
+        self.closed_with_lock_held = self.state.lock.locked()
+
+
+def idle_store():
+    return SessionStore(shards=1, idle_timeout=60, sweep_interval=-1)  # Sweeps on every lookup
+
+
+def test_idle_session_is_closed_under_its_lock():
+    store = idle_store()
+    state = store.get('a')
+    trace = state.trace = FakeTrace(state)
+    state.last_seen -= 120
+    store.get('b')  # Sweeps the shard: 'a' is idle
+    assert trace.closed_with_lock_held is True
+    assert state.trace is None and not state.lock.locked()
+    assert store.get('a') is not state
+
+
+def test_session_in_use_is_not_evicted():
+    store = idle_store()
+    with store.session('a') as state:
+        state.last_seen -= 120
+        store.get('b')
+        assert store.get('a') is state
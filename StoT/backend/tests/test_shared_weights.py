@@ -0,0 +1,66 @@
+"""Models built on weights shared between serve.py's workers"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+keras = pytest.importorskip('keras')
+pytest.importorskip('h5py')
+pytest.importorskip('tensorflow')
+
+import shared_weights
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    keras.utils.set_random_seed(20)
+    model = keras.Sequential([
+        keras.Input((32, 32, 3)),
+        keras.layers.Conv2D(4, 3, activation='relu'),
+        keras.layers.BatchNormalization(),
+        keras.layers.MaxPooling2D(),
+        keras.layers.Flatten(),
+        keras.layers.Dense(16, activation='relu'),
+        keras.layers.Dropout(0.5),
+        keras.layers.Dense(26, activation='softmax'),
+    ])
+    path = str(tmp_path / 'model.h5')
+    model.save(path)
+    return path
+
+
+def test_shared_model_matches_the_loaded_model(model_path):
+    expected_model = keras.models.load_model(model_path, compile=False)
+    model = shared_weights.SharedModel(shared_weights.SharedWeights(model_path))
+    x = np.random.default_rng(20).random((3, 32, 32, 3), dtype=np.float32)
+    expected = expected_model.predict(x, verbose=0)
+
+    assert model.input_shape == (None, 32, 32, 3)
+    np.testing.assert_allclose(model.predict(x), expected, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(np.asarray(model(x, training=False)), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_shared_model_does_not_allocate_its_variables(model_path):
+    weights = shared_weights.SharedWeights(model_path)
+    model = shared_weights.SharedModel(weights)
+    model.predict(np.zeros((1, 32, 32, 3), dtype=np.float32))
+    assert all(variable._value is None for variable in model.model.weights)
+
+    # The weights are read from the shared arrays: a change to them shows up in the output
+    before = model.predict(np.ones((1, 32, 32, 3), dtype=np.float32))
+    for _, arrays in weights.layers:
+        for array in arrays:
+            array[...] = 0
+    assert not np.allclose(model.predict(np.ones((1, 32, 32, 3), dtype=np.float32)), before)
+
+
+def test_loader_falls_back_for_files_that_were_not_preloaded(model_path, monkeypatch):
+    monkeypatch.setattr(shared_weights, 'preloaded', {})
+    load = shared_weights.loader(lambda path: ('loaded', path))
+    assert load(model_path) == ('loaded', model_path)
+
+    shared_weights.preload([model_path])
+    assert isinstance(load(model_path), shared_weights.SharedModel)
@@ -0,0 +1,111 @@
+"""The 400x400 skeleton canvas against the drawing code it replaced"""
+import copy
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from skeleton import render_skeleton, transform_landmarks
+
+FIXTURES = os.path.join(BACKEND, 'benchmarks', 'fixtures', 'landmarks.json')
+
+CONNECTIONS = [[0, 1, 2, 3, 4], [0, 5, 6, 7, 8], [0, 9, 10, 11, 12], [0, 13, 14, 15, 16], [0, 17, 18, 19, 20]]
+PALM_CONNECTIONS = [[0, 5], [5, 9], [9, 13], [13, 17], [0, 17]]
+
+
+def baseline_canvas(hands, frame_shape, offset=29):
+    """The original predict_route drawing, statement for statement"""
+    white = np.ones((400, 400, 3), dtype=np.uint8) * 255
+    cv2.rectangle(white, (0, 0), (399, 399), (0, 0, 0), 2)
+
+    def line(pt1, pt2, x, y, scale, os_, os1):
+        x1 = int((pt1[0] - x) * scale) + os_
+        y1 = int((pt1[1] - y) * scale) + os1
+        x2 = int((pt2[0] - x) * scale) + os_
+        y2 = int((pt2[1] - y) * scale) + os1
+        cv2.line(white, (x1, y1), (x2, y2), (0, 255, 0), 2)
+
+    def bones(hand, x, y, scale, os_, os1):
+        for connection in CONNECTIONS:
+            for i in range(len(connection) - 1):
+                line(hand['lmList'][connection[i]], hand['lmList'][connection[i + 1]], x, y, scale, os_, os1)
+        for start, end in PALM_CONNECTIONS:
+            line(hand['lmList'][start], hand['lmList'][end], x, y, scale, os_, os1)
+
+    if len(hands) == 2:
+        hands.sort(key=lambda hand: hand['bbox'][0])
+        bboxes = [hand['bbox'] for hand in hands]
+        x = max(0, min(b[0] for b in bboxes) - offset)
+        y = max(0, min(b[1] for b in bboxes) - offset)
+        w = min(frame_shape[1] - x, max(b[0] + b[2] for b in bboxes) - x + 2 * offset)
+        h = min(frame_shape[0] - y, max(b[1] + b[3] for b in bboxes) - y + 2 * offset)
+        scale = min(350 / w, 350 / h)
+        os_ = (400 - int(w * scale)) // 2
+        os1 = (400 - int(h * scale)) // 2
+        for hand in hands:
+            for lm in hand['lmList']:
+                cx = int((lm[0] - x) * scale) + os_
+                cy = int((lm[1] - y) * scale) + os1
+                cv2.circle(white, (cx, cy), 5, (0, 255, 0), cv2.FILLED)
+            bones(hand, x, y, scale, os_, os1)
+    else:
+        hand = hands[0]
+        x, y, w, h = hand['bbox']
+        x = max(0, x - offset)
+        y = max(0, y - offset)
+        w = min(frame_shape[1] - x, w + 2 * offset)
+        h = min(frame_shape[0] - y, h + 2 * offset)
+        scale = min(350 / w, 350 / h)
+        os_ = (400 - int(w * scale)) // 2
+        os1 = (400 - int(h * scale)) // 2
+        bones(hand, x, y, scale, os_, os1)
+        for lm in hand['lmList']:
+            cx = int((lm[0] - x) * scale) + os_
+            cy = int((lm[1] - y) * scale) + os1
+            cv2.circle(white, (cx, cy), 1, (0, 0, 255), 1)
+    return white
+
+
+def random_hand(rng, frame_shape, kind):
+    height, width = frame_shape[:2]
+    cx, cy = rng.integers(40, width - 40), rng.integers(40, height - 40)
+    spread = rng.uniform(5, 80)
+    lm_list = [[int(np.clip(cx + rng.normal(0, spread), 0, width - 1)),
+                int(np.clip(cy + rng.normal(0, spread), 0, height - 1)), 0] for _ in range(21)]
+    xs = [p[0] for p in lm_list]
+    ys = [p[1] for p in lm_list]
+    return {'type': kind, 'lmList': lm_list,
+            'bbox': (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))}
+
+
+def fixture_frames():
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+    width, height = fixtures['frame_size']
+    return [(frame['hands'], (height, width, 3)) for frame in fixtures['frames'] if frame['hands']]
+
+
+@pytest.mark.parametrize('index', range(len(fixture_frames())))
+def test_fixture_frames_match_the_baseline_drawing(index):
+    hands, frame_shape = fixture_frames()[index]
+    expected = baseline_canvas(copy.deepcopy(hands), frame_shape)
+    actual = render_skeleton(transform_landmarks(hands, frame_shape))
+    assert np.array_equal(actual, expected)
+
+
+def test_random_hands_match_the_baseline_drawing():
+    rng = np.random.default_rng(6)
+    frame_shape = (480, 640, 3)
+    for trial in range(500):
+        hands = [random_hand(rng, frame_shape, 'Right')]
+        if trial % 2:
+            hands.append(random_hand(rng, frame_shape, 'Left'))
+        expected = baseline_canvas(copy.deepcopy(hands), frame_shape)
+        actual = render_skeleton(transform_landmarks(hands, frame_shape))
+        assert np.array_equal(actual, expected), f"trial {trial}"
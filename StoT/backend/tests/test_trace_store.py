@@ -0,0 +1,59 @@
+"""Flushing of recorded landmark traces"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trace_store import TraceReader, TraceStore
+
+HAND = {'type': 'Right', 'lmList': [[i, i, 0] for i in range(21)]}
+
+
+def test_idle_session_is_flushed(tmp_path):
+    store = TraceStore(str(tmp_path), flush_every=256, flush_interval=0.05)
+    trace = store.session('signer', ('old', 'best', 'big'), [['A', 'B']] * 3)
+    for i in range(3):
+        trace.append(float(i), [HAND], (480, 640, 3))
+    assert len(TraceReader(str(tmp_path)).segment(trace.name)) == 0
+
+    deadline = time.monotonic() + 5
+    while len(TraceReader(str(tmp_path)).segment(trace.name)) < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    segment = TraceReader(str(tmp_path)).segment(trace.name)
+    assert len(segment) == 3
+    assert segment.landmarks[2, 0, 5].tolist() == [5, 5, 0]
+    store.close()
+
+
+def test_close_flushes_and_records_the_frame_count(tmp_path):
+    store = TraceStore(str(tmp_path), flush_interval=60)
+    trace = store.session('signer', ('old', 'best', 'big'), [['A', 'B']] * 3)
+    trace.append(0.0, [], (480, 640, 3))
+    store.close()
+    assert trace.closed
+    segment = TraceReader(str(tmp_path)).segment(trace.name)
+    assert len(segment) == 1 and segment.entry['frames'] == 1
+
+
+def test_flusher_skips_a_trace_in_use(tmp_path):
+    store = TraceStore(str(tmp_path), flush_every=256, flush_interval=0.05)
+    busy = store.session('busy', ('old', 'best', 'big'), [['A', 'B']] * 3)
+    idle = store.session('idle', ('old', 'best', 'big'), [['A', 'B']] * 3)
+    busy.append(0.0, [HAND], (480, 640, 3))
+    idle.append(0.0, [HAND], (480, 640, 3))
+
+    def rows(trace):
+        return len(TraceReader(str(tmp_path)).segment(trace.name))
+
+    def wait_for_rows(trace):
+        deadline = time.monotonic() + 5
+        while rows(trace) < 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return rows(trace)
+
+    with busy._lock:  # As while a request appends to it
+        assert wait_for_rows(idle) == 1  # The flusher does not wait for the busy trace
+        assert rows(busy) == 0
+    assert wait_for_rows(busy) == 1
+    store.close()
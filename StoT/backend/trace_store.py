@@ -0,0 +1,281 @@
+"""Append-only landmark traces of signing sessions, read back through memory maps.
+
+A trace keeps, per frame, what the recognition pipeline saw and computed:
+the timestamp, the frame size, up to two hands' 21 landmarks and
+handedness, and the three models' probability vectors (NaN for the models
+that did not run on the frame). That is well under 1 KiB per frame, so
+thousands of sessions can be replayed and re-scored offline (for example
+``Fusion.decide(trace.probabilities)``) without storing any images.
+
+Layout of a store directory::
+
+    index.jsonl              one line when a segment opens, one when it closes
+    <segment>/<column>.bin   raw little-endian rows, one file per column
+
+Every session is written to its own segment. ``SessionTrace`` fills
+preallocated row buffers and appends them to the column files a block at
+a time (when the buffer is full, on close, and once rows have waited
+``flush_interval`` seconds: the store's flusher thread writes out sessions
+that went idle), so a frame costs a few array assignments. Segment
+names carry the process id and the index is only ever appended to, so the
+workers of serve.py can share a store.
+
+``TraceReader`` maps the column files with ``np.memmap``: a segment's
+columns, and any slice of them, are views of the files, not copies. The
+frame count comes from the file sizes, so segments that are still being
+written (or were cut off by a crash) read up to their last complete block.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+INDEX_FILE = 'index.jsonl'
+MAX_HANDS = 2
+LANDMARKS = 21
+HANDEDNESS = {'Left': 0, 'Right': 1}  # -1 for a hand slot with no hand
+
+
+def trace_columns(models, classes):
+    """Column name -> (dtype, per-frame shape) for ``models`` probability vectors of ``classes`` values"""
+    return {
+        'timestamp': ('<f8', ()),  # Seconds since the epoch
+        'frame_size': ('<u2', (2,)),  # Width, height in pixels
+        'hand_count': ('u1', ()),
+        'handedness': ('i1', (MAX_HANDS,)),
+        'landmarks': ('<f4', (MAX_HANDS, LANDMARKS, 3)),  # Pixels of the mirrored frame; zeros past hand_count
+        'probabilities': ('<f4', (models, classes)),
+    }
+
+
+class SessionTrace:
+    """Writer for one session's segment"""
+
+    def __init__(self, store, name, columns, flush_every=256, flush_interval=1.0):
+        self.store = store
+        self.name = name
+        self.path = os.path.join(store.root, name)
+        self.flush_interval = flush_interval
+        self.frames = 0
+        os.makedirs(self.path)
+        self._files = {column: open(os.path.join(self.path, column + '.bin'), 'ab') for column in columns}
+        self._buffers = {column: np.zeros((max(1, int(flush_every)),) + tuple(shape), dtype=dtype)
+                         for column, (dtype, shape) in columns.items()}
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()  # The store's flusher thread writes out idle sessions
+        self.closed = False
+
+    def append(self, timestamp, hands, frame_shape, probabilities=None):
+        """Record one frame: cvzone-style ``hands``, ``frame_shape`` (height, width, ...) and the
+        models' probability vectors (None, or a sequence with None for each model that did not run)"""
+        with self._lock:
+            if self.closed:
+                return
+            self._append(timestamp, hands, frame_shape, probabilities)
+
+    def _append(self, timestamp, hands, frame_shape, probabilities):
+        row = self._pending
+        buffers = self._buffers
+        buffers['timestamp'][row] = timestamp
+        buffers['frame_size'][row] = (frame_shape[1], frame_shape[0])
+
+        hands = hands[:MAX_HANDS] if hands else []
+        buffers['hand_count'][row] = len(hands)
+        handedness = buffers['handedness'][row]
+        landmarks = buffers['landmarks'][row]
+        handedness[:] = -1
+        landmarks[:] = 0
+        for i, hand in enumerate(hands):
+            handedness[i] = HANDEDNESS.get(hand.get('type'), -1)
+            landmarks[i] = hand['lmList']
+
+        scores = buffers['probabilities'][row]
+        scores[:] = np.nan
+        if probabilities is not None:
+            for i, p in enumerate(probabilities):
+                if p is not None:
+                    scores[i] = p
+
+        self._pending += 1
+        self.frames += 1
+        if self._pending == len(buffers['timestamp']) or time.monotonic() - self._flushed_at > self.flush_interval:
+            self._flush()
+
+    def flush(self, idle_for=0.0, blocking=True):
+        """Append the buffered rows to the column files (only if nothing was flushed for ``idle_for`` seconds).
+
+        With ``blocking=False``, a trace that is in use (appending or closing) is
+        skipped; returns whether the trace was checked.
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return False
+        try:
+            if not self.closed and time.monotonic() - self._flushed_at >= idle_for:
+                self._flush()
+            return True
+        finally:
+            self._lock.release()
+
+    def _flush(self):
+        if self._pending:
+            for column, f in self._files.items():
+                f.write(self._buffers[column][:self._pending].tobytes())
+                f.flush()
+            self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self._flush()
+            for f in self._files.values():
+                f.close()
+            self.closed = True
+        self.store.release(self)
+
+
+class TraceStore:
+    """Store directory that opens one ``SessionTrace`` segment per recorded session"""
+
+    def __init__(self, root, flush_every=256, flush_interval=1.0):
+        self.root = root
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._open = {}
+        os.makedirs(root, exist_ok=True)
+        self._stopped = threading.Event()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_idle, name='signbridge-trace-flush', daemon=True).start()
+
+    def _flush_idle(self):
+        """Write out the rows of sessions that stopped sending frames"""
+        while not self._stopped.wait(self.flush_interval):
+            with self._lock:
+                traces = list(self._open.values())
+            for trace in traces:
+                # Skip traces a request or a close holds; the next round gets them
+                trace.flush(idle_for=self.flush_interval, blocking=False)
+
+    def _append_index(self, entry):
+        # A single append per line keeps lines from different processes whole
+        with open(os.path.join(self.root, INDEX_FILE), 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def session(self, session_id, model_names, class_labels):
+        """Open a segment for ``session_id``; ``class_labels`` holds one label list per model"""
+        columns = trace_columns(len(model_names), len(class_labels[0]) if class_labels else 0)
+        with self._lock:
+            self._counter += 1
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._counter}"
+            trace = SessionTrace(self, name, columns, self.flush_every, self.flush_interval)
+            self._open[name] = trace
+            self._append_index({
+                'segment': name,
+                'session': session_id,
+                'started': time.time(),
+                'models': list(model_names),
+                'classes': [list(labels) for labels in class_labels],
+                'columns': {column: [dtype, list(shape)] for column, (dtype, shape) in columns.items()},
+            })
+        return trace
+
+    def release(self, trace):
+        with self._lock:
+            self._open.pop(trace.name, None)
+            self._append_index({'segment': trace.name, 'ended': time.time(), 'frames': trace.frames})
+
+    def close(self):
+        """Flush and close every open segment (at exit)"""
+        self._stopped.set()
+        with self._lock:
+            traces = list(self._open.values())
+        for trace in traces:
+            trace.close()
+
+
+class Trace:
+    """One recorded segment: its index entry and its columns as read-only memory maps"""
+
+    def __init__(self, root, entry):
+        self.entry = entry
+        self.name = entry['segment']
+        self.session = entry.get('session')
+        self.models = entry.get('models', [])
+        self.classes = entry.get('classes', [])
+        path = os.path.join(root, self.name)
+
+        specs = {column: (np.dtype(dtype), tuple(shape)) for column, (dtype, shape) in entry['columns'].items()}
+        frames = []
+        for column, (dtype, shape) in specs.items():
+            file = os.path.join(path, column + '.bin')
+            row_bytes = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+            if row_bytes:  # Zero-width columns (no classes) have no file contents to count
+                frames.append(os.path.getsize(file) // row_bytes if os.path.exists(file) else 0)
+        self.frames = min(frames) if frames else 0
+
+        self.columns = {}
+        for column, (dtype, shape) in specs.items():
+            if self.frames and dtype.itemsize * int(np.prod(shape, dtype=np.int64)):
+                self.columns[column] = np.memmap(os.path.join(path, column + '.bin'), dtype=dtype,
+                                                 mode='r', shape=(self.frames,) + shape)
+            else:
+                self.columns[column] = np.empty((self.frames,) + shape, dtype=dtype)
+
+    def __len__(self):
+        return self.frames
+
+    def __getattr__(self, column):
+        columns = self.__dict__.get('columns', {})
+        if column in columns:
+            return columns[column]
+        raise AttributeError(column)
+
+    def __getitem__(self, index):
+        """Column name -> rows ``index`` (an int or a slice; a view of the files for a slice)"""
+        return {column: values[index] for column, values in self.columns.items()}
+
+    def iter_frames(self):
+        """Each frame as a dict of its column values"""
+        for i in range(self.frames):
+            yield self[i]
+
+
+class TraceReader:
+    """The segments of a store directory, in the order they were opened"""
+
+    def __init__(self, root):
+        self.root = root
+        self.entries = {}
+        index = os.path.join(root, INDEX_FILE)
+        if os.path.exists(index):
+            with open(index, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut off by a crash
+                    self.entries.setdefault(entry['segment'], {}).update(entry)
+        self.entries = {name: entry for name, entry in self.entries.items() if 'columns' in entry}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        for entry in self.entries.values():
+            yield Trace(self.root, entry)
+
+    def segment(self, name):
+        return Trace(self.root, self.entries[name])
+
+    def sessions(self, session_id):
+        """All segments recorded for ``session_id``"""
+        return [Trace(self.root, entry) for entry in self.entries.values() if entry.get('session') == session_id]
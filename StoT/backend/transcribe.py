@@ -0,0 +1,96 @@
+"""Video-file transcription helpers for the sign-to-text backend.
+
+``video_frames`` decodes an uploaded clip one frame at a time (a generator,
+so a long clip never sits in memory), keeping at most ``fps`` frames per
+second of video and shrinking them for hand detection. ``batched`` groups
+the frames into chunks, so that app.py can run hand detection on a chunk
+and then the three models once per chunk rather than once per frame.
+``Transcript`` collects the replayed recognition state into timed letter
+runs and sentence edits.
+"""
+import itertools
+
+import cv2
+
+
+def video_frames(path, fps=0, max_width=0):
+    """Yield ``(timestamp, frame, frame_size)`` for the frames of the video at ``path``.
+
+    Timestamps are seconds from the start of the clip. With ``fps`` > 0 at
+    most that many frames per second are kept; the others are grabbed but
+    not converted. Frames wider than ``max_width`` are shrunk, and
+    ``frame_size`` is their original (width, height).
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError("not a readable video file")
+    try:
+        source_fps = capture.get(cv2.CAP_PROP_FPS)
+        if not 0 < source_fps < 1000:
+            source_fps = 0  # Unknown: use the container's timestamps instead
+        interval = 1.0 / fps if fps > 0 else 0.0
+        # Half a source frame of slack, so 30 fps sampled at 10 fps keeps every third frame
+        slack = 0.5 / source_fps if source_fps else 0.0
+        next_time = 0.0
+        index = -1
+
+        while capture.grab():
+            index += 1
+            timestamp = index / source_fps if source_fps else capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if timestamp + slack < next_time:
+                continue
+            success, frame = capture.retrieve()
+            if not success or frame is None:
+                continue
+            next_time = timestamp + interval
+
+            height, width = frame.shape[:2]
+            if max_width and width > max_width:
+                frame = cv2.resize(frame, (max_width, max(1, round(height * max_width / width))),
+                                   interpolation=cv2.INTER_AREA)
+            yield timestamp, frame, (width, height)
+    finally:
+        capture.release()
+
+
+def batched(iterable, size):
+    """Lists of up to ``size`` consecutive items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, max(1, int(size))))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Transcript:
+    """Timed letters and sentence changes of a replayed clip"""
+
+    def __init__(self):
+        self.frames = 0
+        self.duration = 0.0
+        self.letters = []  # Runs of frames with hands showing the same symbol
+        self.edits = []  # Every change of the sentence
+        self._sentence = None
+        self._run_open = False
+
+    def add(self, timestamp, symbol, sentence, hands_present):
+        """Record one replayed frame: its displayed symbol and the sentence after it"""
+        self.frames += 1
+        self.duration = timestamp
+        timestamp = round(timestamp, 3)
+
+        if not hands_present or not symbol:
+            self._run_open = False
+        elif self._run_open and self.letters[-1]['symbol'] == symbol:
+            self.letters[-1]['end'] = timestamp
+            self.letters[-1]['frames'] += 1
+        else:
+            self.letters.append({'symbol': symbol, 'start': timestamp, 'end': timestamp, 'frames': 1})
+            self._run_open = True
+
+        if self._sentence is None:
+            self._sentence = sentence
+        elif sentence != self._sentence:
+            self.edits.append({'time': timestamp, 'sentence': sentence})
+            self._sentence = sentence
@@ -0,0 +1,124 @@
+"""Word completion for the sign-to-text sentence.
+
+``CompletionIndex`` keeps a word list (pyspellchecker's frequency
+dictionary) as one sorted array of words plus a parallel array of counts.
+The completions of a prefix are a contiguous slice, found with two
+bisections, and the most frequent ones are picked with ``argpartition``.
+``WordCompleter`` applies the suggestion rules from webtrial2.py on top of
+the index (the common-words table for one- and two-letter words, dictionary
+completions topped up from the table for longer ones) and memoizes the
+result per partial word in a bounded LRU.
+"""
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+import numpy as np
+
+# Common English words starting with each letter (EXACT from webtrial2.py)
+COMMON_WORDS = {
+    'A': ['AND', 'ARE', 'ALL', 'ALSO'],
+    'B': ['BUT', 'BE', 'BEEN', 'BECAUSE'],
+    'C': ['CAN', 'COME', 'COULD', 'CALL'],
+    'D': ['DO', 'DID', 'DON\'T', 'DOWN'],
+    'E': ['EACH', 'EVEN', 'EVERY', 'END'],
+    'F': ['FOR', 'FROM', 'FIRST', 'FIND'],
+    'G': ['GET', 'GO', 'GOOD', 'GREAT'],
+    'H': ['HE', 'HER', 'HIM', 'HOW'],
+    'I': ['I', 'IN', 'IS', 'IT'],
+    'J': ['JUST', 'JOB', 'JOIN', 'JUMP'],
+    'K': ['KNOW', 'KEEP', 'KIND', 'KEY'],
+    'L': ['LIKE', 'LOOK', 'LAST', 'LONG'],
+    'M': ['MY', 'ME', 'MORE', 'MAKE'],
+    'N': ['NO', 'NOT', 'NOW', 'NEW'],
+    'O': ['OF', 'ON', 'OR', 'ONE'],
+    'P': ['PEOPLE', 'PLACE', 'PLEASE', 'PUT'],
+    'Q': ['QUESTION', 'QUITE', 'QUICK', 'QUIET'],
+    'R': ['RIGHT', 'REALLY', 'ROOM', 'RUN'],
+    'S': ['SO', 'SHE', 'SEE', 'SOME'],
+    'T': ['THE', 'TO', 'THAT', 'THIS'],
+    'U': ['UP', 'US', 'USE', 'UNDER'],
+    'V': ['VERY', 'VIEW', 'VISIT', 'VOICE'],
+    'W': ['WE', 'WILL', 'WITH', 'WHAT'],
+    'X': ['XBOX', 'XRAY', 'EXTRA', 'EXIT'],
+    'Y': ['YOU', 'YOUR', 'YES', 'YEAR'],
+    'Z': ['ZONE', 'ZERO', 'ZIP', 'ZOO']
+}
+
+
+class CompletionIndex:
+    """Frequency-ranked prefix completions over a sorted array of uppercase words"""
+
+    def __init__(self, frequencies):
+        counts = {}
+        for word, count in frequencies.items():
+            # Only words that can be fingerspelled letter by letter
+            if word.isascii() and word.isalpha():
+                word = word.upper()
+                counts[word] = counts.get(word, 0) + int(count)
+        self.words = sorted(counts)
+        self.counts = np.array([counts[word] for word in self.words], dtype=np.int64)
+
+    @classmethod
+    def from_spellchecker(cls, spell):
+        """Index pyspellchecker's word frequency list (empty for the simple fallback checker)"""
+        word_frequency = getattr(spell, 'word_frequency', None)
+        return cls(dict(word_frequency.dictionary) if word_frequency is not None else {})
+
+    def __len__(self):
+        return len(self.words)
+
+    def complete(self, prefix, limit=4):
+        """Up to ``limit`` words starting with ``prefix``, most frequent first (ties alphabetical)"""
+        prefix = prefix.upper()
+        lo = bisect_left(self.words, prefix)
+        hi = bisect_left(self.words, prefix + '\uffff', lo)
+        if hi <= lo:
+            return []
+        counts = self.counts[lo:hi]
+        if hi - lo > limit:
+            top = np.argpartition(-counts, limit - 1)[:limit]
+        else:
+            top = np.arange(hi - lo)
+        top = top[np.lexsort((top, -counts[top]))]
+        return [self.words[lo + i] for i in top]
+
+
+class WordCompleter:
+    """Word suggestions for a partial word, memoized per partial word"""
+
+    def __init__(self, index, memo_size=1024):
+        self.index = index
+        self.memo_size = max(1, int(memo_size))
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _suggest(self, last_word):
+        # If current word has only 1-2 letters, suggest common words starting with those letters
+        if len(last_word) <= 2:
+            first_letter = last_word[0] if last_word else 'A'
+            return [word for word in COMMON_WORDS.get(first_letter, []) if word.startswith(last_word)][:4]
+
+        # For longer words, complete from the dictionary, then fill up with common words
+        word_suggestions = self.index.complete(last_word, 4)
+        if len(word_suggestions) < 4:
+            remaining_words = [word for word in COMMON_WORDS.get(last_word[0], [])
+                               if word not in word_suggestions and word.startswith(last_word)]
+            word_suggestions.extend(remaining_words[:4 - len(word_suggestions)])
+        return word_suggestions
+
+    def suggest(self, last_word):
+        """Up to four suggested words (uppercase) for the partial word ``last_word``"""
+        last_word = last_word.upper()
+        with self._lock:
+            suggestions = self._memo.get(last_word)
+            if suggestions is not None:
+                self._memo.move_to_end(last_word)
+                return list(suggestions)
+
+        suggestions = tuple(self._suggest(last_word))
+        with self._lock:
+            self._memo[last_word] = suggestions
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return list(suggestions)